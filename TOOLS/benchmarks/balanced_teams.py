@@ -0,0 +1,54 @@
+"""Compares the old sixMans balanced team search (scoring every combination) against the partition solver in sixMans.balance.
+
+Run from the root of the repo in an environment that has Red installed:
+    python TOOLS/benchmarks/balanced_teams.py
+"""
+import os
+import random
+import sys
+import time
+from itertools import combinations
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sixMans.balance import EXACT_MAX_PLAYERS, get_balanced_teams
+
+QUEUE_SIZES = [6, 8, 10, 12, 14, 16, 18, 20, 24, 32, 48, 64]
+LEGACY_MAX_PLAYERS = 20     # The old search takes minutes past this
+
+
+def legacy_balanced_teams(player_scores):
+    team_combos = list(combinations(list(player_scores), len(player_scores) // 2))
+    avg_team_score = sum(player_scores.values()) / 2
+    balance_diff = None
+    for a_team in team_combos:
+        team_diff = abs(avg_team_score - sum(player_scores[player] for player in a_team))
+        if balance_diff is None or team_diff < balance_diff:
+            balance_diff = team_diff
+    return balance_diff
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("{:>7s} {:>12s} {:>12s} {:>10s}  {}".format("players", "legacy (ms)", "solver (ms)", "diff", "method"))
+    for size in QUEUE_SIZES:
+        # Scores look like the ones Game.get_player_scores produces
+        player_scores = {i: round(1 + random.uniform(-1, 1), 2) for i in range(size)}
+        (teams, balance_score), solver_time = timed(get_balanced_teams, player_scores)
+        if size <= LEGACY_MAX_PLAYERS:
+            legacy_score, legacy_time = timed(legacy_balanced_teams, player_scores)
+            legacy = "{:12.2f}".format(legacy_time * 1000)
+            diff = "{:10.4f}".format(balance_score - legacy_score)
+        else:
+            legacy, diff = "{:>12s}".format("-"), "{:>10s}".format("-")
+        method = "exact" if size <= EXACT_MAX_PLAYERS else "heuristic"
+        print("{:7d} {} {:12.2f} {}  {}".format(size, legacy, solver_time * 1000, diff, method))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compares the speed and results of the TeamManager trigram NameIndex against difflib.get_close_matches, which is how team
+and tier names were matched before. Both score the same case sensitive ratio, and "agree" is how often the index returned
+the same best match as difflib.
+
+Run from the root of the repo in an environment that has Red installed:
+    python TOOLS/benchmarks/name_matching.py
+"""
+import difflib
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from teamManager.names import NameIndex
+
+NAME_COUNTS = [20, 100, 500, 1000]
+QUERIES = 1000
+MATCHES = 3
+CUTOFF = 0.4    # The cutoff _match_team_name uses
+
+WORDS = [
+    "Aces", "Aftershock", "Aliens", "Alpha", "Amber", "Anchors", "Arctic", "Avalanche", "Bandits", "Barracudas", "Bears",
+    "Blaze", "Blizzard", "Bolts", "Bombers", "Buccaneers", "Cobras", "Comets", "Cosmos", "Coyotes", "Crimson", "Cyclones",
+    "Dragons", "Eclipse", "Falcons", "Flames", "Foxes", "Frost", "Galaxy", "Gators", "Ghosts", "Giants", "Hornets",
+    "Hurricanes", "Inferno", "Jaguars", "Jets", "Knights", "Lancers", "Lightning", "Lions", "Lynx", "Mammoths", "Meteors",
+    "Mustangs", "Ninjas", "Nova", "Orcas", "Outlaws", "Panthers", "Phantoms", "Phoenix", "Pirates", "Raptors", "Ravens",
+    "Rebels", "Rockets", "Samurai", "Scorpions", "Sharks", "Spartans", "Storm", "Thunder", "Titans", "Tornadoes", "Vikings",
+    "Vipers", "Warriors", "Wolves", "Yetis", "Zephyrs"
+]
+
+
+def make_names(count):
+    names = set()
+    while len(names) < count:
+        names.add("{} {}".format(random.choice(WORDS), random.choice(WORDS)))
+    return sorted(names)
+
+
+def make_typo(name):
+    """Returns the name the way a user might type it: lowercase, with a character missing, swapped, added, or cut short."""
+    name = name.lower()
+    i = random.randrange(len(name) - 1)
+    typo = random.randrange(4)
+    if typo == 0:
+        return name[:i] + name[i + 1:]
+    if typo == 1:
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    if typo == 2:
+        return name[:i] + random.choice(string.ascii_lowercase) + name[i:]
+    return name.split()[random.randrange(2)]
+
+
+def found(intended, results):
+    best = sum(1 for name, matches in zip(intended, results) if matches[:1] == [name])
+    any_match = sum(1 for name, matches in zip(intended, results) if name in matches)
+    return "{:.0f}% / {:.0f}%".format(best * 100 / len(intended), any_match * 100 / len(intended))
+
+
+def measure(match, queries):
+    start = time.perf_counter()
+    results = [match(query) for query in queries]
+    return time.perf_counter() - start, results
+
+
+def main():
+    print("{:>6s} {:>14s} {:>14s} {:>14s} {:>9s} {:>15s} {:>15s} {:>6s}".format(
+        "names", "index build", "difflib/query", "index/query", "speedup", "difflib found", "index found", "agree"))
+    for count in NAME_COUNTS:
+        names = make_names(count)
+        intended = [random.choice(names) for _ in range(QUERIES)]
+        queries = [make_typo(name) for name in intended]
+
+        start = time.perf_counter()
+        name_index = NameIndex(names)
+        build_time = time.perf_counter() - start
+
+        difflib_time, difflib_results = measure(
+            lambda query: difflib.get_close_matches(query, names, n=MATCHES, cutoff=CUTOFF), queries)
+        index_time, index_results = measure(
+            lambda query: name_index.close_matches(query, n=MATCHES, cutoff=CUTOFF), queries)
+
+        # How often the name the user meant is the best match / one of the matches
+        agree = sum(1 for ours, theirs in zip(index_results, difflib_results) if ours[:1] == theirs[:1])
+        print("{:6d} {:>11.2f} ms {:>11.3f} ms {:>11.3f} ms {:8.1f}x {:>15s} {:>15s} {:5.0f}%".format(
+            count, build_time * 1000, difflib_time * 1000 / QUERIES, index_time * 1000 / QUERIES, difflib_time / index_time,
+            found(intended, difflib_results), found(intended, index_results), agree * 100 / QUERIES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Compares the memory use and speed of the sixMans PlayerQueue against the old PlayerQueue, which subclassed the thread safe
+queue.Queue and kept the players in an OrderedSet.
+
+Run from the root of the repo in an environment that has Red installed:
+    python TOOLS/benchmarks/player_queue.py
+"""
+import collections.abc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from queue import Queue
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sixMans.queue import PlayerQueue
+
+QUEUE_SIZES = [6, 100, 1000, 10000]
+OPERATIONS = 100000
+
+
+class LegacyPlayerQueue(Queue):
+    def _init(self, maxsize):
+        self.queue = LegacyOrderedSet()
+
+    def _put(self, item):
+        self.queue.add(item)
+
+    def _get(self):
+        return self.queue.pop()
+
+    def _remove(self, value):
+        self.queue.remove(value)
+
+    def __contains__(self, item):
+        with self.mutex:
+            return item in self.queue
+
+
+class LegacyOrderedSet(collections.abc.MutableSet):
+    def __init__(self):
+        self.end = end = []
+        end += [None, end, end]
+        self.map = {}
+
+    def __len__(self):
+        return len(self.map)
+
+    def __contains__(self, key):
+        return key in self.map
+
+    def add(self, key):
+        if key not in self.map:
+            end = self.end
+            curr = end[1]
+            curr[2] = end[1] = self.map[key] = [key, curr, end]
+
+    def discard(self, key):
+        if key in self.map:
+            key, prev, next = self.map.pop(key)
+            prev[2] = next
+            next[1] = prev
+
+    def __iter__(self):
+        end = self.end
+        curr = end[2]
+        while curr is not end:
+            yield curr[0]
+            curr = curr[2]
+
+
+class Member(SimpleNamespace):
+    def __hash__(self):
+        return self.id >> 22
+
+    def __eq__(self, other):
+        return self.id == other.id
+
+
+def legacy_ops(queue):
+    return {
+        "put": queue.put,
+        "get": queue.get,
+        "remove": queue._remove,
+        "contains": lambda player: player in queue,
+        "iterate": lambda: list(queue.queue)
+    }
+
+
+def new_ops(queue):
+    return {
+        "put": queue.put,
+        "get": queue.get,
+        "remove": queue.remove,
+        "contains": lambda player: player in queue,
+        "iterate": lambda: list(queue)
+    }
+
+
+def measure_memory(queue_class, players):
+    tracemalloc.start()
+    queue = queue_class()
+    for player in players:
+        queue.put(player)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def measure_ops(make_queue, make_ops, players):
+    queue = make_queue()
+    ops = make_ops(queue)
+    for player in players:
+        ops["put"](player)
+
+    timings = {}
+    start = time.perf_counter()
+    for _ in range(OPERATIONS):
+        ops["contains"](random.choice(players))
+    timings["contains"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(OPERATIONS):
+        player = ops["get"]()
+        ops["put"](player)
+    timings["get+put"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(OPERATIONS):
+        player = random.choice(players)
+        ops["remove"](player)
+        ops["put"](player)
+    timings["remove+put"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(max(1, OPERATIONS // len(players))):
+        ops["iterate"]()
+    timings["iterate"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    print("{:>6s} {:>12s} {:>14s} {:>14s} {:>9s}".format("size", "operation", "legacy", "new", "speedup"))
+    for size in QUEUE_SIZES:
+        players = [Member(id=random.getrandbits(63), display_name="Player {}".format(i)) for i in range(size)]
+        legacy_memory = measure_memory(LegacyPlayerQueue, players)
+        new_memory = measure_memory(PlayerQueue, players)
+        print("{:6d} {:>12s} {:>12,d} B {:>12,d} B {:8.1f}x".format(size, "memory", legacy_memory, new_memory, legacy_memory / new_memory))
+
+        legacy_timings = measure_ops(LegacyPlayerQueue, legacy_ops, players)
+        new_timings = measure_ops(PlayerQueue, new_ops, players)
+        for operation, legacy_time in legacy_timings.items():
+            new_time = new_timings[operation]
+            print("{:6d} {:>12s} {:>11.1f} ms {:>11.1f} ms {:8.1f}x".format(size, operation, legacy_time * 1000, new_time * 1000, legacy_time / new_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Compares how fast sixMans turns raw reaction events into games with the old scan over the guild's games against the
+text channel index.
+
+Most reactions in a busy guild are on messages that have nothing to do with 6 Mans, so the events are mostly misses.
+
+Run from the root of the repo:
+    python TOOLS/benchmarks/reaction_lookup.py
+"""
+import random
+import time
+from types import SimpleNamespace
+
+GAME_COUNTS = [10, 50, 100, 250, 500]
+EVENTS = 200000
+GAME_EVENT_RATIO = 0.1      # Share of reactions that are on a game's info message
+
+
+def make_games(count):
+    games = []
+    for i in range(count):
+        text_channel = SimpleNamespace(id=10 ** 6 + i)
+        info_message = SimpleNamespace(id=10 ** 7 + i)
+        games.append(SimpleNamespace(textChannel=text_channel, info_message=info_message))
+    return games
+
+
+def make_events(games):
+    events = []
+    for _ in range(EVENTS):
+        if random.random() < GAME_EVENT_RATIO:
+            game = random.choice(games)
+            events.append(SimpleNamespace(channel_id=game.textChannel.id, message_id=game.info_message.id))
+        else:
+            events.append(SimpleNamespace(channel_id=random.randrange(10 ** 5), message_id=random.randrange(10 ** 5)))
+    return events
+
+
+def legacy_lookup(games, events):
+    found = 0
+    for payload in events:
+        for game in games:
+            if game.textChannel.id == payload.channel_id:
+                if game.info_message.id == payload.message_id:
+                    found += 1
+                break
+    return found
+
+
+def indexed_lookup(games_by_channel, events):
+    found = 0
+    for payload in events:
+        game = games_by_channel.get(payload.channel_id)
+        if game and game.info_message and game.info_message.id == payload.message_id:
+            found += 1
+    return found
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("{:>6s} {:>16s} {:>16s} {:>8s}".format("games", "legacy (ev/s)", "indexed (ev/s)", "speedup"))
+    for count in GAME_COUNTS:
+        games = make_games(count)
+        events = make_events(games)
+        games_by_channel = {game.textChannel.id: game for game in games}
+        legacy_found, legacy_time = timed(legacy_lookup, games, events)
+        indexed_found, indexed_time = timed(indexed_lookup, games_by_channel, events)
+        assert legacy_found == indexed_found
+        print("{:6d} {:16,.0f} {:16,.0f} {:7.1f}x".format(count, EVENTS / legacy_time, EVENTS / indexed_time, legacy_time / indexed_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compares the old sixMans leaderboard window query (a date string parse per score) against ScoreStore.window.
+
+Run from the root of the repo in an environment that has Red installed:
+    python TOOLS/benchmarks/score_windows.py [number_of_scores]
+"""
+import datetime
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sixMans.scores import DATE_TIME_FORMAT, ScoreStore, get_timestamp
+
+QUEUE_IDS = [1, 2, 3]
+HISTORY_DAYS = 180
+
+
+def make_scores(count):
+    """Builds `count` scores spread evenly over the last HISTORY_DAYS days, oldest first."""
+    now = datetime.datetime.now()
+    step = datetime.timedelta(days=HISTORY_DAYS) / count
+    scores = []
+    for i in range(count):
+        date_time = now - step * (count - i)
+        scores.append({
+            "Game": i // 6,
+            "Queue": random.choice(QUEUE_IDS),
+            "Player": random.randrange(1000),
+            "Win": i % 2,
+            "Points": 15 if i % 2 else 10,
+            "DateTime": date_time.strftime(DATE_TIME_FORMAT),
+            "Timestamp": get_timestamp(date_time)
+        })
+    return scores
+
+
+def legacy_window(scores_newest_first, start_date, queue_id):
+    valid_scores = []
+    for score in scores_newest_first:
+        date_time = datetime.datetime.strptime(score["DateTime"], DATE_TIME_FORMAT)
+        if date_time > start_date and (queue_id is None or score["Queue"] == queue_id):
+            valid_scores.append(score)
+        else:
+            break
+    return valid_scores
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    scores = make_scores(count)
+    legacy_scores = list(reversed(scores))
+    store = ScoreStore(scores)
+
+    print("{} scores over {} days".format(count, HISTORY_DAYS))
+    for name, delta in [("day", 1), ("week", 7), ("month", 30)]:
+        start_date = datetime.datetime.now() - datetime.timedelta(days=delta)
+        start_time = get_timestamp(start_date)
+        assert len(legacy_window(legacy_scores, start_date, None)) == len(store.window(start_time))
+
+        runs = 20
+        legacy = timeit.timeit(lambda: legacy_window(legacy_scores, start_date, None), number=runs) / runs
+        indexed = timeit.timeit(lambda: store.window(start_time), number=runs) / runs
+        queue_indexed = timeit.timeit(lambda: store.window(start_time, QUEUE_IDS[0]), number=runs) / runs
+        print("{:6s} legacy: {:9.3f} ms  store: {:7.3f} ms  store (queue): {:7.3f} ms  speedup: {:.0f}x".format(
+            name, legacy * 1000, indexed * 1000, queue_indexed * 1000, legacy / indexed))
+
+
+if __name__ == "__main__":
+    main()
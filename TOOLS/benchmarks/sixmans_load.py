@@ -0,0 +1,791 @@
+"""Offline load benchmark for the sixMans cog.
+
+Runs the cog against lightweight fake Guild, Member, TextChannel, VoiceChannel and Message objects and an in-memory stand in for
+Red's Config, so no bot or Discord connection is needed. The guilds (50 by default) each have their own queues (10 by default,
+cycling through the team selection modes in QTS_METHODS) and all of them are played at the same time. Each round plays one game
+in every queue of every guild: players join (and some leave) the queues through the queue commands, the queue pops, teams are
+picked (with reactions for the modes that need them), the score is reported and the leaderboards and ranks are queried.
+
+Throughput, p50/p99 latency per operation, Discord API calls, Config reads and writes and peak memory are reported, and the
+results can be written to a JSON baseline and compared against a previous one.
+
+Run from the root of the repo in an environment that has Red installed:
+    python TOOLS/benchmarks/sixmans_load.py [--guilds 50] [--queues 10] [--rounds 5] [--players 300] [--latency 0]
+        [--output baseline.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import collections
+import contextvars
+import copy
+import datetime
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import sixMans.game
+import sixMans.queue
+import sixMans.sixMans
+from sixMans.game import SELECTION_MODES
+from sixMans.sixMans import QTS_METHODS, SixMans
+from sixMans.strings import Strings
+
+QUEUE_SIZE = 6
+REACTION_MODES = [Strings.VOTE_TS, Strings.CAPTAINS_TS, Strings.SELF_PICKING_TS]
+LEADERBOARD_FORMATS = [Strings.ALL_TIME_LB, Strings.DAILY_LB, Strings.WEEKLY_LB, Strings.MONTHLY_LB]
+REGRESSION_THRESHOLD = 1.25     # An operation whose p50 or p99 is this many times the baseline's is reported as a regression
+
+_ids = itertools.count(10 ** 17)
+# The call counters of the operations being measured in the current task, so operations running at the same time don't count each
+# other's calls
+_operation_calls = contextvars.ContextVar("operation_calls", default=())
+
+
+def next_id():
+    return next(_ids)
+
+
+class Api:
+    """Counts the calls made to the fake Discord API and waits `latency` seconds in each of them."""
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.calls = collections.Counter()
+
+    async def call(self, name):
+        self.calls[name] += 1
+        for counter in _operation_calls.get():
+            counter[0] += 1
+        await asyncio.sleep(self.latency)
+
+    def total(self):
+        return sum(self.calls.values())
+
+
+class FakeRole:
+    def __init__(self, guild, name):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.mention = "<@&{}>".format(self.id)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+
+class FakeMember:
+    def __init__(self, guild, name, bot=False):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.nick = None
+        self.discriminator = "0001"
+        self.mention = "<@{}>".format(self.id)
+        self.avatar_url = "https://cdn.example.com/avatars/{}.png".format(self.id)
+        self.bot = bot
+        self.roles = [guild.default_role]
+        self.voice = None
+        self.guild_permissions = SimpleNamespace(administrator=False)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    async def send(self, content=None, *, embed=None):
+        await self.guild.api.call("Member.send")
+
+    async def move_to(self, channel):
+        await self.guild.api.call("Member.move_to")
+        if self.voice and self.voice.channel:
+            self.voice.channel.members.remove(self)
+        self.voice = SimpleNamespace(channel=channel)
+        channel.members.append(self)
+
+
+class FakeReaction:
+    def __init__(self, message, emoji):
+        self.message = message
+        self.emoji = emoji
+        self._users = []
+
+    @property
+    def count(self):
+        return len(self._users)
+
+    def users(self):
+        users = list(self._users)
+
+        class _Users:
+            async def flatten(self):
+                return users
+        return _Users()
+
+    async def remove(self, user):
+        await self.message.guild.api.call("Reaction.remove")
+        if user in self._users:
+            self._users.remove(user)
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content=None, embed=None):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.embeds = [embed] if embed else []
+        self.reactions = []
+        self.created_at = datetime.datetime.utcnow()
+
+    def _reaction(self, emoji, create=False):
+        for reaction in self.reactions:
+            if reaction.emoji == emoji:
+                return reaction
+        if create:
+            reaction = FakeReaction(self, emoji)
+            self.reactions.append(reaction)
+            return reaction
+        return None
+
+    def react(self, user, emoji):
+        """A member adding a reaction, which is an event from Discord rather than a call."""
+        reaction = self._reaction(emoji, create=True)
+        if user not in reaction._users:
+            reaction._users.append(user)
+
+    async def edit(self, content=None, *, embed=None):
+        await self.guild.api.call("Message.edit")
+        if embed:
+            self.embeds = [embed]
+
+    async def delete(self):
+        await self.guild.api.call("Message.delete")
+        self.channel.messages.pop(self.id, None)
+
+    async def add_reaction(self, emoji):
+        await self.guild.api.call("Message.add_reaction")
+        self.react(self.guild.me, emoji)
+
+    async def clear_reaction(self, emoji):
+        await self.guild.api.call("Message.clear_reaction")
+        self.reactions = [reaction for reaction in self.reactions if reaction.emoji != emoji]
+
+    async def clear_reactions(self):
+        await self.guild.api.call("Message.clear_reactions")
+        self.reactions = []
+
+
+class FakeCategory:
+    def __init__(self, guild, name):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.overwrites = {}
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+
+class FakeTextChannel:
+    def __init__(self, guild, name, category=None, overwrites=None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.overwrites = dict(overwrites or {})
+        self.mention = "<#{}>".format(self.id)
+        self.created_at = datetime.datetime.utcnow()
+        self.messages = {}
+        self.last_message_id = None
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    @property
+    def members(self):
+        return list(self.guild.members.values())
+
+    async def send(self, content=None, *, embed=None):
+        await self.guild.api.call("TextChannel.send")
+        message = FakeMessage(self, self.guild.me, content, embed)
+        self.messages[message.id] = message
+        self.last_message_id = message.id
+        return message
+
+    async def fetch_message(self, message_id):
+        await self.guild.api.call("TextChannel.fetch_message")
+        return self.messages[message_id]
+
+    async def edit(self, name=None, overwrites=None):
+        await self.guild.api.call("TextChannel.edit")
+        if name is not None:
+            self.name = name
+        if overwrites is not None:
+            self.overwrites = dict(overwrites)
+
+    async def delete(self):
+        await self.guild.api.call("TextChannel.delete")
+        self.guild.channels.pop(self.id, None)
+
+
+class FakeVoiceChannel:
+    def __init__(self, guild, name, category=None, overwrites=None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.overwrites = dict(overwrites or {})
+        self.mention = "<#{}>".format(self.id)
+        self.members = []
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    async def edit(self, name=None, overwrites=None):
+        await self.guild.api.call("VoiceChannel.edit")
+        if name is not None:
+            self.name = name
+        if overwrites is not None:
+            self.overwrites = dict(overwrites)
+
+    async def delete(self):
+        await self.guild.api.call("VoiceChannel.delete")
+        self.guild.channels.pop(self.id, None)
+        for member in self.members:
+            member.voice = None
+        self.members = []
+
+
+class FakeGuild:
+    def __init__(self, api, name="Load Test"):
+        self.id = next_id()
+        self.api = api
+        self.name = name
+        self.icon_url = "https://cdn.example.com/icons/{}.png".format(self.id)
+        self.default_role = FakeRole(self, "@everyone")
+        self.roles = {self.default_role.id: self.default_role}
+        self.members = {}
+        self.channels = {}
+        self.me = FakeMember(self, "Bot", bot=True)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def add_member(self, name):
+        member = FakeMember(self, name)
+        self.members[member.id] = member
+        return member
+
+    def add_channel(self, channel):
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    @property
+    def text_channels(self):
+        return [channel for channel in self.channels.values() if isinstance(channel, FakeTextChannel)]
+
+    @property
+    def voice_channels(self):
+        return [channel for channel in self.channels.values() if isinstance(channel, FakeVoiceChannel)]
+
+    async def query_members(self, user_ids=None, cache=True):
+        await self.api.call("Guild.query_members")
+        return [self.members[user_id] for user_id in user_ids if user_id in self.members]
+
+    async def create_text_channel(self, name, category=None, overwrites=None):
+        await self.api.call("Guild.create_text_channel")
+        return self.add_channel(FakeTextChannel(self, name, category, overwrites))
+
+    async def create_voice_channel(self, name, category=None, overwrites=None):
+        await self.api.call("Guild.create_voice_channel")
+        return self.add_channel(FakeVoiceChannel(self, name, category, overwrites))
+
+
+class FakeBot:
+    def __init__(self, guilds):
+        self.guilds = guilds
+        self.user = guilds[0].me
+        self.ready = asyncio.Event()
+
+    async def wait_until_ready(self):
+        await self.ready.wait()
+
+    def get_user(self, user_id):
+        for guild in self.guilds:
+            member = guild.get_member(user_id)
+            if member:
+                return member
+        return None
+
+    async def fetch_user(self, user_id):
+        return self.get_user(user_id)
+
+
+class FakeContext:
+    def __init__(self, bot, guild, channel, author, prefix="?"):
+        self.bot = bot
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.prefix = prefix
+        self.message = FakeMessage(channel, author)
+
+    async def send(self, content=None, *, embed=None):
+        return await self.channel.send(content, embed=embed)
+
+
+class FakeConfig:
+    """Stands in for Red's Config. Guild data is kept in memory as JSON would store it, and reads and writes are counted."""
+
+    def __init__(self):
+        self.defaults = {}
+        self.global_defaults = {}
+        self.data = {}
+        self.reads = 0
+        self.writes = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def get_conf(cls, cog_instance, identifier, force_registration=False):
+        return cls()
+
+    def register_guild(self, **defaults):
+        self.defaults = defaults
+
+    def register_global(self, **defaults):
+        self.global_defaults = defaults
+
+    def __getattr__(self, key):
+        return FakeValue(self, None, key)
+
+    def guild(self, guild):
+        return FakeGroup(self, guild.id)
+
+    def _read(self, guild_id):
+        self.reads += 1
+        data = copy.deepcopy(self.defaults if guild_id is not None else self.global_defaults)
+        data.update(copy.deepcopy(self.data.get(guild_id, {})))
+        return data
+
+    def _write(self, guild_id, values):
+        self.writes += 1
+        encoded = json.dumps(values)
+        self.bytes_written += len(encoded)
+        self.data.setdefault(guild_id, {}).update(json.loads(encoded))
+
+
+class FakeGroup:
+    def __init__(self, config, guild_id):
+        self._config = config
+        self._guild_id = guild_id
+
+    def __getattr__(self, key):
+        return FakeValue(self._config, self._guild_id, key)
+
+    def get_attr(self, key):
+        return FakeValue(self._config, self._guild_id, key)
+
+    def all(self):
+        return FakeAll(self._config, self._guild_id)
+
+
+class FakeValue:
+    def __init__(self, config, guild_id, key):
+        self._config = config
+        self._guild_id = guild_id
+        self._key = key
+
+    async def __call__(self):
+        return self._config._read(self._guild_id)[self._key]
+
+    async def set(self, value):
+        self._config._write(self._guild_id, {self._key: value})
+
+
+class FakeAll:
+    """`await group.all()` reads the guild's data, `async with group.all() as data` writes back any changes made to it."""
+
+    def __init__(self, config, guild_id):
+        self._config = config
+        self._guild_id = guild_id
+        self._data = None
+
+    async def _get(self):
+        return self._config._read(self._guild_id)
+
+    def __await__(self):
+        return self._get().__await__()
+
+    async def __aenter__(self):
+        self._data = self._config._read(self._guild_id)
+        return self._data
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._config._write(self._guild_id, self._data)
+
+
+class Recorder:
+    """Collects the latency and Discord calls of every operation, and any errors raised by one."""
+
+    def __init__(self, api):
+        self.api = api
+        self.latencies = collections.defaultdict(list)
+        self.calls = collections.Counter()
+        self.errors = collections.Counter()
+
+    async def measure(self, operation, coro):
+        calls = [0]
+        token = _operation_calls.set(_operation_calls.get() + (calls,))
+        start = time.perf_counter()
+        try:
+            return await coro
+        except Exception as e:
+            self.errors["{}: {}: {}".format(operation, type(e).__name__, e)] += 1
+            raise
+        finally:
+            self.latencies[operation].append(time.perf_counter() - start)
+            self.calls[operation] += calls[0]
+            _operation_calls.reset(token)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def patch_cog_module(data_path):
+    """Points the cog at the fake Config and a temporary data directory, and drops the delays that only matter with real users."""
+    sixMans.sixMans.Config = FakeConfig
+    sixMans.sixMans.cog_data_path = lambda cog: Path(data_path)
+    sixMans.sixMans.CHANNEL_SLEEP_TIME = 0
+    sixMans.queue.STATUS_EDIT_DELAY = 0
+    sixMans.game.INFO_EDIT_DELAY = 0
+
+
+async def settle():
+    """Lets the status updates, info message edits and Config writes scheduled by the last operation run."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def setup_guild(args, api, cog_data):
+    """Creates a guild with its members, lobby and queue channels, and the cog data that sets up its queues."""
+    guild = FakeGuild(api, "Load Test {}".format(len(cog_data) + 1))
+    players = [guild.add_member("Player {}".format(i)) for i in range(args.players)]
+    category = guild.add_channel(FakeCategory(guild, "6 Mans"))
+    lobby = guild.add_channel(FakeVoiceChannel(guild, "6 Mans Lobby", category))
+    for player in players:
+        player.voice = SimpleNamespace(channel=lobby)
+        lobby.members.append(player)
+    modes = [QTS_METHODS[i % len(QTS_METHODS)] for i in range(args.queues)]
+    queue_channels = [guild.add_channel(FakeTextChannel(guild, "{}-queue-{}".format(mode.lower(), i), category)) for i, mode in enumerate(modes)]
+
+    cog_data[guild.id] = {
+        "CategoryChannel": category.id,
+        "QLobby": lobby.id,
+        "AutoMove": True,
+        "DefaultQueueMaxSize": QUEUE_SIZE,
+        "Queues": {
+            str(next_id()): {
+                "Name": "{} {}".format(mode, i),
+                "Channels": [channel.id],
+                "Points": {Strings.PP_PLAY_KEY: 1, Strings.PP_WIN_KEY: 2},
+                "Players": {},
+                "GamesPlayed": 0,
+                "TeamSelection": mode,
+                "MaxSize": QUEUE_SIZE
+            } for i, (mode, channel) in enumerate(zip(modes, queue_channels))
+        }
+    }
+    # Players picked for a game (or for churn) that's being played, so two queues played at once never pick the same players
+    return SimpleNamespace(guild=guild, players=players, queue_channels=queue_channels, queues=[], reserved=set())
+
+
+async def setup(args, api):
+    cog_data = {}
+    load_guilds = [setup_guild(args, api, cog_data) for _ in range(args.guilds)]
+    bot = FakeBot([load_guild.guild for load_guild in load_guilds])
+    cog = SixMans(bot)
+    cog.writer.delay = 0
+    cog.config.data.update(cog_data)
+    bot.ready.set()
+    while any(load_guild.guild not in cog.guild_loads for load_guild in load_guilds):
+        await asyncio.sleep(0)
+    await asyncio.gather(*(cog._load_guild(load_guild.guild) for load_guild in load_guilds))
+    for load_guild in load_guilds:
+        load_guild.queues = [cog._get_queue_by_text_channel(channel) for channel in load_guild.queue_channels]
+    return bot, cog, load_guilds
+
+
+async def react(cog, recorder, message, member, emoji):
+    message.react(member, emoji)
+    payload = SimpleNamespace(guild_id=message.guild.id, channel_id=message.channel.id, message_id=message.id, user_id=member.id, emoji=emoji)
+    await recorder.measure("reaction", cog._process_raw_reaction(payload, True))
+
+
+async def pick_teams(cog, recorder, game):
+    """Makes the reactions the game's team selection mode waits for."""
+    mode = game.teamSelection
+    if mode == Strings.VOTE_TS:
+        random_react = next(chr(key) for key, value in SELECTION_MODES.items() if value == Strings.RANDOM_TS)
+        for player in list(game.players):
+            if game.state != Strings.TEAM_SELECTION_GS:
+                break
+            await react(cog, recorder, game.info_message, player, random_react)
+    elif mode == Strings.CAPTAINS_TS:
+        pick_order = ['blue', 'orange', 'orange', 'blue']
+        for _ in range(QUEUE_SIZE):
+            if game.state != Strings.TEAM_SELECTION_GS or not game.react_player_picks:
+                break
+            pick = pick_order[(len(game.blue) + len(game.orange) - 2) % len(pick_order)]
+            captain = game.captains[0] if pick == 'blue' else game.captains[1]
+            await react(cog, recorder, game.info_message, captain, chr(int(next(iter(game.react_player_picks)), base=16)))
+    elif mode == Strings.SELF_PICKING_TS:
+        for player in list(game.players)[:QUEUE_SIZE // 2]:
+            await react(cog, recorder, game.info_message, player, chr(Strings.ORANGE_REACT))
+
+
+def take_idle(cog, load_guild, count):
+    """Reserves up to `count` random players of the guild that aren't in a game or reserved by another queue."""
+    busy = set(player for game in cog.games[load_guild.guild] for player in game.players | game.blue | game.orange)
+    idle = [player for player in load_guild.players if player not in busy and player not in load_guild.reserved]
+    players = random.sample(idle, min(count, len(idle)))
+    load_guild.reserved.update(players)
+    return players
+
+
+async def play_game(args, bot, cog, recorder, load_guild, queue):
+    guild = load_guild.guild
+    other_queues = [other for other in load_guild.queues if other is not queue]
+    churn_players = take_idle(cog, load_guild, args.churn) if other_queues else []
+    players = take_idle(cog, load_guild, QUEUE_SIZE)
+    try:
+        # Queue churn: players join another queue and leave it again before the game fills
+        for player in churn_players:
+            ctx = FakeContext(bot, guild, random.choice(other_queues).channels[0], player)
+            await recorder.measure("join", SixMans.queue.callback(cog, ctx))
+            await recorder.measure("leave", SixMans.dequeue.callback(cog, ctx))
+            await settle()
+        load_guild.reserved.difference_update(churn_players)
+
+        if len(players) < QUEUE_SIZE:
+            recorder.errors["join: not enough idle players"] += 1
+            return False
+        for player in players[:-1]:
+            await recorder.measure("join", SixMans.queue.callback(cog, FakeContext(bot, guild, queue.channels[0], player)))
+            await settle()
+        ctx = FakeContext(bot, guild, queue.channels[0], players[-1])
+        await recorder.measure("pop[{}]".format(queue.teamSelection), SixMans.queue.callback(cog, ctx))
+        await settle()
+
+        game = next(game for game in cog.games[guild] if players[0] in game)
+        if queue.teamSelection in REACTION_MODES:
+            await recorder.measure("team_selection[{}]".format(queue.teamSelection), pick_teams(cog, recorder, game))
+            await settle()
+        if game.state != Strings.ONGOING_GS:
+            recorder.errors["team_selection[{}]: not finished".format(queue.teamSelection)] += 1
+            await cog._remove_game(guild, game)
+            return False
+
+        async def report_score():
+            winner = random.choice(["Blue", "Orange"])
+            await game.report_winner(winner)
+            await cog._finish_game(guild, game, queue, winner)
+        await recorder.measure("score_report", report_score())
+        await settle()
+        return True
+    finally:
+        load_guild.reserved.difference_update(churn_players)
+        load_guild.reserved.difference_update(players)
+
+
+async def query_leaderboards(args, bot, cog, recorder, load_guild):
+    for _ in range(args.queries):
+        author = random.choice(load_guild.players)
+        queue_name = random.choice([None] + [queue.name for queue in load_guild.queues])
+        lb_format = random.choice(LEADERBOARD_FORMATS)
+        ctx = FakeContext(bot, load_guild.guild, random.choice(load_guild.queues).channels[0], author)
+        await recorder.measure("leaderboard", cog._send_leaderboard(ctx, queue_name, lb_format))
+        await recorder.measure("rank", cog._send_rank(ctx, author, queue_name, lb_format))
+
+
+async def play_guild(args, bot, cog, recorder, load_guild):
+    """Plays the guild's rounds, with a game in every queue of the guild played at the same time. Returns the games finished."""
+    games = 0
+    for _ in range(args.rounds):
+        played = await asyncio.gather(*(play_game(args, bot, cog, recorder, load_guild, queue) for queue in load_guild.queues),
+            return_exceptions=True)
+        games += sum(1 for result in played if result is True)
+        try:
+            await query_leaderboards(args, bot, cog, recorder, load_guild)
+        except Exception:
+            pass
+    return games
+
+
+async def shutdown(cog):
+    await cog.cog_unload()
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run(args, measure_memory=False):
+    api = Api(args.latency / 1000)
+    with tempfile.TemporaryDirectory() as data_path:
+        patch_cog_module(data_path)
+        if measure_memory:
+            tracemalloc.start()
+        bot, cog, load_guilds = await setup(args, api)
+        recorder = Recorder(api)
+        start = time.perf_counter()
+        games = sum(await asyncio.gather(*(play_guild(args, bot, cog, recorder, load_guild) for load_guild in load_guilds)))
+        elapsed = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if measure_memory else None
+        if measure_memory:
+            tracemalloc.stop()
+
+        results = {
+            "settings": {"guilds": args.guilds, "queues": args.queues, "rounds": args.rounds, "players": args.players, "churn": args.churn, "queries": args.queries,
+                "latency_ms": args.latency, "seed": args.seed, "python": sys.version.split()[0]},
+            "games": games,
+            "elapsed": elapsed,
+            "games_per_second": games / elapsed if elapsed else 0,
+            "joins_per_minute": len(recorder.latencies["join"]) * 60 / elapsed if elapsed else 0,
+            "operations": {
+                operation: {
+                    "count": len(latencies),
+                    "throughput": len(latencies) / sum(latencies) if sum(latencies) else 0,
+                    "p50_ms": percentile(latencies, 50) * 1000,
+                    "p99_ms": percentile(latencies, 99) * 1000,
+                    "calls_per_op": recorder.calls[operation] / len(latencies)
+                } for operation, latencies in sorted(recorder.latencies.items())
+            },
+            "discord_calls": dict(sorted(api.calls.items())),
+            "discord_calls_total": api.total(),
+            "config": {"reads": cog.config.reads, "writes": cog.config.writes, "bytes_written": cog.config.bytes_written},
+            "writer": cog.writer.stats(),
+            "voice_moves": cog.voice_mover.stats(),
+            "errors": dict(recorder.errors),
+            "peak_memory_bytes": peak_memory
+        }
+        await shutdown(cog)
+        return results
+
+
+def print_results(results):
+    print("{} games in {:.2f} s ({:.1f} games/s, {:,.0f} joins/minute)".format(
+        results["games"], results["elapsed"], results["games_per_second"], results["joins_per_minute"]))
+    print()
+    print("{:>32s} {:>7s} {:>10s} {:>10s} {:>10s} {:>9s}".format("operation", "count", "ops/s", "p50 ms", "p99 ms", "calls/op"))
+    for operation, stats in results["operations"].items():
+        print("{:>32s} {:7d} {:10.1f} {:10.3f} {:10.3f} {:9.1f}".format(
+            operation, stats["count"], stats["throughput"], stats["p50_ms"], stats["p99_ms"], stats["calls_per_op"]))
+    print()
+    print("Discord calls: {}".format(results["discord_calls_total"]))
+    for name, count in results["discord_calls"].items():
+        print("{:>32s} {:7d}".format(name, count))
+    print()
+    print("Config reads: {reads}, writes: {writes}, bytes written: {bytes_written:,d}".format(**results["config"]))
+    print("Config writer: {}".format(results["writer"]))
+    print("Voice moves: {}".format(results["voice_moves"]))
+    if results["peak_memory_bytes"] is not None:
+        print("Peak memory: {:,d} B".format(results["peak_memory_bytes"]))
+    for error, count in results["errors"].items():
+        print("Error x{}: {}".format(count, error))
+
+
+def compare(results, baseline):
+    """Prints each operation's latency against the baseline's. Returns True if any of them regressed."""
+    regressed = False
+    print()
+    if baseline.get("settings") != results["settings"]:
+        print("Baseline was run with different settings: {}".format(baseline.get("settings")))
+    print("{:>32s} {:>10s} {:>10s}".format("operation", "p50", "p99"))
+    for operation, stats in results["operations"].items():
+        base = baseline["operations"].get(operation)
+        if not base or not base["p50_ms"] or not base["p99_ms"]:
+            continue
+        p50_ratio = stats["p50_ms"] / base["p50_ms"]
+        p99_ratio = stats["p99_ms"] / base["p99_ms"]
+        flag = max(p50_ratio, p99_ratio) >= REGRESSION_THRESHOLD
+        regressed = regressed or flag
+        print("{:>32s} {:9.2f}x {:9.2f}x{}".format(operation, p50_ratio, p99_ratio, "  <- regression" if flag else ""))
+    base_calls = baseline.get("discord_calls_total")
+    if base_calls:
+        print("{:>32s} {:9.2f}x".format("discord calls", results["discord_calls_total"] / base_calls))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=50, help="guilds played at the same time")
+    parser.add_argument("--queues", type=int, default=10, help="queues in each guild, played at the same time")
+    parser.add_argument("--rounds", type=int, default=5, help="games played in each queue")
+    parser.add_argument("--players", type=int, default=300, help="members in each guild")
+    parser.add_argument("--churn", type=int, default=2, help="players that join and leave another queue before each game")
+    parser.add_argument("--queries", type=int, default=10, help="leaderboard and rank queries after each round")
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds each fake Discord call takes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-memory", action="store_true", help="don't run again under tracemalloc for peak memory")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results against this JSON baseline")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = asyncio.run(run(args))
+    if not args.skip_memory:
+        # tracemalloc slows everything down, so peak memory comes from a second run and the latencies from the first
+        random.seed(args.seed)
+        results["peak_memory_bytes"] = asyncio.run(run(args, measure_memory=True))["peak_memory_bytes"]
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f)):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -750,11 +750,12 @@ class BCManager(commands.Cog):
 
     async def _get_all_match_players(self, ctx, match):
         players = []
+        league = await self.team_manager_cog.league(ctx)
         for team in ['home', 'away']:
-            franchise_role, tier_role = await self.team_manager_cog._roles_for_team(ctx, match[team])
-            team_members = self.team_manager_cog.members_from_team(ctx, franchise_role, tier_role)
-            for player in team_members:
-                players.append(player)
+            league_team = league.team(match[team])
+            if not league_team:
+                raise LookupError('No team with name: {0}'.format(match[team]))
+            players.extend(league_team.players)
         return players
 
 # json db
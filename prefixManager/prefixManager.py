@@ -214,3 +214,4 @@ class PrefixManager(commands.Cog):
 
     async def _save_prefixes(self, ctx, prefixes):
         await self.config.guild(ctx.guild).Prefixes.set(prefixes)
+        ctx.bot.dispatch("prefixes_update", ctx.guild)
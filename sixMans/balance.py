@@ -0,0 +1,113 @@
+import bisect
+import itertools
+import random
+import time
+
+EXACT_MAX_PLAYERS = 24      # Largest number of players split exactly, larger games are split with the heuristic
+MAX_BALANCED_TEAMS = 64     # Most equally balanced teams returned to pick from
+TIME_BUDGET = 0.25          # Seconds allowed for finding balanced teams
+PRECISION = 6               # Decimal places team scores are compared to
+
+
+def get_balanced_teams(player_scores: dict, time_budget=TIME_BUDGET):
+    """Splits the players into two teams of equal size whose total scores are as close as possible.
+
+    Returns a list of the most balanced teams (each a tuple of the players on one of the two teams) and the balance score,
+    the difference between that team's total and half of all the players' scores."""
+    players = list(player_scores)
+    random.shuffle(players)
+    deadline = time.perf_counter() + time_budget
+    if len(players) <= EXACT_MAX_PLAYERS:
+        return _exact_balanced_teams(players, player_scores, deadline)
+    return _heuristic_balanced_teams(players, player_scores, deadline)
+
+
+def _exact_balanced_teams(players, player_scores, deadline):
+    """Meet in the middle search over every split of the players.
+
+    The first player is always put on the team being built, so each split is only looked at once instead of once per side.
+    The remaining players are halved, every subset of each half is scored once, and each subset of the first half is matched
+    with the subsets of the second half that bring the team closest to half of the total with a binary search."""
+    team_size = len(players) // 2
+    half_total = sum(player_scores[player] for player in players) / 2
+    if len(players) % 2 == 0 and players:
+        fixed, rest = [players[0]], players[1:]
+    else:
+        fixed, rest = [], players
+    fixed_score = sum(player_scores[player] for player in fixed)
+    left, right = rest[:len(rest) // 2], rest[len(rest) // 2:]
+
+    # size -> ([subset scores], [subsets]) sorted by score
+    right_subsets = {}
+    for size in range(len(right) + 1):
+        subsets = sorted(
+            ((round(sum(player_scores[player] for player in subset), PRECISION), subset) for subset in itertools.combinations(right, size)),
+            key=lambda x: x[0]
+        )
+        right_subsets[size] = ([x[0] for x in subsets], [x[1] for x in subsets])
+
+    balanced_teams = []
+    balance_score = None
+    needed = team_size - len(fixed)
+    for size in range(min(needed, len(left)) + 1):
+        right_size = needed - size
+        if right_size not in right_subsets:
+            continue
+        right_scores, right_teams = right_subsets[right_size]
+        for subset in itertools.combinations(left, size):
+            target = round(half_total - fixed_score - sum(player_scores[player] for player in subset), PRECISION)
+            i = bisect.bisect_left(right_scores, target)
+            closest = [abs(right_scores[j] - target) for j in (i - 1, i) if 0 <= j < len(right_scores)]
+            if not closest:
+                continue
+            diff = round(min(closest), PRECISION)
+            if balance_score is not None and diff > balance_score:
+                continue
+            if balance_score is None or diff < balance_score:
+                balance_score = diff
+                balanced_teams = []
+
+            # Every right subset whose score is exactly `diff` away from the target is equally balanced
+            for right_score in {round(target - diff, PRECISION), round(target + diff, PRECISION)}:
+                j = bisect.bisect_left(right_scores, right_score)
+                while j < len(right_scores) and right_scores[j] == right_score and len(balanced_teams) < MAX_BALANCED_TEAMS:
+                    balanced_teams.append(tuple(fixed) + subset + right_teams[j])
+                    j += 1
+
+            if time.perf_counter() > deadline and balanced_teams:
+                return balanced_teams, balance_score
+
+    return balanced_teams, balance_score
+
+
+def _heuristic_balanced_teams(players, player_scores, deadline):
+    """Greedy split followed by swapping pairs of players between teams while it makes them more balanced."""
+    team_size = len(players) // 2
+    team, other_team = [], []
+    team_score, other_score = 0, 0
+    for player in sorted(players, key=lambda p: player_scores[p], reverse=True):
+        if len(other_team) >= len(players) - team_size or (len(team) < team_size and team_score <= other_score):
+            team.append(player)
+            team_score += player_scores[player]
+        else:
+            other_team.append(player)
+            other_score += player_scores[player]
+
+    half_total = (team_score + other_score) / 2
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        diff = team_score - half_total
+        best_swap, best_diff = None, abs(diff)
+        for i, player in enumerate(team):
+            for j, other_player in enumerate(other_team):
+                swap_diff = abs(diff - player_scores[player] + player_scores[other_player])
+                if swap_diff < best_diff:
+                    best_swap, best_diff = (i, j), swap_diff
+        if best_swap:
+            i, j = best_swap
+            team_score += player_scores[other_team[j]] - player_scores[team[i]]
+            team[i], other_team[j] = other_team[j], team[i]
+            improved = True
+
+    return [tuple(team)], round(abs(team_score - half_total), PRECISION)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+
+import discord
+
+MAX_CONCURRENT_CALLS = 4    # Channel creates, edits and deletes a guild can have waiting on Discord at once
+POOL_SIZE = 0               # Default number of hidden channel sets kept ready in each category (0 turns the pool off)
+MAX_POOL_SIZE = 5           # Most channel sets that can be kept ready in each category
+
+log = logging.getLogger("red.RSCBot.sixMans")
+
+
+class ChannelManager:
+    """Creates, reuses and deletes the channels used by 6 Mans games.
+
+    A game's channels are a set of one text channel and three voice channels: (text, blue, orange, general). Calls for a guild are
+    made concurrently, up to MAX_CONCURRENT_CALLS at a time, and discord.py waits out the rate limit of each route. Permissions are
+    given in the same call that creates or edits a channel instead of one call per player.
+
+    Each category can keep a pool of hidden channel sets that were created ahead of time. A game started in that category takes a
+    set from the pool, so it only has to rename the channels and set their permissions, and the pool is filled again afterwards."""
+
+    def __init__(self, writer=None, max_concurrent_calls=MAX_CONCURRENT_CALLS):
+        self.writer = writer
+        self.max_concurrent_calls = max_concurrent_calls
+        self.pools = {}         # guild -> {category id: [(text, blue, orange, general)]}
+        self.pool_sizes = {}    # guild -> channel sets kept in each category's pool
+        self.calls = 0
+        self._semaphores = {}
+        self._filling = set()
+
+    def load_pool(self, guild: discord.Guild, saved_pool: dict, pool_size: int):
+        """Loads the saved pool of the guild, dropping any set that has had a channel deleted."""
+        self.pool_sizes[guild] = pool_size
+        pools = {}
+        for category_id, channel_sets in saved_pool.items():
+            for channel_ids in channel_sets:
+                channels = tuple(guild.get_channel(channel_id) for channel_id in channel_ids)
+                if all(channels):
+                    pools.setdefault(int(category_id), []).append(channels)
+        self.pools[guild] = pools
+
+    async def set_pool_size(self, guild: discord.Guild, pool_size: int, categories):
+        """Sets how many channel sets are kept ready in each category, then fills or trims the pools of the given categories."""
+        self.pool_sizes[guild] = pool_size
+        await asyncio.gather(*(self.fill_pool(guild, category) for category in categories))
+
+    def pooled(self, guild: discord.Guild):
+        return sum(len(channel_sets) for channel_sets in self.pools.get(guild, {}).values())
+
+    async def create_game_channels(self, guild: discord.Guild, category: discord.CategoryChannel, names, overwrites):
+        """Returns a text channel and a list of [blue, orange, general] voice channels with the given names and overwrites (each
+        given in that same order), taking them from the category's pool if it has a set ready."""
+        overwrites = [self._with_category_overwrites(category, channel_overwrites) for channel_overwrites in overwrites]
+        channel_set = self._take_from_pool(guild, category)
+        if channel_set:
+            await asyncio.gather(*(
+                self._call(guild, channel.edit(name=name, overwrites=channel_overwrites))
+                for channel, name, channel_overwrites in zip(channel_set, names, overwrites)
+            ))
+            asyncio.create_task(self.fill_pool(guild, category))
+            channels = list(channel_set)
+        else:
+            channels = await self._create_channel_set(guild, category, names, overwrites)
+        return channels[0], channels[1:]
+
+    async def edit_overwrites(self, guild: discord.Guild, channel_overwrites):
+        """Replaces the overwrites of each (channel, overwrites) pair, one call per channel."""
+        await asyncio.gather(*(self._call(guild, channel.edit(overwrites=overwrites)) for channel, overwrites in channel_overwrites))
+
+    async def delete_channels(self, guild: discord.Guild, channels):
+        await asyncio.gather(*(self._call(guild, channel.delete()) for channel in channels if channel), return_exceptions=True)
+
+    async def fill_pool(self, guild: discord.Guild, category: discord.CategoryChannel):
+        """Creates (or deletes) hidden channel sets until the category's pool is the guild's pool size."""
+        key = (guild, self._category_id(category))
+        if key in self._filling:
+            return
+        self._filling.add(key)
+        try:
+            pool = self.pools.setdefault(guild, {}).setdefault(key[1], [])
+            pool_size = self.pool_sizes.get(guild, POOL_SIZE)
+            while len(pool) > pool_size:
+                await self.delete_channels(guild, pool.pop())
+            hidden_text = self._with_category_overwrites(category, {guild.default_role: discord.PermissionOverwrite(view_channel=False)})
+            hidden_voice = self._with_category_overwrites(category, {guild.default_role: discord.PermissionOverwrite(view_channel=False, connect=False)})
+            names = ["6mans-ready"] + ["6 Mans Ready"] * 3
+            while len(pool) < pool_size:
+                pool.append(tuple(await self._create_channel_set(guild, category, names, [hidden_text] + [hidden_voice] * 3)))
+                self._save_pool(guild)
+            self._save_pool(guild)
+        except Exception:
+            log.exception("Couldn't fill the channel pool of category %s in guild %s", self._category_id(category), guild.id)
+        finally:
+            self._filling.discard(key)
+
+    async def _create_channel_set(self, guild: discord.Guild, category: discord.CategoryChannel, names, overwrites):
+        """Creates the channels of a set. If any of them can't be created, the ones that were are deleted and the error is raised."""
+        results = list(await asyncio.gather(
+            self._call(guild, guild.create_text_channel(names[0], category=category, overwrites=overwrites[0])),
+            *(self._call(guild, guild.create_voice_channel(name, category=category, overwrites=channel_overwrites))
+                for name, channel_overwrites in zip(names[1:], overwrites[1:])),
+            return_exceptions=True
+        ))
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self.delete_channels(guild, [result for result in results if not isinstance(result, BaseException)])
+            raise errors[0]
+        return results
+
+    def _take_from_pool(self, guild: discord.Guild, category: discord.CategoryChannel):
+        pool = self.pools.get(guild, {}).get(self._category_id(category), [])
+        while pool:
+            channel_set = pool.pop()
+            if all(guild.get_channel(channel.id) for channel in channel_set):
+                self._save_pool(guild)
+                return channel_set
+        return None
+
+    def _save_pool(self, guild: discord.Guild):
+        if not self.writer:
+            return
+        pools = self.pools.get(guild, {})
+        def pool_dict():
+            return {
+                str(category_id): [[channel.id for channel in channel_set] for channel_set in channel_sets]
+                for category_id, channel_sets in pools.items()
+            }
+        self.writer.save(guild, "ChannelPool", pool_dict)
+
+    async def _call(self, guild: discord.Guild, coro):
+        semaphore = self._semaphores.setdefault(guild, asyncio.Semaphore(self.max_concurrent_calls))
+        async with semaphore:
+            self.calls += 1
+            return await coro
+
+    def _with_category_overwrites(self, category: discord.CategoryChannel, overwrites):
+        """Channels are created synced with their category, so the category's overwrites are kept under the channel's own."""
+        combined = dict(category.overwrites) if category else {}
+        combined.update(overwrites)
+        return combined
+
+    def _category_id(self, category: discord.CategoryChannel):
+        return category.id if category else 0
@@ -1,14 +1,19 @@
+import logging
 import random
 import struct
+import time
 from typing import List
 import uuid
 import asyncio
 import operator
 import discord
-from itertools import combinations
 
+from .balance import get_balanced_teams
+from .channels import ChannelManager
+from .metrics import Metrics
 from .strings import Strings
 from .queue import SixMansQueue
+from .voice import VoiceMover
 
 
 SELECTION_MODES  = {
@@ -17,6 +22,9 @@ SELECTION_MODES  = {
     0x1F530: Strings.SELF_PICKING_TS,   # beginner
     0x0262F: Strings.BALANCED_TS        # yin_yang
 }
+INFO_EDIT_DELAY = 1.5   # Seconds progress updates to the info message are held so a burst of reactions only edits it once
+
+log = logging.getLogger("red.RSCBot.sixMans")
 
 class Game:
     def __init__(
@@ -28,8 +36,12 @@ class Game:
             info_message: discord.Message=None,
             use_reactions=True,
             observers=None,
-            prefix="?"):
+            prefix="?",
+            channel_manager: ChannelManager=None,
+            voice_mover: VoiceMover=None,
+            metrics: Metrics=None):
         self.id = uuid.uuid4().int
+        self.started = time.time()      # When the queue popped, since pooled channels can be created long before the game
         self.players = set(players)
         self.captains = []
         self.blue = set()
@@ -50,6 +62,11 @@ class Game:
         self.voiceChannels = voice_channels #List of voice channels: [Blue, Orange, General]
         self.info_message = info_message
         self.observers = observers if observers else []
+        self.channel_manager = channel_manager if channel_manager else ChannelManager()
+        self.voice_mover = voice_mover if voice_mover else VoiceMover()
+        self.metrics = metrics if metrics else Metrics()     # Counts the Discord calls the game makes
+        self._pending_info_edit = None
+        self._pending_info_embed = None
 
         # attatch listeners to game
         for observer in self.observers:
@@ -72,36 +89,31 @@ class Game:
         if not category:
             category = self.queue.category
         guild = self.queue.guild
-        # sync permissions on channel creation, and edit overwrites (@everyone) immediately after
         code = str(self.id)[-3:]
-        self.textChannel = await guild.create_text_channel(
-            "{} {} {} Mans".format(code, self.queue.name, self.queue.maxSize), 
-            permissions_synced=True,
-            category=category
-        )
-        await self.textChannel.set_permissions(guild.default_role, view_channel=False, read_messages=False)
+        names = [
+            "{} {} {} Mans".format(code, self.queue.name, self.queue.maxSize),
+            "{} | {} Blue Team".format(code, self.queue.name),
+            "{} | {} Orange Team".format(code, self.queue.name),
+            "{} | {} General VC".format(code, self.queue.name)
+        ]
+
+        # permissions are given when the channels are created instead of edited one at a time afterwards
+        text_overwrites = {guild.default_role: discord.PermissionOverwrite(view_channel=False, read_messages=False)}
         for player in self.players:
-            await self.textChannel.set_permissions(player, read_messages=True)
-		
-        # create a general VC lobby for all players in a session
-        general_vc = await guild.create_voice_channel("{} | {} General VC".format(code, self.queue.name), permissions_synced=True, category=category)
-        await general_vc.set_permissions(guild.default_role, connect=False)
-
-        blue_vc = await guild.create_voice_channel("{} | {} Blue Team".format(code, self.queue.name), permissions_synced=True, category=category)
-        await blue_vc.set_permissions(guild.default_role, connect=False)
-        oran_vc = await guild.create_voice_channel("{} | {} Orange Team".format(code, self.queue.name), permissions_synced=True, category=category)
-        await oran_vc.set_permissions(guild.default_role, connect=False)
+            text_overwrites[player] = discord.PermissionOverwrite(read_messages=True)
+        voice_overwrites = {guild.default_role: discord.PermissionOverwrite(connect=False)}
         
         # manually add helper role perms if one is set
         if self.helper_role:
-            await self.textChannel.set_permissions(self.helper_role, view_channel=True, read_messages=True)
-            await general_vc.set_permissions(self.helper_role, connect=True, move_members=True)
-            await blue_vc.set_permissions(self.helper_role, connect=True, move_members=True)
-            await oran_vc.set_permissions(self.helper_role, connect=True, move_members=True)
-        
-        self.voiceChannels = [blue_vc, oran_vc, general_vc]
+            text_overwrites[self.helper_role] = discord.PermissionOverwrite(view_channel=True, read_messages=True)
+            voice_overwrites[self.helper_role] = discord.PermissionOverwrite(connect=True, move_members=True)
+
+        self.textChannel, self.voiceChannels = await self.channel_manager.create_game_channels(
+            guild, category, names, [text_overwrites, voice_overwrites, voice_overwrites, voice_overwrites]
+        ) # voiceChannels: [Blue, Orange, General]
 
         # Mentions all players
+        self.metrics.count("Sends")
         await self.textChannel.send(', '.join(player.mention for player in self.players))
 
     def add_to_blue(self, player):
@@ -120,33 +132,33 @@ class Game:
 
     async def update_player_perms(self):
         blue_vc, orange_vc, general_vc = self.voiceChannels
+        general_overwrites = dict(general_vc.overwrites)
+        blue_overwrites = dict(blue_vc.overwrites)
+        orange_overwrites = dict(orange_vc.overwrites)
         
         for player in self.orange:
-            await general_vc.set_permissions(player, connect=True)
-            await blue_vc.set_permissions(player, connect=False)
-            await orange_vc.set_permissions(player, connect=True)
-
-            if self.automove:
-                try:
-                    await player.move_to(orange_vc)
-                except:
-                    pass
+            general_overwrites[player] = discord.PermissionOverwrite(connect=True)
+            blue_overwrites[player] = discord.PermissionOverwrite(connect=False)
+            orange_overwrites[player] = discord.PermissionOverwrite(connect=True)
 
         for player in self.blue:
-            await general_vc.set_permissions(player, connect=True)
-            await blue_vc.set_permissions(player, connect=True)
-            await orange_vc.set_permissions(player, connect=False)
+            general_overwrites[player] = discord.PermissionOverwrite(connect=True)
+            blue_overwrites[player] = discord.PermissionOverwrite(connect=True)
+            orange_overwrites[player] = discord.PermissionOverwrite(connect=False)
 
-            if self.automove:
-                try:
-                    await player.move_to(blue_vc)
-                except:
-                    pass
+        # One edit per channel for all of the players
+        await self.channel_manager.edit_overwrites(self.queue.guild, [
+            (general_vc, general_overwrites), (blue_vc, blue_overwrites), (orange_vc, orange_overwrites)
+        ])
+
+        if self.automove:
+            await self.voice_mover.move([(player, orange_vc) for player in self.orange] + [(player, blue_vc) for player in self.blue])
 
 # Team Selection
     async def vote_team_selection(self, helper_role=None):
         # Mentions all players
         embed = self._get_vote_embed()
+        self.metrics.count("Sends")
         self.info_message = await self.textChannel.send(embed=embed)
         reacts = [hex(key) for key in SELECTION_MODES.keys()]
         await self._add_reactions(reacts, self.info_message)
@@ -174,6 +186,7 @@ class Game:
         
         # Get player pick embed
         embed = self._get_captains_embed('blue')
+        self.metrics.count("Sends")
         self.info_message = await self.textChannel.send(embed=embed)
         
         await self._add_reactions(self.react_player_picks.keys(), self.info_message)
@@ -194,6 +207,7 @@ class Game:
 
     async def self_picking_teams(self):
         embed = self._get_spt_embed()
+        self.metrics.count("Sends")
         self.info_message = await self.textChannel.send(embed=embed)
         await self._add_reactions([Strings.ORANGE_REACT, Strings.BLUE_REACT], self.info_message)
 
@@ -219,6 +233,7 @@ class Game:
    
     async def shuffle_players(self):
         await self.pick_random_teams()
+        self.metrics.count("Reactions")
         await self.info_message.add_reaction(Strings.SHUFFLE_REACT)
 
 # Team Selection helpers
@@ -256,12 +271,14 @@ class Game:
         captain_picking = self.captains[0] if pick == 'blue' else self.captains[1]
         
         if user != captain_picking:
+            self.metrics.count("Fetches")
             self.info_message = await self.textChannel.fetch_message(self.info_message.id)
             for this_react in self.info_message.reactions:
                 this_react:discord.Reaction
                 reacted_members = await this_react.users().flatten()
                 if user in reacted_members:
                     try:
+                        self.metrics.count("Reactions")
                         await this_react.remove(user)
                     except:
                         pass
@@ -269,6 +286,7 @@ class Game:
         
         # get player from reaction
         player_picked = self._get_player_from_reaction_emoji(ord(emoji))
+        self.metrics.count("Reactions")
         await self.info_message.clear_reaction(emoji)
         
         # add to correct team, update teams embed
@@ -278,18 +296,19 @@ class Game:
         picks_remaining = list(self.react_player_picks.keys())
         if len(picks_remaining) > 1:
             embed = self._get_captains_embed(pick_order[pick_i+1])
-            await self.info_message.edit(embed=embed)
+            await self.edit_info_message(embed)
         
         elif len(picks_remaining) == 1:
             last_pick = 'blue' if len(self.orange) > len(self.blue) else 'orange'
             last_pick_key = picks_remaining[0]
             last_player = self.react_player_picks[last_pick_key]
             del self.react_player_picks[last_pick_key]
+            self.metrics.count("Reactions")
             await self.info_message.clear_reactions()
             self.blue.add(last_player) if last_pick == 'blue' else self.orange.add(last_player)
             teams_complete = True
             embed = self._get_captains_embed(None, guild=last_player.guild)
-            await self.info_message.edit(embed=embed)
+            await self.edit_info_message(embed)
         
         if teams_complete:
             for player in self.blue:
@@ -304,6 +323,7 @@ class Game:
         return teams_complete
     
     async def process_self_picking_teams(self, emoji, user, added=True):
+        self.metrics.count("Fetches")
         self.info_message = await self.textChannel.fetch_message(self.info_message.id)
         if self.state != Strings.TEAM_SELECTION_GS:
             return False
@@ -311,10 +331,12 @@ class Game:
         if user not in set(list(self.blue) + list(self.orange) + list(self.players)):
             try:
                 if ord(emoji) in [Strings.ORANGE_REACT, Strings.BLUE_REACT]:
+                    self.metrics.count("Fetches")
                     self.info_message = await self.textChannel.fetch_message(self.info_message.id)
                     for reaction in self.info_message.reactions:
                         reacted_members = await reaction.users().flatten()
                         if reaction.emoji == emoji and user in reacted_members:
+                            self.metrics.count("Reactions")
                             await reaction.remove(user)
                             break
             except TypeError:
@@ -331,6 +353,7 @@ class Game:
                         reacted_members = await react.users().flatten()
                         if user in reacted_members:
                             try:
+                                self.metrics.count("Reactions")
                                 await react.remove(user)
                             except:
                                 pass
@@ -343,6 +366,7 @@ class Game:
                         reacted_members = await react.users().flatten()
                         if user in reacted_members:
                             try:
+                                self.metrics.count("Reactions")
                                 await react.remove(user)
                             except:
                                 pass
@@ -359,7 +383,6 @@ class Game:
                     self.players.add(user)
 
         embed = self._get_spt_embed()
-        await self.info_message.edit(embed=embed)
         
         # Check if Teams are determined
         teams_finalized = False
@@ -369,6 +392,7 @@ class Game:
         elif len(self.blue) == self.queue.maxSize//2:
             self.orange.update(self.players)
             teams_finalized = True
+        await self.edit_info_message(embed, coalesce=not teams_finalized)
         
         if teams_finalized:
             self.reset_players()
@@ -386,6 +410,7 @@ class Game:
 
         # RECORD VOTES
         votes = {}
+        self.metrics.count("Fetches")
         self.info_message = await self.textChannel.fetch_message(self.info_message.id) # this is needed to get the up to date reactions for a message
         for this_react in self.info_message.reactions:
             this_react:discord.Reaction
@@ -394,6 +419,7 @@ class Game:
                 reacted_members = await this_react.users().flatten()
                 reacted_players = [player for player in reacted_members if player in self.players]  # Intersection of reacted_members and self.players
                 if added and this_react.emoji != emoji and member in reacted_players:
+                    self.metrics.count("Reactions")
                     await this_react.remove(member)
                     reacted_players.remove(member)
                 votes[react_hex_i] = len(reacted_players)
@@ -421,90 +447,27 @@ class Game:
             if self.teamSelection.lower() == Strings.VOTE_TS.lower():
                 self.teamSelection = SELECTION_MODES[running_vote[0]]
                 embed = self._get_vote_embed(vote=votes, winning_vote=running_vote[0])
-                await self.info_message.edit(embed=embed)
+                await self.edit_info_message(embed)
                 await self.process_team_selection_method()
         else:
             # Update embed
             embed = self._get_vote_embed(votes)
-            await self.info_message.edit(embed=embed)
+            await self.edit_info_message(embed, coalesce=True)
 
     def get_balanced_teams(self):
         # Get relevent info from helpers
         player_scores = self.get_player_scores()
-        team_combos = list(combinations(list(self.players), len(self.players)//2))
-
-        # Calc perfectly balanced team based on scores
-        score_total = 0
-        for player, p_data in player_scores.items():
-            score_total += p_data['Score']
-        avg_team_score = score_total/2
 
         # Determine balanced teams
-        balanced_teams = []
-        balance_diff = None
-        for a_team in team_combos:
-            team_score = 0
-            for player in a_team:
-                team_score += player_scores[player]['Score']
-            
-            team_diff = abs(avg_team_score - team_score)
-            if balance_diff:
-                if team_diff < balance_diff:
-                    balance_diff = team_diff
-                    balanced_teams = [a_team]
-                elif team_diff == balance_diff:
-                    balanced_teams.append(a_team)
-            else:
-                balance_diff = team_diff
-                balanced_teams = [a_team]
-        
-        # return balanced team
-        self._notify(Strings.ONGOING_GS)
-        return balanced_teams, team_diff
+        return get_balanced_teams({player: p_data['Score'] for player, p_data in player_scores.items()})
 
     def get_player_scores(self):
-        # Get Player Stats
+        # Score each player on their rating in the queue
         scores = {}
-        ranked_players = 0
-        rank_total = 0
-        wp_players = 0
-        wp_total = 0
-        # Get each player's "rank" and QWP
         for player in self.players:
-            player_stats = self.queue.get_player_summary(player)
-
-            rank = 1  # get_player_rank
-            if player_stats:
-                p_wins = player_stats['Wins']
-                p_losses = player_stats['GamesPlayed'] - p_wins
-                qwp = round(self._get_wp(p_wins, p_losses), 2)
-            else:
-                qwp = None
-
-            scores[player] = {"Rank": rank, "QWP": qwp}
-            if rank: 
-                ranked_players += 1
-                rank_total += rank 
-            if qwp:
-                wp_players += 1
-                wp_total += qwp
-        
-        rank_avg = rank_total/ranked_players if ranked_players else 1
-        
-        # Score Players, Avg
-        score_total = 0
-        for player, p_data in scores.items():
-            p_rank = p_data['Rank'] if ('Rank' in p_data and p_data['Rank']) else rank_avg
-            p_wp = p_data['QWP'] if ('QWP' in p_data and p_data['QWP']) else 0.5
-            score_adj = (p_wp * 2) - 1  # +/- 1
-            
-            score = p_rank + score_adj
-            p_data['Score'] = score
-            score_total += score
-        
-        # p_data['AvgPlayerScore'] = score_total/len(self.players)
-
-        return scores 
+            rating = self.queue.get_player_rating(player)
+            scores[player] = {"Rating": rating, "Score": rating}
+        return scores
 
     async def report_winner(self, winner):
         self.winner = winner
@@ -549,6 +512,7 @@ class Game:
             embed.add_field(name="Help", value=Strings.more_sixmans_info_helper.format(helper=self.helper_role.mention), inline=False)
 
         embed.set_footer(text="Game ID: {}".format(self.id))
+        self.metrics.count("Sends")
         self.info_message = await self.textChannel.send(embed=embed)
 
     async def post_more_lobby_info(self, helper_role=None, invalid=False):
@@ -567,7 +531,7 @@ class Game:
             team_selection = self.teamSelection
             if team_selection == Strings.BALANCED_TS:
                 try:
-                    team_selection += "\n\nBalance Score: {}".format(self.balance_score)
+                    team_selection += "\n\nBalance Score: {}".format(round(self.balance_score, 2))
                     team_selection += "\n_Lower Balance Scores = More Balanced_"
                 except:
                     pass 
@@ -601,6 +565,7 @@ class Game:
         #     player_scores_str += f"{player}: {player_scores.get(player)}: {new_player_stats}"
         
         # embed.description = player_scores_str
+        self.metrics.count("Sends")
         self.info_message = await self.textChannel.send(embed=embed)
 
     async def post_lobby_info(self):
@@ -614,8 +579,38 @@ class Game:
 
         embed.add_field(name="Lobby Info", value="```{} // {}```".format(self.roomName, self.roomPass), inline=False)
         embed.set_footer(text="Game ID: {}".format(self.id))
+        self.metrics.count("Sends")
         await self.textChannel.send(embed=embed)
 
+    async def edit_info_message(self, embed, coalesce=False):
+        """Edits the info message. Coalesced edits are held for a moment and only the newest one is sent, any other edit is sent
+        right away and replaces a coalesced edit that hasn't been sent yet."""
+        if coalesce:
+            self._pending_info_embed = (self.info_message, embed)
+            if not self._pending_info_edit or self._pending_info_edit.done():
+                self._pending_info_edit = asyncio.create_task(self._send_pending_info_edit())
+            return
+
+        if self._pending_info_edit and not self._pending_info_edit.done():
+            self._pending_info_edit.cancel()
+        self._pending_info_embed = None
+        self.metrics.count("Edits")
+        await self.info_message.edit(embed=embed)
+
+    async def _send_pending_info_edit(self):
+        await asyncio.sleep(INFO_EDIT_DELAY)
+        if not self._pending_info_embed:
+            return
+        message, embed = self._pending_info_embed
+        self._pending_info_embed = None
+        # Skip the edit if a new info message has been posted since
+        if self.info_message and self.info_message.id == message.id:
+            try:
+                self.metrics.count("Edits")
+                await message.edit(embed=embed)
+            except discord.HTTPException:
+                log.exception("Couldn't update the info message of game %s", self.id)
+
     def _hex_i_from_emoji(self, emoji):
         return ord(emoji)
 
@@ -633,6 +628,7 @@ class Game:
             embed_dict = embed.to_dict()
             embed_dict['color'] = color.value
             embed = discord.Embed.from_dict(embed_dict)
+            self.metrics.count("Edits")
             await self.info_message.edit(embed=embed)
 
     def _get_vote_embed(self, vote: dict={}, winning_vote=None):
@@ -782,9 +778,11 @@ class Game:
         for react_hex_i in react_hex_codes:
             if type(react_hex_i) == int:
                 react = struct.pack('<I', react_hex_i).decode('utf-32le')
+                self.metrics.count("Reactions")
                 await message.add_reaction(react)
             elif type(react_hex_i) == str:
                 react = struct.pack('<I', int(react_hex_i, base=16)).decode('utf-32le')
+                self.metrics.count("Reactions")
                 await message.add_reaction(react)
 
     def _get_wp(self, wins, losses):
@@ -839,6 +837,7 @@ class Game:
             "RoomPass": self.roomPass,
             "VoiceChannels": vc_channels,
             "QueueId": self.queue.id,
+            "Started": self.started,
             "ScoreReported": self.scoreReported,
             "TeamSelection": self.teamSelection,
             "UseReactions": self.use_reactions,
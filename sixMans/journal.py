@@ -0,0 +1,122 @@
+import json
+import os
+
+SEGMENT_SIZE = 1000     # Rows written to a segment before a new segment is started
+MAX_SEGMENTS = 16       # Full segments allowed to build up before they are compacted into one
+
+
+class Journal:
+    """An append-only journal of JSON rows, stored as numbered JSON lines segment files in a directory.
+
+    Rows are only ever appended to the newest segment, so a write costs the size of the new rows instead of the whole history.
+    Segment files are named `<first>-<last>.jsonl` after the range of segment numbers they hold. Compaction merges full segments into
+    one file covering their whole range, so a segment left behind by an interrupted compaction is recognised and dropped on load."""
+
+    def __init__(self, path, segment_size=SEGMENT_SIZE, max_segments=MAX_SEGMENTS):
+        self.path = str(path)
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        os.makedirs(self.path, exist_ok=True)
+        self.segments = self._load_segments()
+        self._active_rows = self._repair_active_segment()
+
+    def read(self):
+        """Yields every row in the journal, oldest first."""
+        for segment in self.segments:
+            with open(self._segment_path(segment), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def append(self, rows):
+        if not rows:
+            return
+        if not self.segments or self._active_rows >= self.segment_size:
+            self._start_segment()
+        with open(self._segment_path(self.segments[-1]), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows))
+        self._active_rows += len(rows)
+
+        sealed = [segment for segment in self.segments[:-1] if segment[0] == segment[1]]
+        if len(sealed) > self.max_segments:
+            self.compact()
+
+    def compact(self):
+        """Merges the full segments that haven't been compacted yet into a single segment."""
+        sealed = [segment for segment in self.segments[:-1] if segment[0] == segment[1]]
+        if len(sealed) < 2:
+            return
+        merged = (sealed[0][0], sealed[-1][1])
+        self._write_segment(merged, self._read_segments(sealed))
+        for segment in sealed:
+            os.remove(self._segment_path(segment))
+        self.segments = sorted([segment for segment in self.segments if segment not in sealed] + [merged])
+
+    def rewrite(self, rows):
+        """Replaces the contents of the whole journal with `rows`."""
+        last = self.segments[-1][1] + 1 if self.segments else 0
+        replaced = self.segments
+        self.segments = [(0, last)]
+        self._write_segment(self.segments[0], rows)
+        for segment in replaced:
+            os.remove(self._segment_path(segment))
+        self._active_rows = len(rows)
+
+    def clear(self):
+        self.rewrite([])
+
+    def _start_segment(self):
+        number = self.segments[-1][1] + 1 if self.segments else 0
+        self.segments.append((number, number))
+        open(self._segment_path(self.segments[-1]), "a", encoding="utf-8").close()
+        self._active_rows = 0
+
+    def _read_segments(self, segments):
+        rows = []
+        for segment in segments:
+            with open(self._segment_path(segment), "r", encoding="utf-8") as f:
+                rows.extend(line for line in f if line.strip())
+        return rows
+
+    def _write_segment(self, segment, rows):
+        path = self._segment_path(segment)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(row if isinstance(row, str) else json.dumps(row, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _load_segments(self):
+        segments = []
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
+            elif name.endswith(".jsonl"):
+                first, last = name[:-len(".jsonl")].split("-")
+                segments.append((int(first), int(last)))
+
+        # Drop segments that are already covered by a compacted segment
+        kept = []
+        for segment in sorted(segments, key=lambda s: (s[0], -s[1])):
+            if kept and segment[1] <= kept[-1][1]:
+                os.remove(self._segment_path(segment))
+            else:
+                kept.append(segment)
+        return kept
+
+    def _repair_active_segment(self):
+        """Counts the rows in the newest segment, dropping a partly written last row left by a crash."""
+        if not self.segments:
+            return 0
+        path = self._segment_path(self.segments[-1])
+        with open(path, "rb") as f:
+            data = f.read()
+        if data and not data.endswith(b"\n"):
+            data = data[:data.rfind(b"\n") + 1]
+            with open(path, "wb") as f:
+                f.write(data)
+        return data.count(b"\n")
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, "{0:08d}-{1:08d}.jsonl".format(*segment))
@@ -0,0 +1,189 @@
+import collections
+import time
+
+from .ranks import RankIndex
+from .scores import ScoreStore
+from .strings import Strings
+
+LEADERBOARD_WINDOWS = {             # How far back each leaderboard counts scores in seconds (None for all scores)
+    Strings.DAILY_LB: 86400,            # 24 Hours
+    Strings.WEEKLY_LB: 604800,          # 7 Days
+    Strings.MONTHLY_LB: 2592000,        # 30 Days
+    Strings.ALL_TIME_LB: None
+}
+BUCKET_SIZE = 60                    # How many seconds of scores expire together from a windowed leaderboard
+
+
+class Leaderboard:
+    """Points, wins and games played per player, updated as games finish.
+
+    Windowed leaderboards also group their scores in buckets of BUCKET_SIZE seconds and take a bucket's totals
+    back out once the bucket has fallen out of the window, so they never have to be rebuilt from the score history.
+
+    Players are kept ranked by points, wins and games played in rank indexes, so showing the top of the leaderboard
+    or finding a player's rank doesn't need the players to be sorted."""
+
+    def __init__(self, window=None, players=None):
+        self.window = window
+        self.players = players if players is not None else {}
+        self.scores_count = 0
+        self._buckets = collections.deque()     # [bucket start time, {player id: [points, games played, wins]}, scores]
+        self._points_ranks = RankIndex()
+        self._wins_ranks = RankIndex()
+        self._games_played_ranks = RankIndex()
+        for player_id, player_dict in self.players.items():
+            self._add_rank_keys(player_id, player_dict)
+
+    def __len__(self):
+        return len(self.players)
+
+    def ranked_players(self):
+        """Yields (player id, player dict) from the most points to the least."""
+        for key in self._points_ranks:
+            player_id = key[-1]
+            player_dict = self.players.get(player_id)
+            if player_dict is not None:
+                yield player_id, player_dict
+
+    def get_ranks(self, player_id):
+        """Returns the player's 0-based (points rank, wins rank, games played rank), or None if the player has no stats."""
+        player_dict = self.players.get(player_id)
+        if player_dict is None:
+            return None
+        points_key, wins_key, games_played_key = self._rank_keys(player_id, player_dict)
+        return self._points_ranks.rank(points_key), self._wins_ranks.rank(wins_key), self._games_played_ranks.rank(games_played_key)
+
+    def add(self, score):
+        player_id = "{0}".format(score["Player"])
+        points, win = score["Points"], score["Win"]
+        self._update_player(player_id, points, 1, win)
+        self.scores_count += 1
+
+        if self.window is None:
+            return
+        bucket_start = score["Timestamp"] - score["Timestamp"] % BUCKET_SIZE
+        if not self._buckets or self._buckets[-1][0] < bucket_start:
+            self._buckets.append([bucket_start, {}, 0])
+        # Scores are added in time order, so a score can only be older than the newest bucket if the clock went back
+        bucket = self._buckets[-1]
+        totals = bucket[1].setdefault(player_id, [0, 0, 0])
+        totals[0] += points
+        totals[1] += 1
+        totals[2] += win
+        bucket[2] += 1
+
+    def expire(self, now=None):
+        """Removes the scores in every bucket that has completely fallen out of the window."""
+        if self.window is None:
+            return
+        cutoff = (now if now is not None else time.time()) - self.window
+        while self._buckets and self._buckets[0][0] + BUCKET_SIZE <= cutoff:
+            bucket_start, players, scores_count = self._buckets.popleft()
+            for player_id, (points, games_played, wins) in players.items():
+                self._update_player(player_id, -points, -games_played, -wins)
+            self.scores_count -= scores_count
+
+    def _update_player(self, player_id, points, games_played, wins):
+        player_dict = self.players.get(player_id)
+        if player_dict is None:
+            player_dict = self.players[player_id] = {}
+        else:
+            self._remove_rank_keys(player_id, player_dict)
+        player_dict[Strings.PLAYER_POINTS_KEY] = player_dict.get(Strings.PLAYER_POINTS_KEY, 0) + points
+        player_dict[Strings.PLAYER_GP_KEY] = player_dict.get(Strings.PLAYER_GP_KEY, 0) + games_played
+        player_dict[Strings.PLAYER_WINS_KEY] = player_dict.get(Strings.PLAYER_WINS_KEY, 0) + wins
+        if player_dict[Strings.PLAYER_GP_KEY] <= 0:
+            del self.players[player_id]
+        else:
+            self._add_rank_keys(player_id, player_dict)
+
+    def _rank_keys(self, player_id, player_dict):
+        points = player_dict.get(Strings.PLAYER_POINTS_KEY, 0)
+        wins = player_dict.get(Strings.PLAYER_WINS_KEY, 0)
+        games_played = player_dict.get(Strings.PLAYER_GP_KEY, 0)
+        return (-points, -wins, player_id), (-wins, -points, player_id), (-games_played, -points, player_id)
+
+    def _add_rank_keys(self, player_id, player_dict):
+        points_key, wins_key, games_played_key = self._rank_keys(player_id, player_dict)
+        self._points_ranks.add(points_key)
+        self._wins_ranks.add(wins_key)
+        self._games_played_ranks.add(games_played_key)
+
+    def _remove_rank_keys(self, player_id, player_dict):
+        points_key, wins_key, games_played_key = self._rank_keys(player_id, player_dict)
+        self._points_ranks.remove(points_key)
+        self._wins_ranks.remove(wins_key)
+        self._games_played_ranks.remove(games_played_key)
+
+    @classmethod
+    def from_scores(cls, scores: ScoreStore, window=None, queue_id=None, now=None):
+        """Builds a leaderboard from the score history."""
+        leaderboard = cls(window)
+        if window is None:
+            recent_scores = scores.window(queue_id=queue_id)
+        else:
+            now = now if now is not None else time.time()
+            # Include the whole of the oldest bucket that's still partly inside the window
+            recent_scores = scores.window(now - window - BUCKET_SIZE, queue_id)
+        for score in recent_scores:
+            leaderboard.add(score)
+        leaderboard.expire(now)
+        return leaderboard
+
+
+class GuildLeaderboards:
+    """Every leaderboard for a guild, both guild wide and for each queue.
+
+    The all-time leaderboards share their player dicts with the guild's saved players and each queue's players."""
+
+    def __init__(self, players, queues, scores: ScoreStore):
+        self.players = players
+        self.scores = scores
+        self.leaderboards = {}
+        self.leaderboards[(None, Strings.ALL_TIME_LB)] = Leaderboard(players=players)
+        for queue in queues:
+            self.leaderboards[(queue.id, Strings.ALL_TIME_LB)] = Leaderboard(players=queue.players)
+
+    def get(self, lb_format, queue=None, now=None) -> Leaderboard:
+        queue_id = queue.id if queue else None
+        key = (queue_id, lb_format)
+        leaderboard = self.leaderboards.get(key)
+        if leaderboard is None:
+            window = LEADERBOARD_WINDOWS[lb_format]
+            if window is None:
+                leaderboard = Leaderboard(players=queue.players)
+            else:
+                leaderboard = Leaderboard.from_scores(self.scores, window, queue_id, now)
+            self.leaderboards[key] = leaderboard
+        leaderboard.expire(now)
+        return leaderboard
+
+    def add(self, score, queue):
+        """Adds a new score to the guild and queue leaderboards.
+
+        Windowed leaderboards that haven't been requested yet are skipped, they'll be built from the score history when they are."""
+        for lb_format, window in LEADERBOARD_WINDOWS.items():
+            for queue_id in [None, queue.id]:
+                if window is None:
+                    self.get(lb_format, queue if queue_id else None).add(score)
+                elif (queue_id, lb_format) in self.leaderboards:
+                    self.leaderboards[(queue_id, lb_format)].add(score)
+
+    def check(self, now=None):
+        """Rebuilds every leaderboard from the score history and returns the differences from the live ones.
+
+        Returns a dict of leaderboard key -> {player id: (live totals, rebuilt totals)}"""
+        now = now if now is not None else time.time()
+        differences = {}
+        for (queue_id, lb_format), leaderboard in self.leaderboards.items():
+            leaderboard.expire(now)
+            rebuilt = Leaderboard.from_scores(self.scores, leaderboard.window, queue_id, now)
+            board_differences = {}
+            for player_id in set(leaderboard.players) | set(rebuilt.players):
+                live_totals = leaderboard.players.get(player_id)
+                rebuilt_totals = rebuilt.players.get(player_id)
+                if live_totals != rebuilt_totals:
+                    board_differences[player_id] = (live_totals, rebuilt_totals)
+            if board_differences:
+                differences[(queue_id, lb_format)] = board_differences
+        return differences
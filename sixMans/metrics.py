@@ -0,0 +1,93 @@
+import bisect
+import collections
+import contextlib
+import functools
+import time
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]    # Upper bounds of the latency buckets (seconds)
+DUMP_INTERVAL = 15                                                                  # Default minutes between metrics dumps
+
+
+class Histogram:
+    """Counts how many times an operation took each range of time, so percentiles can be read off without keeping every time."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last count is for anything slower than the last bucket
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """Returns the upper bound of the bucket the p-th percentile falls in (the slowest time seen if it's past the last bucket)."""
+        if not self.count:
+            return 0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "Count": self.count,
+            "Average": self.total / self.count if self.count else 0,
+            "P50": self.percentile(50),
+            "P99": self.percentile(99),
+            "Max": self.max,
+            "Buckets": {str(bucket): count for bucket, count in zip(self.buckets + ["inf"], self.counts)}
+        }
+
+
+class Metrics:
+    """Latency histograms for the cog's hot paths and counts of the Discord calls games and queues make, kept from when the cog
+    loaded (or the metrics were last reset)."""
+
+    def __init__(self):
+        self.histograms = {}    # operation -> Histogram
+        self.calls = collections.Counter()  # kind of Discord call -> count
+        self.started = time.time()
+
+    def observe(self, operation, seconds):
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = Histogram()
+        histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, operation):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(operation, time.perf_counter() - start)
+
+    def count(self, call, times=1):
+        self.calls[call] += times
+
+    def reset(self):
+        self.histograms = {}
+        self.calls.clear()
+        self.started = time.time()
+
+    def latencies(self):
+        return {operation: histogram.to_dict() for operation, histogram in sorted(self.histograms.items())}
+
+
+def timed(operation):
+    """Records how long each call of a cog coroutine takes in the cog's metrics."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(operation):
+                return await func(self, *args, **kwargs)
+        return wrapper
+    return decorator
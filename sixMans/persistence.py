@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+
+WRITE_DELAY = 2     # Seconds a guild's changes are held so the changes made in that time are written together
+FLUSH_RETRIES = 1   # Times flush_all tries a guild's write again before giving up on it
+
+log = logging.getLogger("red.RSCBot.sixMans")
+
+
+class ConfigWriter:
+    """Coalesces writes to a cog's guild Config.
+
+    Saving a key only marks it as changed for the guild. Once the guild has gone WRITE_DELAY seconds since its first unsaved
+    change, all of its changed keys are written in a single update of the guild's data. A value can be given as a function so it's
+    only built when it's written, from whatever state the cog is in by then.
+
+    Every write to the guild's data has to go through the writer (`save`, or `set` for a write that can't wait). A flush rewrites
+    the whole document, so flushes and sets for a guild hold the same lock, and a flush can't put back an older copy of a key that
+    was set while it was writing."""
+
+    def __init__(self, config, delay=WRITE_DELAY):
+        self.config = config
+        self.delay = delay
+        self._pending = {}      # guild -> {key: value or function returning the value}
+        self._tasks = {}        # guild -> task that flushes the guild's changes
+        self._locks = {}        # guild -> lock held while the guild's data is being written
+        self.saves = 0
+        self.writes = 0
+        self.sets = 0
+        self.reads = 0
+        self.bytes_written = 0
+
+    def save(self, guild, key, value):
+        self._pending.setdefault(guild, {})[key] = value
+        self.saves += 1
+        if guild not in self._tasks:
+            self._tasks[guild] = asyncio.create_task(self._flush_later(guild))
+
+    def has_pending(self, guild, key):
+        return key in self._pending.get(guild, {})
+
+    async def get(self, guild, key):
+        """Returns the value of a key, including a change that hasn't been written yet."""
+        if self.has_pending(guild, key):
+            return self._build(self._pending[guild][key])
+        self.reads += 1
+        return await self.config.guild(guild).get_attr(key)()
+
+    async def all(self, guild):
+        """Returns all of the guild's data as it's stored, without any changes that haven't been written yet."""
+        self.reads += 1
+        return await self.config.guild(guild).all()
+
+    async def set(self, guild, key, value):
+        """Writes a key right away, replacing a change to it that hasn't been written yet."""
+        self._pending.get(guild, {}).pop(key, None)
+        async with self._lock(guild):
+            self.sets += 1
+            await self.config.guild(guild).get_attr(key).set(value)
+
+    async def flush(self, guild):
+        task = self._tasks.pop(guild, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        changes = self._pending.pop(guild, None)
+        if not changes:
+            return
+        try:
+            async with self._lock(guild):
+                values = {key: self._build(value) for key, value in changes.items()}
+                async with self.config.guild(guild).all() as data:
+                    data.update(values)
+                    self.bytes_written += len(json.dumps(data, default=str))
+        except Exception:
+            # Keep the changes (unless they've been changed again since) and try again later
+            pending = self._pending.setdefault(guild, {})
+            for key, value in changes.items():
+                pending.setdefault(key, value)
+            if guild not in self._tasks:
+                self._tasks[guild] = asyncio.create_task(self._flush_later(guild))
+            raise
+        self.writes += 1
+
+    async def flush_all(self):
+        for guild in list(self._pending):
+            for attempt in range(FLUSH_RETRIES + 1):
+                try:
+                    await self.flush(guild)
+                    break
+                except Exception:
+                    if attempt == FLUSH_RETRIES:
+                        log.exception("Couldn't write the pending 6 Mans changes for guild %s", guild.id)
+
+    def stats(self):
+        return {
+            "Saves": self.saves,
+            "Writes": self.writes,
+            "Sets": self.sets,
+            "Reads": self.reads,
+            "BytesWritten": self.bytes_written,
+            "PendingGuilds": len(self._pending)
+        }
+
+    def reset_stats(self):
+        self.saves = 0
+        self.writes = 0
+        self.sets = 0
+        self.reads = 0
+        self.bytes_written = 0
+
+    async def _flush_later(self, guild):
+        await asyncio.sleep(self.delay)
+        await self.flush(guild)
+
+    def _lock(self, guild):
+        lock = self._locks.get(guild)
+        if lock is None:
+            lock = self._locks[guild] = asyncio.Lock()
+        return lock
+
+    def _build(self, value):
+        return value() if callable(value) else value
@@ -1,9 +1,12 @@
+import asyncio
 import collections
 import datetime
+import time
 import uuid
 import struct
-from queue import Queue
 from typing import List
+from .metrics import Metrics
+from .ratings import DEFAULT_RATING, rate_game
 from .strings import Strings
 
 import discord
@@ -15,10 +18,14 @@ SELECTION_MODES = {
     0x1F530: Strings.SELF_PICKING_TS,   # beginner
     0x1F5F3: Strings.VOTE_TS            # ballot_box
 }
+JOIN_EVENT = "Join"
+LEAVE_EVENT = "Leave"
+STATUS_EDIT_DELAY = 1   # Seconds queue status updates are held so a burst of joins and leaves is shown with a single edit
 
 class SixMansQueue:
     def __init__(self, name, guild: discord.Guild, channels: List[discord.TextChannel],
-        points, players, gamesPlayed, maxSize, teamSelection=Strings.RANDOM_TS, category: discord.CategoryChannel=None, lobby_vc: discord.VoiceChannel=None):
+        points, players, gamesPlayed, maxSize, teamSelection=Strings.RANDOM_TS, category: discord.CategoryChannel=None, lobby_vc: discord.VoiceChannel=None, ratings=None,
+        metrics: Metrics=None):
         self.id = uuid.uuid4().int
         self.name = name
         self.queue = PlayerQueue()
@@ -26,25 +33,30 @@ class SixMansQueue:
         self.channels = channels
         self.points = points
         self.players = players
+        self.ratings = ratings if ratings is not None else {}
         self.gamesPlayed = gamesPlayed
         self.maxSize = maxSize
         self.teamSelection = teamSelection
         self.category = category
         self.lobby_vc = lobby_vc
-        self.activeJoinLog = {}
-        # TODO: active join log could maintain queue during downtime
+        self.status_messages = {}   # channel id -> (status message, embed dict it shows)
+        self.metrics = metrics if metrics else Metrics()  # Counts the Discord calls the queue makes
+        self._pending_status = None
+        self._status_task = None
 
-    def _put(self, player):
-        self.queue.put(player)
-        # self.activeJoinLog[player.id] = datetime.datetime.now()
+    def _put(self, player, joined=None):
+        self.queue.put(player, joined)
+
+    def _join_event(self, player):
+        """Returns the queue journal event for the player joining the queue."""
+        joined = self.queue.joined(player)
+        return {"Event": JOIN_EVENT, "Queue": self.id, "Player": player.id, "Timestamp": joined if joined is not None else time.time()}
 
     def _get(self):
-        player = self.queue.get()
-        try:
-            del self.activeJoinLog[player.id]
-        except:
-            pass
-        return player
+        return self.queue.get()
+
+    def _get_many(self, count):
+        return self.queue.get_many(count)
 
     def get_player_summary(self, player: discord.User):
         try:
@@ -52,21 +64,56 @@ class SixMansQueue:
         except:
             return None
 
+    def get_player_rating(self, player: discord.User):
+        return self.ratings.get(str(player.id), DEFAULT_RATING)
+
+    def update_ratings(self, winners: List[discord.User], losers: List[discord.User], k_factor):
+        rate_game(self.ratings, [str(player.id) for player in winners], [str(player.id) for player in losers], k_factor)
+
     def _remove(self, player):
-        self.queue._remove(player)
-        try:
-            del self.activeJoinLog[player.id]
-        except:
-            pass
+        self.queue.remove(player)
 
     def _queue_full(self):
         return self.queue.qsize() >= self.maxSize
 
     async def send_message(self, message='', embed=None):
-        messages = []
-        for channel in self.channels:
-            messages.append(await channel.send(message, embed=embed))
-        return messages
+        self.metrics.count("Sends", len(self.channels))
+        return list(await asyncio.gather(*(channel.send(message, embed=embed) for channel in self.channels)))
+
+    def update_status(self, embed: discord.Embed):
+        """Shows the embed in the queue's status message in each of the queue's channels.
+
+        Updates are held for STATUS_EDIT_DELAY seconds and only the newest one is shown. The status message is edited in place, and
+        only posted again if it's been deleted."""
+        self._pending_status = embed
+        if not self._status_task or self._status_task.done():
+            self._status_task = asyncio.create_task(self._send_status())
+
+    async def _send_status(self):
+        # Keep going until nothing new came in while the last update was being sent, so the newest status is always shown
+        while self._pending_status is not None:
+            await asyncio.sleep(STATUS_EDIT_DELAY)
+            embed, self._pending_status = self._pending_status, None
+            if embed is None:
+                return
+            rendered = embed.to_dict()
+            await asyncio.gather(*(self._show_status(channel, embed, rendered) for channel in self.channels), return_exceptions=True)
+
+    async def _show_status(self, channel: discord.TextChannel, embed: discord.Embed, rendered: dict):
+        message, shown = self.status_messages.get(channel.id, (None, None))
+        if message and shown == rendered:
+            return
+        if message:
+            try:
+                self.metrics.count("QueueStatus")
+                await message.edit(embed=embed)
+                self.status_messages[channel.id] = (message, rendered)
+                return
+            except discord.NotFound:
+                pass
+
+        self.metrics.count("QueueStatus")
+        self.status_messages[channel.id] = (await channel.send(embed=embed), rendered)
 
     async def set_team_selection(self, team_selection):
         self.teamSelection = team_selection
@@ -96,6 +143,7 @@ class SixMansQueue:
             "Channels": [x.id for x in self.channels],
             "Points": self.points,
             "Players": self.players,
+            "Ratings": self.ratings,
             "GamesPlayed": self.gamesPlayed,
             "TeamSelection": self.teamSelection,
             "MaxSize": self.maxSize
@@ -107,70 +155,91 @@ class SixMansQueue:
         
         return q_data
 
-class PlayerQueue(Queue):
-    def _init(self, maxsize):
-        self.queue = OrderedSet()
+def replay_queue_events(events):
+    """Replays queue journal events (oldest first) and returns a dict of queue id -> [(player id, join timestamp)] for the
+    players still in each queue, in the order they joined."""
+    queues = {}
+    for event in events:
+        players = queues.setdefault(event["Queue"], collections.OrderedDict())
+        players.pop(event["Player"], None)
+        if event["Event"] == JOIN_EVENT:
+            players[event["Player"]] = event["Timestamp"]
+    return {queue_id: list(players.items()) for queue_id, players in queues.items() if players}
 
-    def _put(self, item):
-        self.queue.add(item)
+class _QueueEntry:
+    __slots__ = ("player", "joined", "prev", "next")
 
-    def _get(self):
-        return self.queue.pop()
+    def __init__(self, player, joined):
+        self.player = player
+        self.joined = joined
+        self.prev = self
+        self.next = self
 
-    def _remove(self, value):
-        self.queue.remove(value)
 
-    def __contains__(self, item):
-        with self.mutex:
-            return item in self.queue
+class PlayerQueue:
+    """The players in a queue in the order they joined, with when each of them joined.
 
+    Entries are kept in a doubly linked list and looked up by member id, so joining, leaving, popping and checking if someone is
+    in the queue are all O(1). Queues are only used from the event loop, so nothing is locked."""
 
-class OrderedSet(collections.abc.MutableSet):
-    def __init__(self, iterable=None):
-        self.end = end = []
-        end += [None, end, end]  # sentinel node for doubly linked list
-        self.map = {}  # key --> [key, prev, next]
-        if iterable is not None:
-            self |= iterable
+    def __init__(self):
+        self._entries = {}      # member id -> _QueueEntry
+        self._end = _QueueEntry(None, None)
 
     def __len__(self):
-        return len(self.map)
-
-    def __contains__(self, key):
-        return key in self.map
-
-    def add(self, key):
-        if key not in self.map:
-            end = self.end
-            curr = end[1]
-            curr[2] = end[1] = self.map[key] = [key, curr, end]
+        return len(self._entries)
 
-    def discard(self, key):
-        if key in self.map:
-            key, prev, next = self.map.pop(key)
-            prev[2] = next
-            next[1] = prev
+    def __contains__(self, player):
+        return getattr(player, "id", player) in self._entries
 
     def __iter__(self):
-        end = self.end
-        curr = end[2]
-        while curr is not end:
-            yield curr[0]
-            curr = curr[2]
-
-    def __reversed__(self):
-        end = self.end
-        curr = end[1]
-        while curr is not end:
-            yield curr[0]
-            curr = curr[1]
-
-    def __repr__(self):
-        if not self:
-            return '%s()' % (self.__class__.__name__,)
-        return '%s(%r)' % (self.__class__.__name__, list(self))
-
-    def __eq__(self, other):
-        if isinstance(other, OrderedSet):
-            return len(self) == len(other) and list(self) == list(other)
-        return set(self) == set(other)
+        """Yields the players from the first to join to the last without copying the queue. It's safe to remove the player that
+        was just yielded while iterating."""
+        entry = self._end.next
+        while entry is not self._end:
+            next_entry = entry.next
+            yield entry.player
+            entry = next_entry
+
+    def qsize(self):
+        return len(self._entries)
+
+    def empty(self):
+        return not self._entries
+
+    def put(self, player, joined=None):
+        """Adds the player to the back of the queue, unless they're already in it."""
+        if player.id in self._entries:
+            return
+        entry = _QueueEntry(player, joined if joined is not None else time.time())
+        last = self._end.prev
+        entry.prev, entry.next = last, self._end
+        last.next = self._end.prev = entry
+        self._entries[player.id] = entry
+
+    def get(self):
+        """Removes and returns the player that has been in the queue the longest."""
+        if not self._entries:
+            raise IndexError("get from an empty PlayerQueue")
+        return self._unlink(self._end.next)
+
+    def get_many(self, count):
+        return [self.get() for _ in range(min(count, len(self._entries)))]
+
+    def remove(self, player):
+        entry = self._entries.get(getattr(player, "id", player))
+        if entry is None:
+            raise KeyError(player)
+        self._unlink(entry)
+
+    def joined(self, player):
+        """Returns when the player joined the queue (seconds since the epoch), or None if they aren't in it."""
+        entry = self._entries.get(getattr(player, "id", player))
+        return entry.joined if entry else None
+
+    def _unlink(self, entry):
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+        entry.prev = entry.next = None
+        del self._entries[entry.player.id]
+        return entry.player
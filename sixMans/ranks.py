@@ -0,0 +1,90 @@
+import math
+import random
+
+MAX_LEVELS = 24         # Enough levels to keep lookups O(log n) for up to ~16 million keys
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class RankIndex:
+    """A sorted collection of unique keys with O(log n) add, remove and rank lookups.
+
+    Implemented as an indexable skip list: every link also stores how many keys it skips over, so the position of a key is
+    counted while searching for it instead of by walking the whole list."""
+
+    def __init__(self, keys=None):
+        self._nil = _Node(None, 0)
+        self._head = _Node(None, MAX_LEVELS)
+        self._head.next = [self._nil] * MAX_LEVELS
+        self._size = 0
+        for key in keys or []:
+            self.add(key)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not self._nil:
+            yield node.key
+            node = node.next[0]
+
+    def add(self, key):
+        chain = [None] * MAX_LEVELS
+        steps_at_level = [0] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not self._nil and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        levels = min(MAX_LEVELS, 1 - int(math.log(1.0 - random.random(), 2.0)))
+        new_node = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            prev_node = chain[level]
+            new_node.next[level] = prev_node.next[level]
+            prev_node.next[level] = new_node
+            new_node.width[level] = prev_node.width[level] - steps
+            prev_node.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain = [None] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not self._nil and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        removed = chain[0].next[0]
+        if removed is self._nil or removed.key != key:
+            raise KeyError(key)
+        for level in range(len(removed.next)):
+            prev_node = chain[level]
+            prev_node.width[level] += removed.width[level] - 1
+            prev_node.next[level] = removed.next[level]
+        for level in range(len(removed.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key):
+        """Returns how many keys sort before `key`, which is its 0-based position if it's in the index."""
+        position = 0
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not self._nil and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
@@ -0,0 +1,38 @@
+DEFAULT_RATING = 1000       # Rating given to players who haven't played in a queue yet
+DEFAULT_K_FACTOR = 32       # Most rating points a player can gain or lose in one series
+
+
+def expected_score(rating, opponent_rating):
+    """Chance of a team with `rating` beating a team with `opponent_rating` (Elo)."""
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def rate_game(ratings: dict, winners, losers, k_factor=DEFAULT_K_FACTOR):
+    """Updates the ratings of the players in a finished series.
+
+    Teams are rated on their players' average rating, and every player on a team gains or loses the same amount."""
+    if not winners or not losers:
+        return
+    winners_rating = sum(ratings.get(player_id, DEFAULT_RATING) for player_id in winners) / len(winners)
+    losers_rating = sum(ratings.get(player_id, DEFAULT_RATING) for player_id in losers) / len(losers)
+    change = k_factor * (1 - expected_score(winners_rating, losers_rating))
+    for player_id in winners:
+        ratings[player_id] = ratings.get(player_id, DEFAULT_RATING) + change
+    for player_id in losers:
+        ratings[player_id] = ratings.get(player_id, DEFAULT_RATING) - change
+
+
+def replay_ratings(scores, k_factor=DEFAULT_K_FACTOR):
+    """Rebuilds every queue's ratings from the score history (oldest first).
+
+    All of the scores are grouped into series in one pass, then each series is rated as a whole in the order it was played.
+    Returns a dict of queue id -> {player id: rating}"""
+    series = {}
+    for score in scores:
+        winners, losers = series.setdefault((score["Queue"], score["Game"]), ([], []))
+        (winners if score["Win"] else losers).append("{0}".format(score["Player"]))
+
+    queue_ratings = {}
+    for (queue_id, game_id), (winners, losers) in series.items():
+        rate_game(queue_ratings.setdefault(queue_id, {}), winners, losers, k_factor)
+    return queue_ratings
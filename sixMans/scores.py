@@ -0,0 +1,77 @@
+import bisect
+import datetime
+
+DATE_TIME_FORMAT = "%d-%b-%Y (%H:%M:%S.%f)"
+SCORES_VERSION = 2      # Version 2: scores are kept in the score journal, oldest first with an integer "Timestamp"
+
+
+class ScoreStore:
+    """Time ordered store of every player score reported in a guild.
+
+    Scores are kept oldest first next to a column of integer epoch timestamps, both for the whole guild and for each queue,
+    so a time window is found with a binary search and a slice instead of parsing every score's date."""
+
+    def __init__(self, scores=None):
+        self.clear()
+        for score in scores or []:
+            self.add(score)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __iter__(self):
+        return iter(self.scores)
+
+    def add(self, score):
+        timestamp = score["Timestamp"]
+        queue_id = score["Queue"]
+        queue_timestamps = self._queue_timestamps.setdefault(queue_id, [])
+        queue_scores = self._queue_scores.setdefault(queue_id, [])
+
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.scores.append(score)
+        else:
+            index = bisect.bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(index, timestamp)
+            self.scores.insert(index, score)
+
+        if not queue_timestamps or timestamp >= queue_timestamps[-1]:
+            queue_timestamps.append(timestamp)
+            queue_scores.append(score)
+        else:
+            index = bisect.bisect_right(queue_timestamps, timestamp)
+            queue_timestamps.insert(index, timestamp)
+            queue_scores.insert(index, score)
+
+    def window(self, start_time=None, queue_id=None):
+        """Returns the scores reported after `start_time` (epoch seconds), oldest first. All scores are returned if no start time is given."""
+        if queue_id is None:
+            timestamps, scores = self.timestamps, self.scores
+        else:
+            timestamps = self._queue_timestamps.get(queue_id, [])
+            scores = self._queue_scores.get(queue_id, [])
+        if start_time is None:
+            return scores[:]
+        return scores[bisect.bisect_right(timestamps, start_time):]
+
+    def clear(self):
+        self.timestamps = []
+        self.scores = []
+        self._queue_timestamps = {}
+        self._queue_scores = {}
+
+
+def get_timestamp(date_time: datetime.datetime):
+    return int(date_time.timestamp())
+
+
+def migrate_scores(scores):
+    """Converts scores saved in Config (newest first, possibly with only a date string) to the current oldest first format."""
+    migrated = []
+    for score in reversed(scores):
+        if "Timestamp" not in score:
+            score["Timestamp"] = get_timestamp(datetime.datetime.strptime(score["DateTime"], DATE_TIME_FORMAT))
+        migrated.append(score)
+    migrated.sort(key=lambda score: score["Timestamp"])
+    return migrated
@@ -1,25 +1,43 @@
 import asyncio
+import collections
 import datetime
+import itertools
+import logging
 import random
+import time
 from sys import exc_info, maxsize
 from typing import Dict, List
 
 import discord
 from discord.ext.commands import Context
 from redbot.core import Config, checks, commands
+from redbot.core.data_manager import cog_data_path
 from redbot.core.utils.menus import start_adding_reactions
 from redbot.core.utils.predicates import ReactionPredicate
 
+from .channels import MAX_POOL_SIZE, POOL_SIZE, ChannelManager
 from .game import Game
-from .queue import SixMansQueue
+from .journal import Journal
+from .leaderboard import GuildLeaderboards, Leaderboard
+from .metrics import DUMP_INTERVAL, Metrics, timed
+from .persistence import ConfigWriter
+from .queue import LEAVE_EVENT, SixMansQueue, replay_queue_events
+from .ratings import DEFAULT_K_FACTOR, replay_ratings
+from .scores import SCORES_VERSION, DATE_TIME_FORMAT, ScoreStore, get_timestamp, migrate_scores
 from .strings import Strings
+from .timeouts import TimeoutWheel
+from .voice import ALREADY_THERE, MOVED, NOT_CONNECTED, VoiceMover
 
 DEBUG = False
 MINIMUM_GAME_TIME = 600                         # Seconds (10 Minutes)
 PLAYER_TIMEOUT_TIME = 10 if DEBUG else 14400    # How long players can be in a queue in seconds (4 Hours)
-LOOP_TIME = 5                                   # How often to check the queues in seconds
+LOOP_TIME = 5                                   # How often to check the queues for timed out players in seconds
 VERIFY_TIMEOUT = 15                             # How long someone has to react to a prompt (seconds)
 CHANNEL_SLEEP_TIME = 5 if DEBUG else 30         # How long channels will persist after a game's score has been reported (seconds)
+REACTION_EVENT_TTL = 5                          # How long a reaction event is remembered so a repeat of it is ignored (seconds)
+QUEUE_JOURNAL_SNAPSHOT_ROWS = 1000              # Queue events logged before the queue journal is rewritten as a snapshot of the queues
+
+log = logging.getLogger("red.RSCBot.sixMans")
 
 QTS_METHODS = [
     Strings.VOTE_TS,
@@ -42,8 +60,15 @@ defaults = {
     "GamesPlayed": 0,
     "Players": {},
     "Scores": [],
+    "ScoresVersion": 0,
+    "RatingKFactor": DEFAULT_K_FACTOR,
+    "ChannelPool": {},
+    "ChannelPoolSize": POOL_SIZE,
     "QueuesEnabled": True
 }
+global_defaults = {
+    "MetricsDumpInterval": 0
+}
 
 class SixMans(commands.Cog):
 
@@ -51,21 +76,59 @@ class SixMans(commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567896, force_registration=True)
         self.config.register_guild(**defaults)
+        self.config.register_global(**global_defaults)
+        self.writer = ConfigWriter(self.config)
+        self.channel_manager = ChannelManager(self.writer)
+        self.voice_mover = VoiceMover()
         self.queues: dict[list[SixMansQueue]] = {}
         self.games: dict[list[Game]] = {}
         self.queueMaxSize: dict[int] = {}
         self.player_timeout_time: dict[int] = {}
+        self.rating_k_factor: dict[int] = {}
         self.queues_enabled: dict[bool] = {}
+        self.scores: dict[ScoreStore] = {}
+        self.score_journals: dict[Journal] = {}
+        self.queue_journals: dict[Journal] = {}
+        self.queue_journal_rows: dict[int] = {}
+        self.leaderboards: dict[GuildLeaderboards] = {}
+        self.display_names: dict[dict[int, str]] = {}
+        self.queues_by_channel: dict[int, SixMansQueue] = {}
+        self.queues_by_name: dict[dict[str, SixMansQueue]] = {}
+        self.player_queues: dict[int, set] = {}
+        self.games_by_channel: dict[int, Game] = {}
+        self.recent_reactions = collections.OrderedDict()   # (message id, user id, emoji) -> (added, expires)
+        self.guild_loads: dict[asyncio.Future] = {}
+        self.load_times: dict[float] = {}
+        self.metrics = Metrics()
+        self.command_starts: dict[Context, float] = {}
+        self.metrics_dump = None
 
         asyncio.create_task(self._pre_load_data())
-        self.timeout_tasks = {}
+        self.timeouts = TimeoutWheel(self._timeout_players, tick=LOOP_TIME)
+        self.timeouts.start()
         self.observers = set()
         
-    def cog_unload(self):
-        """Clean up when cog shuts down."""
-        for player, tasks in self.timeout_tasks.items():
-            for queue, timeout_task in tasks.items():
-                timeout_task.cancel()
+    async def cog_unload(self):
+        """Clean up when cog shuts down. Changes still waiting on the writer's delay are written before the cog is gone."""
+        self.timeouts.stop()
+        if self.metrics_dump:
+            self.metrics_dump.cancel()
+        await self.writer.flush_all()
+
+    async def cog_before_invoke(self, ctx: Context):
+        self.command_starts[ctx] = time.perf_counter()
+        if ctx.guild:
+            try:
+                await self._load_guild(ctx.guild)
+            except:
+                # The command won't run, so neither will cog_after_invoke
+                self.command_starts.pop(ctx, None)
+                raise
+
+    async def cog_after_invoke(self, ctx: Context):
+        start = self.command_starts.pop(ctx, None)
+        if start is not None:
+            self.metrics.observe("command: {}".format(ctx.command.qualified_name), time.perf_counter() - start)
 
 #region commmands
 
@@ -94,6 +157,31 @@ class SixMans(commands.Cog):
         await self._pre_load_data()
         await ctx.send("Done")
 
+    @commands.guild_only()
+    @commands.command(aliases=['sixMansLoadTimes', 'smlt'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def loadTimes(self, ctx: Context):
+        """Shows how long the 6 Mans data took to load for this guild, and for the slowest guilds the bot is in"""
+        slowest = sorted(self.load_times.items(), key=lambda x: x[1], reverse=True)[:5]
+        embed = discord.Embed(title="{0} Mans Load Times".format(self.queueMaxSize[ctx.guild]), color=discord.Colour.blue())
+        embed.add_field(name="This Guild", value="{0:.1f} ms".format(self.load_times.get(ctx.guild, 0) * 1000), inline=False)
+        embed.add_field(name="Guilds Loaded", value="{0}/{1}".format(len(self.load_times), len(self.bot.guilds)), inline=False)
+        embed.add_field(name="Slowest Guilds", value="\n".join("{0}: {1:.1f} ms".format(guild.name, seconds * 1000) for guild, seconds in slowest), inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.command(aliases=['sixMansWriteStats', 'smws'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def writeStats(self, ctx: Context):
+        """Shows how many 6 Mans saves have been made since the cog loaded and how many Config writes they took"""
+        stats = self.writer.stats()
+        embed = discord.Embed(title="{0} Mans Write Stats".format(self.queueMaxSize[ctx.guild]), color=discord.Colour.blue())
+        embed.add_field(name="Saves", value=stats["Saves"], inline=True)
+        embed.add_field(name="Writes", value=stats["Writes"], inline=True)
+        embed.add_field(name="Data Written", value="{0:.1f} KB".format(stats["BytesWritten"] / 1024), inline=True)
+        embed.add_field(name="Guilds Waiting to Write", value=stats["PendingGuilds"], inline=True)
+        await ctx.send(embed=embed)
+
     @commands.guild_only()
     @commands.command()
     @checks.admin_or_permissions(manage_guild=True)
@@ -101,19 +189,20 @@ class SixMans(commands.Cog):
         queue_channels = []
         for channel in channels:
             queue_channels.append(await commands.TextChannelConverter().convert(ctx, channel))
-        for queue in self.queues[ctx.guild]:
-            if queue.name == name:
-                await ctx.send(":x: There is already a queue set up with the name: {0}".format(name))
+        if self._get_queue_by_name(ctx.guild, name):
+            await ctx.send(":x: There is already a queue set up with the name: {0}".format(name))
+            return
+        for channel in queue_channels:
+            queue = self._get_queue_by_text_channel(channel)
+            if queue:
+                await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
                 return
-            for channel in queue_channels:
-                if channel in queue.channels:
-                    await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
-                    return
         queue_max_size = await self._get_queue_max_size(ctx.guild)
         points = {Strings.PP_PLAY_KEY: points_per_play, Strings.PP_WIN_KEY: points_per_win}
         team_selection = await self._team_selection(ctx.guild)
-        six_mans_queue = SixMansQueue(name, ctx.guild, queue_channels, points, {}, 0, queue_max_size, teamSelection=team_selection, category=await self._category(ctx.guild))
+        six_mans_queue = SixMansQueue(name, ctx.guild, queue_channels, points, {}, 0, queue_max_size, teamSelection=team_selection, category=await self._category(ctx.guild), metrics=self.metrics)
         self.queues[ctx.guild].append(six_mans_queue)
+        self._index_queue(six_mans_queue)
         await self._save_queues(ctx.guild, self.queues[ctx.guild])
         await ctx.send("Done")
 
@@ -121,12 +210,7 @@ class SixMans(commands.Cog):
     @commands.command()
     @checks.admin_or_permissions(manage_guild=True)
     async def editQueue(self, ctx: Context, current_name, new_name, points_per_play: int, points_per_win: int, *channels):
-        six_mans_queue = None
-        for queue in self.queues[ctx.guild]:
-            if queue.name == current_name:
-                six_mans_queue = queue
-                break
-
+        six_mans_queue = self._get_queue_by_name(ctx.guild, current_name)
         if six_mans_queue is None:
             await ctx.send(":x: No queue found with name: {0}".format(current_name))
             return
@@ -134,20 +218,21 @@ class SixMans(commands.Cog):
         queue_channels = []
         for channel in channels:
             queue_channels.append(await commands.TextChannelConverter().convert(ctx, channel))
-        for queue in self.queues[ctx.guild]:
-            if queue.name != current_name:
-                if queue.name == new_name:
-                    await ctx.send(":x: There is already a queue set up with the name: {0}".format(new_name))
-                    return
-                
-                for channel in queue_channels:
-                    if channel in queue.channels:
-                        await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
-                        return
+        queue = self._get_queue_by_name(ctx.guild, new_name)
+        if queue and queue != six_mans_queue:
+            await ctx.send(":x: There is already a queue set up with the name: {0}".format(new_name))
+            return
+        for channel in queue_channels:
+            queue = self._get_queue_by_text_channel(channel)
+            if queue and queue != six_mans_queue:
+                await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
+                return
 
+        self._unindex_queue(six_mans_queue)
         six_mans_queue.name = new_name
         six_mans_queue.points = {Strings.PP_PLAY_KEY: points_per_play, Strings.PP_WIN_KEY: points_per_win}
         six_mans_queue.channels = queue_channels
+        self._index_queue(six_mans_queue)
         await self._save_queues(ctx.guild, self.queues[ctx.guild])
         await ctx.send("Done")
 
@@ -159,12 +244,7 @@ class SixMans(commands.Cog):
         if not await self.has_perms(ctx.author):
             return
 
-        six_mans_queue = None
-        for queue in self.queues[ctx.guild]:
-            if queue.name == queue_name:
-                six_mans_queue = queue
-                break
-
+        six_mans_queue = self._get_queue_by_name(ctx.guild, queue_name)
         if six_mans_queue is None:
             await ctx.send(":x: No queue found with name: {0}".format(queue_name))
             return
@@ -222,17 +302,107 @@ class SixMans(commands.Cog):
         guild_queue_size = await self._get_queue_max_size(ctx.guild)
         await ctx.send("Default Queue Size: {}".format(guild_queue_size))
 
+    @commands.guild_only()
+    @commands.command(aliases=['sixMansVoiceStats', 'smvs'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def voiceMoveStats(self, ctx: Context):
+        """Shows how the 6 Mans voice channel moves have gone since the cog loaded"""
+        stats = self.voice_mover.stats()
+        embed = discord.Embed(title="{0} Mans Voice Moves".format(self.queueMaxSize[ctx.guild]), color=discord.Colour.blue())
+        embed.add_field(name="Batches", value=stats["Batches"], inline=True)
+        embed.add_field(name="Average Batch Time", value="{0:.0f} ms".format(stats["AverageBatchTime"] * 1000), inline=True)
+        embed.add_field(name="Last Batch Time", value="{0:.0f} ms".format(stats["LastBatchTime"] * 1000), inline=True)
+        outcomes = "\n".join("{0}: {1}".format(outcome, count) for outcome, count in stats["Outcomes"].items())
+        embed.add_field(name="Moves", value=outcomes if outcomes else "None", inline=True)
+        embed.add_field(name="Rate Limit Retries", value=stats["Retried"], inline=True)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.command(aliases=['sixMansMetrics', 'smm'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def perfMetrics(self, ctx: Context, reset: bool = False):
+        """Shows how long the 6 Mans commands, queue pops, game creation, team selection, score reports and reactions have taken since
+        the cog loaded, with the Discord calls, Config reads and writes and in-memory sizes. Use `reset` to start counting again."""
+        snapshot = self._metrics_snapshot()
+        embed = discord.Embed(title="{0} Mans Metrics".format(self.queueMaxSize[ctx.guild]), color=discord.Colour.blue(),
+            description="Since {0} UTC".format(datetime.datetime.utcfromtimestamp(self.metrics.started).strftime("%Y-%m-%d %H:%M")))
+        latencies = "\n".join("`{0}`: {1}x p50 {2:.0f} ms, p99 {3:.0f} ms, max {4:.0f} ms".format(
+            operation, latency["Count"], latency["P50"] * 1000, latency["P99"] * 1000, latency["Max"] * 1000)
+            for operation, latency in snapshot["Latency"].items())
+        embed.add_field(name="Latency", value=latencies[:1024] if latencies else "None", inline=False)
+        embed.add_field(name="Discord Calls", value="\n".join("{0}: {1}".format(k, v) for k, v in snapshot["DiscordCalls"].items()), inline=True)
+        embed.add_field(name="Config", value="\n".join("{0}: {1}".format(k, v) for k, v in snapshot["Config"].items()), inline=True)
+        embed.add_field(name="Sizes", value="\n".join("{0}: {1}".format(k, v) for k, v in snapshot["Sizes"].items()), inline=True)
+        if reset:
+            self.metrics.reset()
+            self.channel_manager.calls = 0
+            self.voice_mover.calls = 0
+            self.writer.reset_stats()
+        await ctx.send(embed=embed)
+
+    @commands.command(aliases=['setMetricsDump', 'smd'])
+    @checks.is_owner()
+    async def setMetricsDumpInterval(self, ctx: Context, minutes: int = DUMP_INTERVAL):
+        """Appends a JSON snapshot of the 6 Mans metrics to the cog's data folder every `minutes` minutes (Default: 15).
+        Set it to 0 to stop the dumps."""
+        if minutes < 0:
+            return await ctx.send(":x: The metrics dump interval can't be negative.")
+
+        await self.config.MetricsDumpInterval.set(minutes)
+        self._schedule_metrics_dump(minutes)
+        if minutes:
+            await ctx.send("Done. Metrics will be written to `{0}` every **{1}** minute(s).".format(cog_data_path(self) / "metrics", minutes))
+        else:
+            await ctx.send("Done. Metrics will no longer be written.")
+
+    @commands.guild_only()
+    @commands.command(aliases=['setPoolSize', 'scps'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def setChannelPoolSize(self, ctx: Context, pool_size: int):
+        """Sets how many sets of hidden game channels are created ahead of time in each queue category (Default: 0).
+        Games take their channels from the pool when it has some ready, so they only need to be renamed instead of created."""
+        if pool_size < 0 or pool_size > MAX_POOL_SIZE:
+            return await ctx.send(":x: The channel pool size must be between 0 and {0}.".format(MAX_POOL_SIZE))
+
+        await self._save_channel_pool_size(ctx.guild, pool_size)
+        await self.channel_manager.set_pool_size(ctx.guild, pool_size, self._game_categories(ctx.guild))
+        await ctx.send("Done. There are now **{0}** sets of game channels ready.".format(self.channel_manager.pooled(ctx.guild)))
+
+    @commands.guild_only()
+    @commands.command(aliases=['setRatingK', 'srk'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def setRatingKFactor(self, ctx: Context, k_factor: int):
+        """Sets the most rating points a player can gain or lose in one series (Default: 32).
+        All queue ratings are recalculated from the score history with the new value."""
+        if k_factor <= 0:
+            return await ctx.send(":x: The rating K factor must be greater than 0.")
+
+        await self._save_rating_k_factor(ctx.guild, k_factor)
+        self.rating_k_factor[ctx.guild] = k_factor
+        await self._recompute_ratings(ctx.guild)
+        await ctx.send("Done")
+
+    @commands.guild_only()
+    @commands.command(aliases=['recalculateRatings', 'rcr'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def recomputeRatings(self, ctx: Context):
+        """Recalculates every queue's player ratings from the score history"""
+        await self._recompute_ratings(ctx.guild)
+        await ctx.send("Done")
+
     @commands.guild_only()
     @commands.command()
     @checks.admin_or_permissions(manage_guild=True)
     async def removeQueue(self, ctx: Context, *, queue_name):
-        for queue in self.queues[ctx.guild]:
-            if queue.name == queue_name:
-                self.queues[ctx.guild].remove(queue)
-                await self._save_queues(ctx.guild, self.queues[ctx.guild])
-                await ctx.send("Done")
-                return
-        await ctx.send(":x: No queue set up with name: {0}".format(queue_name))
+        queue = self._get_queue_by_name(ctx.guild, queue_name)
+        if queue is None:
+            await ctx.send(":x: No queue set up with name: {0}".format(queue_name))
+            return
+        self.queues[ctx.guild].remove(queue)
+        self._unindex_queue(queue)
+        self.timeouts.cancel_queue(queue)
+        await self._save_queues(ctx.guild, self.queues[ctx.guild])
+        await ctx.send("Done")
 
     @commands.guild_only()
     @commands.command(aliases=["qm", "queueAll", "qa", "forceQueue", "fq"])
@@ -241,7 +411,7 @@ class SixMans(commands.Cog):
         """Mass queueing for testing purposes"""
         six_mans_queue = self._get_queue_by_text_channel(ctx.channel)
         for member in members:
-            if member in six_mans_queue.queue.queue:
+            if member in six_mans_queue.queue:
                 await ctx.send("{} is already in queue.".format(member.display_name))
                 break
             await self._add_to_queue(member, six_mans_queue)
@@ -411,15 +581,15 @@ class SixMans(commands.Cog):
         game = self._get_game_by_text_channel(ctx.channel)
         player = ctx.message.author
         if game:
-            try:
-                if player in game.blue:
-                    await player.move_to(game.voiceChannels[0])
-                if player in game.orange:
-                    await player.move_to(game.voiceChannels[1])
+            team_vc = game.voiceChannels[0] if player in game.blue else game.voiceChannels[1] if player in game.orange else None
+            outcome = ALREADY_THERE # Nothing to do until teams have been picked
+            if team_vc:
+                outcome = (await self.voice_mover.move([(player, team_vc)]))[player]
+            if outcome in [MOVED, ALREADY_THERE]:
                 await ctx.message.add_reaction(Strings.WHITE_CHECK_REACT) # white_check_mark
-            except:
+            else:
                 await ctx.message.add_reaction(Strings.WHITE_X_REACT) # negative_squared_cross_mark
-                if not player.voice:
+                if outcome == NOT_CONNECTED:
                     await ctx.send("{}, you must be connected to a voice channel to be moved to your Six Man's team channel.".format(player.mention))
         else:
             await ctx.message.add_reaction(Strings.WHITE_X_REACT) # negative_squared_cross_mark
@@ -454,7 +624,7 @@ class SixMans(commands.Cog):
         if not self.queues_enabled[ctx.guild]:
             return await ctx.send(":x: Queueing is currently disabled.")
 
-        if player in six_mans_queue.queue.queue:
+        if player in six_mans_queue.queue:
             await ctx.send(":x: You are already in the {0} queue".format(six_mans_queue.name))
             return
         for game in self.games[ctx.guild]:
@@ -516,20 +686,20 @@ class SixMans(commands.Cog):
         Only valid after 10 minutes have passed since the game started. Both teams will need to verify the results.
 
         `winning_team` must be either `Blue` or `Orange`"""
-        game_time = ctx.message.created_at - ctx.channel.created_at
-        if game_time.seconds < MINIMUM_GAME_TIME:
+        game, six_mans_queue = await self._get_info(ctx)
+        if game is None or six_mans_queue is None:
+            return
+
+        game_time = int(time.time() - game.started)
+        if game_time < MINIMUM_GAME_TIME:
             await ctx.send(":x: You can't report a game outcome until at least **10 minutes** have passed since the game was created."
-                "\nCurrent time that's passed = **{0} minute(s)**".format(game_time.seconds // 60))
+                "\nCurrent time that's passed = **{0} minute(s)**".format(game_time // 60))
             return
 
         if winning_team.lower() != "blue" and winning_team.lower() != "orange":
             await ctx.send(":x: {0} is an invalid input for `winning_team`. Must be either `Blue` or `Orange`".format(winning_team))
             return
 
-        game, six_mans_queue = await self._get_info(ctx)
-        if game is None or six_mans_queue is None:
-            return
-
         if game.scoreReported == True:
             await ctx.send(":x: Someone has already reported the results or is waiting for verification")
             return
@@ -623,47 +793,26 @@ class SixMans(commands.Cog):
     #endregion player commands
 
     #region listeners
-    @commands.Cog.listener("on_reaction_add")
-    async def on_reaction_add(self, reaction, user):
-        return
-        channel = reaction.message.channel
-        if type(channel) == discord.DMChannel:
-            return
-        await self.process_six_mans_reaction_add(reaction.message, channel, user, reaction.emoji) 
-
     @commands.Cog.listener("on_raw_reaction_add")
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        channel = self.bot.get_channel(payload.channel_id)
-        if type(channel) == discord.DMChannel:
-            return
-
-        message = await channel.fetch_message(payload.message_id)
-        user = self.bot.get_user(payload.user_id)
-        if not user:
-            user = await self.bot.fetch_user(payload.user_id)
-        
-        
-        await self.process_six_mans_reaction_add(message, channel, user, payload.emoji)
-
-    @commands.Cog.listener("on_reaction_remove")
-    async def on_reaction_remove(self, reaction, user):
-        return
-        if type(reaction.message.channel) == discord.DMChannel:
-            return
-
-        await self.process_six_mans_reaction_removed(reaction.message.channel, user, reaction.emoji)
+        await self._process_raw_reaction(payload, added=True)
 
     @commands.Cog.listener("on_raw_reaction_remove")
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        channel = self.bot.get_channel(payload.channel_id)
-        if type(channel) == discord.DMChannel:
-            return
+        await self._process_raw_reaction(payload, added=False)
 
-        user = self.bot.get_user(payload.user_id)
-        if not user:
-            user = await self.bot.fetch_user(payload.user_id)
+    @commands.Cog.listener("on_member_update")
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.display_name != after.display_name:
+            self.display_names.get(after.guild, {}).pop(after.id, None)
+
+    @commands.Cog.listener("on_member_join")
+    async def on_member_join(self, member: discord.Member):
+        self.display_names.get(member.guild, {}).pop(member.id, None)
 
-        await self.process_six_mans_reaction_removed(channel, user, payload.emoji)
+    @commands.Cog.listener("on_member_remove")
+    async def on_member_remove(self, member: discord.Member):
+        self.display_names.get(member.guild, {}).pop(member.id, None)
 
     @commands.Cog.listener("on_guild_channel_delete")
     async def on_guild_channel_delete(self, channel):
@@ -671,12 +820,12 @@ class SixMans(commands.Cog):
         #TODO: Error catch if Q Lobby VC is deleted
         if type(channel) != discord.TextChannel:
             return
-        queue = None
-        for queue in self.queues[channel.guild]:
-            if channel in queue.channels:
-                queue.channels.remove(channel)
-                break
+        queue = self.queues_by_channel.pop(channel.id, None)
+        if queue is None:
+            return
+        queue.channels.remove(channel)
         if queue.channels:
+            await self._save_queues(channel.guild, self.queues[channel.guild])
             return
         
         clone = await channel.clone()
@@ -684,7 +833,8 @@ class SixMans(commands.Cog):
         helper_ping = " {}".format(helper_role.mention) if helper_role else ""
         await clone.send(":grey_exclamation:{0} This channel has been created because the last textChannel for the **{1}** queue has been deleted.".format(helper_ping, queue.name))
         queue.channels.append(clone)
-        await self._save_queues(channel.guild, self.queues[ctx.guild])
+        self.queues_by_channel[clone.id] = queue
+        await self._save_queues(channel.guild, self.queues[channel.guild])
 
     #endregion
 
@@ -700,80 +850,44 @@ class SixMans(commands.Cog):
     @queueLeaderBoard.command(aliases=["all-time", "alltime"])
     async def overall(self, ctx: Context, *, queue_name: str = None):
         """All-time leader board"""
-        players = None
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
-        queue_name = queue.name if queue else ctx.guild.name
-
-        if queue:
-            players = queue.players
-            games_played = queue.gamesPlayed
-        else:
-            players = await self._players(ctx.guild)
-            games_played = await self._games_played(ctx.guild)
-
-        if not players:
-            await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
-            return
-
-        sorted_players = self._sort_player_dict(players)
-        await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "All-time"))
+        await self._send_leaderboard(ctx, queue_name, Strings.ALL_TIME_LB)
 
     @commands.guild_only()
     @queueLeaderBoard.command(aliases=["daily"])
     async def day(self, ctx: Context, *, queue_name: str = None):
         """Daily leader board. All games from the last 24 hours will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
-        queue_id = queue.id if queue else None
-        queue_name = queue.name if queue else ctx.guild.name
-        day_ago = datetime.datetime.now() - datetime.timedelta(days=1)
-        players, games_played = self._filter_scores(ctx.guild, scores, day_ago, queue_id)
-
-        if not players:
-            await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
-            return
-
-        sorted_players = self._sort_player_dict(players)
-        await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "Daily"))
+        await self._send_leaderboard(ctx, queue_name, Strings.DAILY_LB)
 
     @commands.guild_only()
     @queueLeaderBoard.command(aliases=["weekly", "wk"])
     async def week(self, ctx: Context, *, queue_name: str = None):
         """Weekly leader board. All games from the last week will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
-        queue_id = queue.id if queue else None
-        week_ago = datetime.datetime.now() - datetime.timedelta(weeks=1)
-        players, games_played = self._filter_scores(ctx.guild, scores, week_ago, queue_id)
-
-        if not players:
-            await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
-            return
-
-        queue_name = queue.name if queue else ctx.guild.name
-        sorted_players = self._sort_player_dict(players)
-        await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "Weekly"))
+        await self._send_leaderboard(ctx, queue_name, Strings.WEEKLY_LB)
 
     @commands.guild_only()
     @queueLeaderBoard.command(aliases=["monthly", "mnth"])
     async def month(self, ctx: Context, *, queue_name: str = None):
         """Monthly leader board. All games from the last 30 days will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
-        queue_id = queue.id if queue else None
-        month_ago = datetime.datetime.now() - datetime.timedelta(days=30)
-        players, games_played = self._filter_scores(ctx.guild, scores, month_ago, queue_id)
+        await self._send_leaderboard(ctx, queue_name, Strings.MONTHLY_LB)
 
-        if not players:
-            await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
+    @commands.guild_only()
+    @commands.command(aliases=["checkLBs", "clb"])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def checkLeaderboards(self, ctx: Context):
+        """Rebuilds the leaderboards from the score history and lists any differences from the live leaderboards"""
+        differences = self.leaderboards[ctx.guild].check()
+        if not differences:
+            await ctx.send(":white_check_mark: All leaderboards match the score history.")
             return
 
-        queue_name = queue.name if queue else ctx.guild.name
-        sorted_players = self._sort_player_dict(players)
-        await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "Monthly"))
+        queue_names = {queue.id: queue.name for queue in self.queues[ctx.guild]}
+        message = ":x: Leaderboards that don't match the score history:"
+        for (queue_id, lb_format), board_differences in differences.items():
+            queue_name = queue_names.get(queue_id, ctx.guild.name) if queue_id else ctx.guild.name
+            message += "\n**{0} {1}**: {2} player(s)".format(queue_name, lb_format, len(board_differences))
+            for player_id, (live_totals, rebuilt_totals) in list(board_differences.items())[:5]:
+                message += "\n- {0}: live `{1}`, history `{2}`".format(player_id, live_totals, rebuilt_totals)
+        await ctx.send(message[:2000])
 
     #endregion
 
@@ -788,85 +902,25 @@ class SixMans(commands.Cog):
     @rank.command(aliases=["all-time", "overall"])
     async def alltime(self, ctx: Context, player: discord.Member = None, *, queue_name: str = None):
         """All-time ranks"""
-        queue = None
-        if queue_name:
-            queue = await self._get_queue_by_name(ctx.guild, queue_name)
-            players = queue.players
-        else:
-            players = await self._players(ctx.guild)
-            queue_name = ctx.guild.name
-
-        if not players:
-            await ctx.send(":x: Player ranks not available for {0}".format(queue_name))
-            return
-
-        queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
-        player = player if player else ctx.author
-        await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "All-time"))
+        await self._send_rank(ctx, player, queue_name, Strings.ALL_TIME_LB)
 
     @commands.guild_only()
     @rank.command(aliases=["day"])
     async def daily(self, ctx: Context, player: discord.Member = None, *, queue_name: str = None):
         """Daily ranks. All games from the last 24 hours will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
-        queue_id = queue.id if queue else None
-        day_ago = datetime.datetime.now() - datetime.timedelta(days=1)
-        players = self._filter_scores(ctx.guild, scores, day_ago, queue_id)[0]
-        queue_name = queue.name if queue else ctx.guild.name
-        
-        if not players:
-            await ctx.send(":x: Player ranks not available for {0}".format(queue_name))
-            return
-
-        queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
-        player = player if player else ctx.author
-        await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "Daily"))
+        await self._send_rank(ctx, player, queue_name, Strings.DAILY_LB)
 
     @commands.guild_only()
     @rank.command(aliases=["week", "wk"])
     async def weekly(self, ctx: Context, player: discord.Member = None, *, queue_name: str = None):
         """Weekly ranks. All games from the last week will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
-        queue_id = queue.id if queue else None
-        week_ago = datetime.datetime.now() - datetime.timedelta(weeks=1)
-        players = self._filter_scores(ctx.guild, scores, week_ago, queue_id)[0]
-        queue_name = queue.name if queue else ctx.guild.name
-
-        if not players:
-            await ctx.send(":x: Player ranks not available for {0}".format(queue_name))
-            return
-
-        queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
-        player = player if player else ctx.author
-        await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "Weekly"))
+        await self._send_rank(ctx, player, queue_name, Strings.WEEKLY_LB)
 
     @commands.guild_only()
     @rank.command(aliases=["month", "mnth"])
     async def monthly(self, ctx: Context, player: discord.Member = None, *, queue_name: str = None):
         """Monthly ranks. All games from the last 30 days will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
-        queue_id = queue.id if queue else None
-        month_ago = datetime.datetime.now() - datetime.timedelta(days=30)
-        players = self._filter_scores(ctx.guild, scores, month_ago, queue_id)[0]
-        queue_name = queue.name if queue else ctx.guild.name
-
-        if not players:
-            await ctx.send(":x: Player ranks not available for {0}".format(queue_name))
-            return
-
-        queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
-        player = player if player else ctx.author
-        await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "Monthly"))
+        await self._send_rank(ctx, player, queue_name, Strings.MONTHLY_LB)
 
     #endregion
 
@@ -1079,15 +1133,17 @@ class SixMans(commands.Cog):
 
     async def _add_to_queue(self, player: discord.Member, six_mans_queue: SixMansQueue):
         six_mans_queue._put(player)
-        embed = self.embed_player_added(player, six_mans_queue)
-        await six_mans_queue.send_message(embed=embed)
-        await self.create_timeout_task(player, six_mans_queue, self.player_timeout_time[six_mans_queue.guild])
+        self.player_queues.setdefault(player.id, set()).add(six_mans_queue)
+        self._log_queue_events(six_mans_queue.guild, [six_mans_queue._join_event(player)])
+        six_mans_queue.update_status(self.embed_player_added(player, six_mans_queue))
+        self.timeouts.add(player, six_mans_queue, self.player_timeout_time[six_mans_queue.guild])
 
     async def _remove_from_queue(self, player: discord.Member, six_mans_queue: SixMansQueue):
         six_mans_queue._remove(player)
-        embed = self.embed_player_removed(player, six_mans_queue)
-        await six_mans_queue.send_message(embed=embed)
-        await self.remove_timeout_task(player, six_mans_queue)
+        self._unindex_player(player, six_mans_queue)
+        self._log_queue_leaves(six_mans_queue, [player])
+        six_mans_queue.update_status(self.embed_player_removed(player, six_mans_queue))
+        self.timeouts.cancel(player, six_mans_queue)
 
     async def get_visble_queue_channel(self, six_mans_queue: SixMansQueue, player: discord.Member):
         for channel in six_mans_queue.channels:
@@ -1095,11 +1151,28 @@ class SixMans(commands.Cog):
                 return channel
         return None
 
-    async def _auto_remove_from_queue(self, player: discord.Member, six_mans_queue: SixMansQueue):
-        # Remove player from queue
-        await self._remove_from_queue(player, six_mans_queue)
-        
-        # Send Player Message
+    async def _timeout_players(self, expired: Dict[SixMansQueue, List[discord.Member]]):
+        """Removes players whose time in a queue has run out. Each queue gets one message for everyone timed out of it in a tick."""
+        for six_mans_queue, players in expired.items():
+            # A queue that fails is logged and doesn't stop the rest, since their players have already left the timeout wheel
+            try:
+                await self._timeout_queue_players(six_mans_queue, players)
+            except Exception:
+                log.exception("Couldn't time out players from the %s queue in guild %s", six_mans_queue.name, six_mans_queue.guild.id)
+
+    async def _timeout_queue_players(self, six_mans_queue: SixMansQueue, players: List[discord.Member]):
+        players = [player for player in players if player in six_mans_queue.queue]
+        if not players:
+            return
+        for player in players:
+            six_mans_queue._remove(player)
+            self._unindex_player(player, six_mans_queue)
+        self._log_queue_leaves(six_mans_queue, players)
+        six_mans_queue.update_status(self.embed_players_timed_out(players, six_mans_queue))
+        for player in players:
+            await self._send_timeout_notice(player, six_mans_queue)
+
+    async def _send_timeout_notice(self, player: discord.Member, six_mans_queue: SixMansQueue):
         auto_remove_msg = (
             "You have been timed out from the **{} {} Mans queue**. You'll need to use the "
             + "queue command again if you wish to play some more."
@@ -1121,36 +1194,8 @@ class SixMans(commands.Cog):
                 await player.send(auto_remove_msg)
             except:
                 pass
-    
-    async def create_timeout_task(self, player: discord.Member, six_mans_queue: SixMansQueue, time=None):
-        self.timeout_tasks.setdefault(player, {})
-        self.timeout_tasks[player][six_mans_queue] = asyncio.create_task(self.player_queue_timeout(player, six_mans_queue, time))
-
-    async def player_queue_timeout(self, player: discord.Member, six_mans_queue: SixMansQueue, time=None):
-        if not time:
-            time = self.player_queue_timeout[six_mans_queue.guild]
-
-        await asyncio.sleep(time)
-        try:
-            await self._auto_remove_from_queue(player, six_mans_queue)
-        except:
-            pass
-
-    async def cancel_timeout_task(self, player: discord.Member, six_mans_queue: SixMansQueue):
-        try:
-            self.timeout_tasks[player][six_mans_queue].cancel()
-            await self.remove_timeout_task(player, six_mans_queue)
-        except:
-            pass
-    
-    async def remove_timeout_task(self, player: discord.Member, six_mans_queue: SixMansQueue):
-        try:
-            del self.timeout_tasks[player][six_mans_queue]
-            if not self.timeout_tasks[player]:
-                del self.timeout_tasks[player]
-        except:
-            pass
             
+    @timed("finish_game")
     async def _finish_game(self, guild: discord.Guild, game: Game, six_mans_queue: SixMansQueue, winning_team):
         winning_players = []
         losing_players = []
@@ -1161,66 +1206,55 @@ class SixMans(commands.Cog):
             winning_players = game.orange
             losing_players = game.blue
 
-        _scores = await self._scores(guild)
-        _players = await self._players(guild)
+        _scores = self.scores[guild]
+        _leaderboards = self.leaderboards[guild]
         _games_played = await self._games_played(guild)
-        date_time = datetime.datetime.now().strftime("%d-%b-%Y (%H:%M:%S.%f)")
+        date_time = datetime.datetime.now()
+        new_scores = []
         for player in winning_players:
-            score = self._create_player_score(six_mans_queue, game, player, 1, date_time)
-            self._give_points(six_mans_queue.players, score)
-            self._give_points(_players, score)
-            _scores.insert(0, score)
+            new_scores.append(self._create_player_score(six_mans_queue, game, player, 1, date_time))
         for player in losing_players:
-            score = self._create_player_score(six_mans_queue, game, player, 0, date_time)
-            self._give_points(six_mans_queue.players, score)
-            self._give_points(_players, score)
-            _scores.insert(0, score)
+            new_scores.append(self._create_player_score(six_mans_queue, game, player, 0, date_time))
+        for score in new_scores:
+            _scores.add(score)
+            _leaderboards.add(score, six_mans_queue)
+        six_mans_queue.update_ratings(winning_players, losing_players, self.rating_k_factor[guild])
 
         _games_played += 1
         six_mans_queue.gamesPlayed += 1
 
-        await self._save_scores(guild, _scores)
+        await self._append_scores(guild, new_scores)
         await self._save_queues(guild, self.queues[guild])
-        await self._save_players(guild, _players)
+        await self._save_players(guild, _leaderboards.players)
         await self._save_games_played(guild, _games_played)
 
         if await self._get_automove(guild): # game.automove not working?
             qlobby_vc = await self._get_q_lobby_vc(guild)
             if qlobby_vc:
-                await self._move_to_voice(qlobby_vc, game.voiceChannels[0].members)
-                await self._move_to_voice(qlobby_vc, game.voiceChannels[1].members)
+                await self._move_to_voice(qlobby_vc, game.voiceChannels[0].members + game.voiceChannels[1].members)
 
         await self._remove_game(guild, game)
 
     async def _move_to_voice(self, vc: discord.VoiceChannel, members: List[discord.Member]):
-        for member in members:
-            try:
-                await member.move_to(vc)
-            except:
-                pass
+        return await self.voice_mover.move_all(members, vc)
 
     async def _remove_game(self, guild: discord.Guild, game: Game):
         self.games[guild].remove(game)
+        self._unindex_game(game)
         await self._save_games(guild, self.games[guild])
         await asyncio.sleep(CHANNEL_SLEEP_TIME)
         q_lobby_vc = await self._get_q_lobby_vc(guild)
         if not game.scoreReported:
             await game._notify(new_state=Strings.CANCELED_GS)
-        try:
-            await game.textChannel.delete()
-        except:
-            pass
-        for vc in game.voiceChannels:
-            try:
-                try:
-                    if q_lobby_vc:
-                        for player in vc.members:
-                            await player.move_to(q_lobby_vc)
-                except:
-                    pass
-                await vc.delete()
-            except:
-                pass
+        if q_lobby_vc:
+            await self._move_to_voice(q_lobby_vc, [player for vc in game.voiceChannels for player in vc.members])
+        await self.channel_manager.delete_channels(guild, [game.textChannel] + list(game.voiceChannels))
+
+    async def _recompute_ratings(self, guild: discord.Guild):
+        queue_ratings = replay_ratings(self.scores[guild], self.rating_k_factor[guild])
+        for queue in self.queues[guild]:
+            queue.ratings = queue_ratings.get(queue.id, {})
+        await self._save_queues(guild, self.queues[guild])
 
     def _get_opposing_captain(self, player: discord.Member, game: Game):
         opposing_captain = None
@@ -1241,17 +1275,7 @@ class SixMans(commands.Cog):
         elif opposing_captain in game.orange:
             game.captains[1] = random.sample(list(game.orange), 1)[0] #Swap Orange team captain
 
-    def _give_points(self, players_dict, score):
-        player_id = score["Player"]
-        points_earned = score["Points"]
-        win = score["Win"]
-
-        player_dict = players_dict.setdefault("{0}".format(player_id), {})
-        player_dict[Strings.PLAYER_POINTS_KEY] = player_dict.get(Strings.PLAYER_POINTS_KEY, 0) + points_earned
-        player_dict[Strings.PLAYER_GP_KEY] = player_dict.get(Strings.PLAYER_GP_KEY, 0) + 1
-        player_dict[Strings.PLAYER_WINS_KEY] = player_dict.get(Strings.PLAYER_WINS_KEY, 0) + win
-
-    def _create_player_score(self, six_mans_queue: SixMansQueue, game: Game, player: discord.Member, win, date_time):
+    def _create_player_score(self, six_mans_queue: SixMansQueue, game: Game, player: discord.Member, win, date_time: datetime.datetime):
         points_dict = six_mans_queue.points
         if win:
             points_earned = points_dict[Strings.PP_PLAY_KEY] + points_dict[Strings.PP_WIN_KEY]
@@ -1263,26 +1287,39 @@ class SixMans(commands.Cog):
             "Player": player.id,
             "Win": win,
             "Points": points_earned,
-            "DateTime": date_time
+            "DateTime": date_time.strftime(DATE_TIME_FORMAT),
+            "Timestamp": get_timestamp(date_time)
         }
 
-    def _filter_scores(self, guild, scores, start_date, queue_id):
-        players = {}
-        valid_scores = 0
-        for score in scores:
-            date_time = datetime.datetime.strptime(score["DateTime"], "%d-%b-%Y (%H:%M:%S.%f)")
-            if  date_time > start_date and (queue_id is None or score["Queue"] == queue_id):
-                self._give_points(players, score)
-                valid_scores +=1
-            else:
-                break
-        games_played = (valid_scores // self.queueMaxSize[guild])
-        return players, games_played
+    async def _send_leaderboard(self, ctx: Context, queue_name, lb_format):
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue_name = queue.name if queue else ctx.guild.name
+        leaderboard = self.leaderboards[ctx.guild].get(lb_format, queue)
+
+        if not leaderboard.players:
+            await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
+            return
+
+        if leaderboard.window is None:
+            games_played = queue.gamesPlayed if queue else await self._games_played(ctx.guild)
+        else:
+            games_played = leaderboard.scores_count // self.queueMaxSize[ctx.guild]
+        await ctx.send(embed=await self.embed_leaderboard(ctx, leaderboard, queue_name, games_played, lb_format))
+
+    async def _send_rank(self, ctx: Context, player: discord.Member, queue_name, rank_format):
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue_name = queue.name if queue else ctx.guild.name
+        leaderboard = self.leaderboards[ctx.guild].get(rank_format, queue)
 
-    def _sort_player_dict(self, player_dict):
-        sorted_players = sorted(player_dict.items(), key=lambda x: x[1][Strings.PLAYER_WINS_KEY], reverse=True)
-        return sorted(sorted_players, key=lambda x: x[1][Strings.PLAYER_POINTS_KEY], reverse=True)
+        if not leaderboard.players:
+            await ctx.send(":x: Player ranks not available for {0}".format(queue_name))
+            return
 
+        queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
+        player = player if player else ctx.author
+        await ctx.send(embed=self.embed_rank(player, leaderboard, queue_name, queue_max_size, rank_format))
+
+    @timed("pop_queue")
     async def _pop_queue(self, ctx: Context, six_mans_queue: SixMansQueue):
         game = await self._create_game(ctx.guild, six_mans_queue, prefix=ctx.prefix)
         if game is None:
@@ -1290,21 +1327,27 @@ class SixMans(commands.Cog):
         
         #Remove players from any other queue they were in
         for player in game.players:
-            for queue in self.queues[ctx.guild]:
-                if player in queue.queue:
-                    await self._remove_from_queue(player, queue)
+            for queue in list(self.player_queues.get(player.id, [])):
+                await self._remove_from_queue(player, queue)
+            self.timeouts.cancel_player(player)
         
         # Notify all players that queue has popped
         # await game.textChannel.send("{}\n".format(", ".join([player.mention for player in game.players])))
 
         self.games[ctx.guild].append(game)
+        self._index_game(game)
         await self._save_games(ctx.guild, self.games[ctx.guild])
         return True
 
+    @timed("create_game")
     async def _create_game(self, guild: discord.Guild, six_mans_queue: SixMansQueue, prefix="?"):
         if not six_mans_queue._queue_full():
             return None
-        players = [six_mans_queue._get() for _ in range(six_mans_queue.maxSize)]
+        players = six_mans_queue._get_many(six_mans_queue.maxSize)
+        for player in players:
+            self._unindex_player(player, six_mans_queue)
+        self._log_queue_leaves(six_mans_queue, players)
+        six_mans_queue.update_status(self.embed_queue_players(six_mans_queue))
 
         await six_mans_queue.send_message(message="**Queue is full! Game is being created.**")
 
@@ -1315,10 +1358,14 @@ class SixMans(commands.Cog):
             automove=await self._get_automove(guild),
             use_reactions=await self._is_react_to_vote(guild),
             observers=self.observers,
-            prefix=prefix
+            prefix=prefix,
+            channel_manager=self.channel_manager,
+            voice_mover=self.voice_mover,
+            metrics=self.metrics
         )
         await game.create_game_channels(await self._category(guild))
-        await game.process_team_selection_method()
+        with self.metrics.timer("team_selection ({})".format(game.teamSelection)):
+            await game.process_team_selection_method()
         return game
 
     async def _get_info(self, ctx: Context):
@@ -1349,6 +1396,51 @@ class SixMans(commands.Cog):
         while observer in self.observers:
             self.observers.remove(observer)
 
+    def _metrics_snapshot(self):
+        return {
+            "Time": time.time(),
+            "Since": self.metrics.started,
+            "Latency": self.metrics.latencies(),
+            "DiscordCalls": {
+                "Channels": self.channel_manager.calls,
+                "VoiceMoves": self.voice_mover.calls,
+                **self.metrics.calls
+            },
+            "Config": self.writer.stats(),
+            "Sizes": self._structure_sizes()
+        }
+
+    def _structure_sizes(self):
+        """Counts of what the cog is holding in memory across all guilds."""
+        return {
+            "Guilds": len(self.queues),
+            "Queues": sum(len(queues) for queues in self.queues.values()),
+            "QueuedPlayers": sum(len(queue.queue) for queues in self.queues.values() for queue in queues),
+            "Games": sum(len(games) for games in self.games.values()),
+            "Timeouts": len(self.timeouts),
+            "Scores": sum(len(scores) for scores in self.scores.values()),
+            "LeaderboardPlayers": sum(len(leaderboards.players) for leaderboards in self.leaderboards.values()),
+            "DisplayNames": sum(len(names) for names in self.display_names.values()),
+            "RecentReactions": len(self.recent_reactions),
+            "PooledChannelSets": sum(self.channel_manager.pooled(guild) for guild in self.channel_manager.pools)
+        }
+
+    def _schedule_metrics_dump(self, minutes):
+        if self.metrics_dump:
+            self.metrics_dump.cancel()
+            self.metrics_dump = None
+        if minutes:
+            self.metrics_dump = asyncio.create_task(self._dump_metrics(minutes))
+
+    async def _dump_metrics(self, minutes):
+        journal = Journal(cog_data_path(self) / "metrics")
+        while True:
+            await asyncio.sleep(minutes * 60)
+            try:
+                journal.append([self._metrics_snapshot()])
+            except Exception:
+                log.exception("Couldn't dump the 6 Mans metrics")
+
     def _get_game_and_queue(self, channel: discord.TextChannel):
         game = self._get_game_by_text_channel(channel)
         if game:
@@ -1357,41 +1449,124 @@ class SixMans(commands.Cog):
             return None, None
 
     def _get_game_by_text_channel(self, channel: discord.TextChannel):
-        for game in self.games.get(channel.guild, []):
-            if game.textChannel == channel:
-                return game
+        return self.games_by_channel.get(channel.id)
+
+    def _get_game_by_info_message(self, channel_id: int, message_id: int):
+        """Returns the game whose info message has the given id, so reactions on any other message are ignored without fetching anything."""
+        game = self.games_by_channel.get(channel_id)
+        if game and game.info_message and game.info_message.id == message_id:
+            return game
         return None
 
+    def _index_game(self, game: Game):
+        if game.textChannel:
+            self.games_by_channel[game.textChannel.id] = game
+
+    def _unindex_game(self, game: Game):
+        if game.textChannel and self.games_by_channel.get(game.textChannel.id) == game:
+            del self.games_by_channel[game.textChannel.id]
+
     def _get_queue_by_text_channel(self, channel: discord.TextChannel):
-        for six_mans_queue in self.queues[channel.guild]:
-            for queuechannel in six_mans_queue.channels:
-                if queuechannel == channel:
-                    return six_mans_queue
-        return None
+        return self.queues_by_channel.get(channel.id)
+
+    def _game_categories(self, guild: discord.Guild):
+        """Returns the categories the guild's games are created in."""
+        categories = {queue.category for queue in self.queues[guild] if isinstance(queue.category, discord.CategoryChannel)}
+        return categories or {None}
 
     def _get_queue_by_name(self, guild: discord.Guild, queue_name):
-        for queue in self.queues[guild]:
-            if queue.name == queue_name:
-                return queue
-        return None
+        return self.queues_by_name.get(guild, {}).get(queue_name)
+
+    def _index_queue(self, six_mans_queue: SixMansQueue):
+        """Adds the queue to the name, channel and player lookups. Call again after changing the queue's name or channels."""
+        self.queues_by_name.setdefault(six_mans_queue.guild, {})[six_mans_queue.name] = six_mans_queue
+        for channel in six_mans_queue.channels:
+            if channel:
+                self.queues_by_channel[channel.id] = six_mans_queue
+        for player in six_mans_queue.queue:
+            self.player_queues.setdefault(player.id, set()).add(six_mans_queue)
+
+    def _unindex_queue(self, six_mans_queue: SixMansQueue):
+        queues_by_name = self.queues_by_name.get(six_mans_queue.guild, {})
+        if queues_by_name.get(six_mans_queue.name) == six_mans_queue:
+            del queues_by_name[six_mans_queue.name]
+        for channel in six_mans_queue.channels:
+            if channel and self.queues_by_channel.get(channel.id) == six_mans_queue:
+                del self.queues_by_channel[channel.id]
+        for player in six_mans_queue.queue:
+            self._unindex_player(player, six_mans_queue)
+
+    def _unindex_player(self, player: discord.Member, six_mans_queue: SixMansQueue):
+        player_queues = self.player_queues.get(player.id)
+        if player_queues is not None:
+            player_queues.discard(six_mans_queue)
+            if not player_queues:
+                del self.player_queues[player.id]
+
+    async def _get_display_names(self, guild: discord.Guild, player_ids: List[int]):
+        """Returns a dict of player id -> display name (None if the player isn't in the guild).
+        Players are looked up in the display name cache and the guild's member cache, and any that are left are fetched together."""
+        display_names = self.display_names.setdefault(guild, {})
+        uncached_ids = []
+        for player_id in player_ids:
+            if player_id in display_names:
+                continue
+            member = guild.get_member(player_id)
+            if member:
+                display_names[player_id] = member.display_name
+            else:
+                uncached_ids.append(player_id)
+
+        if uncached_ids:
+            try:
+                members = await guild.query_members(user_ids=uncached_ids[:100], cache=True)
+                for member in members:
+                    display_names[member.id] = member.display_name
+                for player_id in uncached_ids[:100]:
+                    display_names.setdefault(player_id, None)
+            except Exception:
+                pass
+
+        return {player_id: display_names.get(player_id) for player_id in player_ids}
+
+    @timed("reaction")
+    async def _process_raw_reaction(self, payload: discord.RawReactionActionEvent, added: bool):
+        """The only path reactions take into the cog. Reactions that aren't on a game's info message and repeats of an event
+        that was just handled are dropped before anything is fetched."""
+        game = self._get_game_by_info_message(payload.channel_id, payload.message_id)
+        if not game or self._is_repeated_reaction(payload, added):
+            return
+
+        user = self.bot.get_user(payload.user_id)
+        if not user:
+            user = await self.bot.fetch_user(payload.user_id)
+        if added:
+            await self.process_six_mans_reaction_add(game, user, payload.emoji)
+        else:
+            await self.process_six_mans_reaction_removed(game, user, payload.emoji)
+
+    def _is_repeated_reaction(self, payload: discord.RawReactionActionEvent, added: bool):
+        """Returns True if the same user last added (or removed) the same reaction on the same message less than
+        REACTION_EVENT_TTL seconds ago. Events are kept in the order they expire, so expired ones are dropped from the front."""
+        now = time.monotonic()
+        while self.recent_reactions:
+            key, (_, expires) = next(iter(self.recent_reactions.items()))
+            if expires > now:
+                break
+            del self.recent_reactions[key]
 
-    async def process_six_mans_reaction_add(self, message: discord.Message, channel: discord.TextChannel, user: discord.User, emoji):
-        # Note: This may be called TWICE both by on_reaction and/or on_raw_reaction
+        key = (payload.message_id, payload.user_id, str(payload.emoji))
+        last_event = self.recent_reactions.pop(key, None)
+        self.recent_reactions[key] = (added, now + REACTION_EVENT_TTL)
+        return last_event is not None and last_event[0] == added
+
+    async def process_six_mans_reaction_add(self, game: Game, user: discord.User, emoji):
         if user.bot:
             return
         
-        # on_raw_reaction_add
         if type(emoji) == discord.partial_emoji.PartialEmoji:
             emoji = emoji.name
 
-        # Find Game
-        game = self._get_game_by_text_channel(channel)
-        game: Game
-        if not game:
-            return False
-        if message != game.info_message:
-            return False
-
         team_selection_mode = game.teamSelection.lower()
 
         if team_selection_mode == Strings.VOTE_TS.lower():
@@ -1404,14 +1579,15 @@ class SixMans(commands.Cog):
             await game.process_self_picking_teams(emoji, user, True)
 
         elif team_selection_mode == Strings.SHUFFLE_TS.lower():
-            if emoji is not Strings.SHUFFLE_REACT:
+            if emoji != Strings.SHUFFLE_REACT:
                 return
             
             # Check if Shuffle is enabled
-            message = self.info_message
+            channel = game.textChannel
+            message = await channel.fetch_message(game.info_message.id)
             now = datetime.datetime.utcnow()
             time_since_last_team = (now - message.created_at).seconds
-            time_since_q_pop = (now - message.channel.created_at).seconds
+            time_since_q_pop = time.time() - game.started
             if time_since_q_pop > 300:
                 return await channel.send(":x: Reshuffling teams is no longer permitted after 5 minutes of the initial team selection.")
             if time_since_last_team > 180:
@@ -1423,20 +1599,13 @@ class SixMans(commands.Cog):
                 await channel.send("{} _Generating New teams..._".format(Strings.SHUFFLE_REACT))
                 await game.shuffle_players()
 
-    async def process_six_mans_reaction_removed(self, channel: discord.TextChannel, user: discord.User, emoji):
-        # Note: This may be called TWICE both by on_reaction and/or on_raw_reaction
+    async def process_six_mans_reaction_removed(self, game: Game, user: discord.User, emoji):
         if user.bot:
             return
         
-        # on_raw_reaction_add
         if type(emoji) == discord.partial_emoji.PartialEmoji:
             emoji = emoji.name
         try:
-            game = self._get_game_by_text_channel(channel)
-            game: Game 
-            if not game:
-                return False
-
             if game.teamSelection.lower() == Strings.VOTE_TS.lower():
                 await game.process_team_select_vote(emoji, user, added=False)
             
@@ -1465,6 +1634,17 @@ class SixMans(commands.Cog):
         embed.add_field(name="Players in Queue", value=player_list, inline=False)
         return embed
 
+    def embed_players_timed_out(self, players: List[discord.Member], six_mans_queue: SixMansQueue):
+        if len(players) == 1:
+            return self.embed_player_removed(players[0], six_mans_queue)
+        player_list = self.format_player_list(six_mans_queue)
+        embed = discord.Embed(color=discord.Colour.red())
+        embed.set_author(name="{0} players timed out of the {1} queue. ({2}/{3})".format(len(players), six_mans_queue.name,
+            six_mans_queue.queue.qsize(), six_mans_queue.maxSize), icon_url="{}".format(six_mans_queue.guild.icon_url))
+        embed.add_field(name="Players Removed", value=", ".join(player.mention for player in players), inline=False)
+        embed.add_field(name="Players in Queue", value=player_list, inline=False)
+        return embed
+
     def embed_queue_info(self, queue: SixMansQueue, default_lobby_vc=None):
         embed = discord.Embed(title="{0} {1} Mans Info".format(queue.name, queue.maxSize), color=discord.Colour.blue())
         emoji = queue.get_ts_emoji()
@@ -1487,7 +1667,7 @@ class SixMans(commands.Cog):
     def embed_queue_players(self, queue: SixMansQueue):
         player_list = self.format_player_list(queue)
         embed = discord.Embed(title="{0} {1} Mans Queue".format(queue.name, queue.maxSize), color=discord.Colour.blue())
-        embed.add_field(name="Players in Queue ({}/{})".format(len(queue.queue.queue), queue.maxSize), value=player_list, inline=False)
+        embed.add_field(name="Players in Queue ({}/{})".format(len(queue.queue), queue.maxSize), value=player_list, inline=False)
         return embed
 
     def embed_active_games(self, guild, queueGames: Dict[int, List[Game]]):
@@ -1498,49 +1678,54 @@ class SixMans(commands.Cog):
             embed.add_field(name="{}:".format(queueName), value="{}".format("\n".join(["{0}\n{1}".format(str(game.id), ", ".join([player.mention for player in game.players])) for game in games])), inline=False)
         return embed
 
-    async def embed_leaderboard(self, ctx: Context, sorted_players, queue_name, games_played, lb_format):
+    async def embed_leaderboard(self, ctx: Context, leaderboard: Leaderboard, queue_name, games_played, lb_format):
         embed = discord.Embed(title="{0} {1} Mans {2} Leaderboard".format(queue_name, self.queueMaxSize[ctx.guild], lb_format), color=discord.Colour.blue())
         embed.add_field(name="Games Played", value="{}\n".format(games_played), inline=True)
-        embed.add_field(name="Unique Players", value="{}\n".format(len(sorted_players)), inline=True)
+        embed.add_field(name="Unique Players", value="{}\n".format(len(leaderboard)), inline=True)
         embed.add_field(name="⠀", value="⠀", inline=True) # Blank field added to push the Player and Stats fields to a new line
         
         index = 1
         playerStrings = []
         statStrings = []
-        for player in sorted_players:
-            try:
-                member: discord.Member = await commands.MemberConverter().convert(ctx, player[0])
-            except:
-                await ctx.send(":x: Can't find player with id: {}".format(player[0]))
-                continue
+        ranked_players = leaderboard.ranked_players()
+        while index <= 10:
+            # Resolve the next page of players in one pass, players who have left the guild are skipped
+            players = list(itertools.islice(ranked_players, 10))
+            if not players:
+                break
+            display_names = await self._get_display_names(ctx.guild, [int(player_id) for player_id, player_info in players])
 
-            player_info = player[1]
-            playerStrings.append("`{0}` **{1:25s}:**".format(index, member.display_name))
-            try:
-                player_wins = player_info[Strings.PLAYER_WINS_KEY]
-                player_gp = player_info[Strings.PLAYER_GP_KEY]
-                player_wp = round(player_wins/player_gp*100, 1)
-                player_wp = f"{player_wp}%" if player_wp != 100 else "100%"
-            except ZeroDivisionError:
-                player_wp = "N/A"
-
-            statStrings.append("Points: `{0:4d}`  Wins: `{1:3d}`  GP: `{2:3d}` WP: `{3:5s}`".format(
-                player_info[Strings.PLAYER_POINTS_KEY],
-                player_wins,
-                player_gp,
-                player_wp
+            for player_id, player_info in players:
+                display_name = display_names.get(int(player_id))
+                if not display_name:
+                    continue
+
+                playerStrings.append("`{0}` **{1:25s}:**".format(index, display_name))
+                try:
+                    player_wins = player_info[Strings.PLAYER_WINS_KEY]
+                    player_gp = player_info[Strings.PLAYER_GP_KEY]
+                    player_wp = round(player_wins/player_gp*100, 1)
+                    player_wp = f"{player_wp}%" if player_wp != 100 else "100%"
+                except ZeroDivisionError:
+                    player_wp = "N/A"
+
+                statStrings.append("Points: `{0:4d}`  Wins: `{1:3d}`  GP: `{2:3d}` WP: `{3:5s}`".format(
+                    player_info[Strings.PLAYER_POINTS_KEY],
+                    player_wins,
+                    player_gp,
+                    player_wp
+                    )
                 )
-            )
-            
-            index += 1
-            if index > 10:
-                break
+
+                index += 1
+                if index > 10:
+                    break
         
         author = ctx.author
         try:
-            author_index = [y[0] for y in sorted_players].index("{0}".format(author.id))
+            author_index = leaderboard.get_ranks("{0}".format(author.id))[0]
             if author_index is not None and author_index > 9:
-                author_info = sorted_players[author_index][1]
+                author_info = leaderboard.players["{0}".format(author.id)]
                 playerStrings.append("\n`{0}` **{1:25s}:**".format(author_index + 1, author.display_name))
                 try:
                     author_wins = author_info[Strings.PLAYER_WINS_KEY]
@@ -1563,14 +1748,12 @@ class SixMans(commands.Cog):
         embed.add_field(name="Stats", value="{}\n".format("\n".join(statStrings)), inline=True)
         return embed
 
-    def embed_rank(self, player, sorted_players, queue_name, queue_max_size, rank_format):
+    def embed_rank(self, player, leaderboard: Leaderboard, queue_name, queue_max_size, rank_format):
         try:
-            num_players = len(sorted_players)
-            points_index = [y[0] for y in sorted_players].index("{0}".format(player.id))
-            player_info = sorted_players[points_index][1]
+            num_players = len(leaderboard)
+            points_index, wins_index, games_played_index = leaderboard.get_ranks("{0}".format(player.id))
+            player_info = leaderboard.players["{0}".format(player.id)]
             points, wins, games_played = player_info[Strings.PLAYER_POINTS_KEY], player_info[Strings.PLAYER_WINS_KEY], player_info[Strings.PLAYER_GP_KEY]
-            wins_index = [y[0] for y in sorted(sorted_players, key=lambda x: x[1][Strings.PLAYER_WINS_KEY], reverse=True)].index("{0}".format(player.id))
-            games_played_index = [y[0] for y in sorted(sorted_players, key=lambda x: x[1][Strings.PLAYER_GP_KEY], reverse=True)].index("{0}".format(player.id))
             embed = discord.Embed(title="{0} {1} {2} Mans {3} Rank".format(player.display_name, queue_name, queue_max_size, rank_format), color=discord.Colour.blue())
             embed.set_thumbnail(url=player.avatar_url)
             embed.add_field(name="Points:", value="**Value:** {2} | **Rank:** {0}/{1}".format(points_index + 1, num_players, points), inline=True)
@@ -1583,7 +1766,7 @@ class SixMans(commands.Cog):
         return embed
 
     def format_player_list(self, queue: SixMansQueue):
-        player_list = "{}".format(", ".join([player.mention for player in queue.queue.queue]))
+        player_list = "{}".format(", ".join([player.mention for player in queue.queue]))
         if player_list == "":
             player_list = "No players currently in the queue"
         return player_list
@@ -1593,97 +1776,153 @@ class SixMans(commands.Cog):
 #region load/save methods
     async def _pre_load_data(self):
         await self.bot.wait_until_ready()
+        await self.writer.flush_all()
         self.queues = {}
         self.games = {}
-
-        for guild in self.bot.guilds:
-            self.queues[guild] = []
-            self.games[guild] = []
-
-            # Preload General Data
-            saved_queues_enabled = await self._get_queues_enabled(guild)
-            self.queues_enabled[guild] = saved_queues_enabled if (saved_queues_enabled is not None) else True
-            self.queueMaxSize[guild] = await self._get_queue_max_size(guild)
-            self.player_timeout_time[guild] = await self._player_timeout(guild) ## if not DEBUG else PLAYER_TIMEOUT_TIME
-
-            # Pre-load Queues
-            queues = await self._queues(guild)
-            default_team_selection = await self._team_selection(guild)
-            default_queue_size = self.queueMaxSize[guild]
-            default_category = await self._category(guild)
-            default_lobby_vc = await self._get_q_lobby_vc(guild)
-            for key, value in queues.items():
-                queue_channels = [guild.get_channel(x) for x in value["Channels"]]
-                queue_name = value["Name"]
-                team_selection = value.setdefault("TeamSelection", default_team_selection)
-                queue_size = value.setdefault("MaxSize", default_queue_size)
-                if default_category:
-                    category = guild.get_channel(value.setdefault("Category", default_category.id))
-                elif "Category" in value and value["Category"]:
-                    category = value["Category"]
-                else:
-                    category = None
-                
-                if default_lobby_vc:
-                    lobby_vc = guild.get_channel(value.setdefault("LobbyVC", default_lobby_vc.id))
-                elif "LobbyVC" in value and value["LobbyVC"]:
-                    lobby_vc = value["LobbyVC"]
-                else:
-                    lobby_vc = None
-                six_mans_queue = SixMansQueue(queue_name, guild, queue_channels, 
-                    value["Points"], 
-                    value["Players"], 
-                    value["GamesPlayed"], 
-                    queue_size, 
-                    teamSelection=team_selection,
-                    category=category,
-                    lobby_vc=lobby_vc
-                )
-                
-                six_mans_queue.id = int(key)
-                self.queues[guild].append(six_mans_queue)
+        self.queues_by_channel = {}
+        self.queues_by_name = {}
+        self.player_queues = {}
+        self.games_by_channel = {}
+        self.guild_loads = {}
+        self.load_times = {}
+        self.timeouts.clear()
+
+        self._schedule_metrics_dump(await self.config.MetricsDumpInterval())
+
+        # A guild that fails to load is retried the first time a command is used in it
+        await asyncio.gather(*(self._pre_load_guild(guild) for guild in self.bot.guilds), return_exceptions=True)
+
+    async def _pre_load_guild(self, guild: discord.Guild):
+        """Loads guilds with queues or games right away. Any other guild is loaded the first time a command is used in it."""
+        data = await self.writer.all(guild)
+        if data["Queues"] or data["Games"]:
+            await self._load_guild(guild, data)
+
+    async def _load_guild(self, guild: discord.Guild, data=None):
+        """Loads the guild's data if it hasn't been loaded yet. Anything that asks while it's loading waits for the same load."""
+        load = self.guild_loads.get(guild)
+        if load is None:
+            load = self.guild_loads[guild] = asyncio.ensure_future(self._hydrate_guild(guild, data))
+        try:
+            await load
+        except:
+            if self.guild_loads.get(guild) is load:
+                del self.guild_loads[guild]
+            raise
+
+    async def _hydrate_guild(self, guild: discord.Guild, data=None):
+        start = time.perf_counter()
+        if data is None:
+            data = await self.writer.all(guild)
+        self.queues[guild] = []
+        self.games[guild] = []
+
+        # Preload General Data
+        saved_queues_enabled = data["QueuesEnabled"]
+        self.queues_enabled[guild] = saved_queues_enabled if (saved_queues_enabled is not None) else True
+        self.queueMaxSize[guild] = data["DefaultQueueMaxSize"]
+        self.player_timeout_time[guild] = data["PlayerTimeout"] ## if not DEBUG else PLAYER_TIMEOUT_TIME
+        self.scores[guild] = ScoreStore(await self._scores(guild))
+        self.rating_k_factor[guild] = data["RatingKFactor"]
+
+        # Pre-load Queues
+        queues = data["Queues"]
+        default_team_selection = data["DefaultTeamSelection"]
+        default_queue_size = self.queueMaxSize[guild]
+        default_category = guild.get_channel(data["CategoryChannel"])
+        default_lobby_vc = guild.get_channel(data["QLobby"])
+        ratings_missing = False
+        for key, value in queues.items():
+            queue_channels = [guild.get_channel(x) for x in value["Channels"]]
+            queue_name = value["Name"]
+            team_selection = value.setdefault("TeamSelection", default_team_selection)
+            queue_size = value.setdefault("MaxSize", default_queue_size)
+            if default_category:
+                category = guild.get_channel(value.setdefault("Category", default_category.id))
+            elif "Category" in value and value["Category"]:
+                category = value["Category"]
+            else:
+                category = None
             
-            # Pre-load Games
-            games = await self._games(guild)
-            game_list = []
-            for key, value in games.items():
-                players = [guild.get_member(x) for x in value["Players"]]
-                text_channel = guild.get_channel(value["TextChannel"])
-                voice_channels = [guild.get_channel(x) for x in value["VoiceChannels"]]
-                queueId = value["QueueId"]
-
-                queue = None
-                for q in self.queues[guild]:
-                    if q.id == queueId:
-                        queue = q
-                        
-                game = Game(players, queue, text_channel=text_channel, voice_channels=voice_channels, observers=self.observers)
-                game.id = int(key)
-                game.captains = [guild.get_member(x) for x in value["Captains"]]
-                game.blue = set([guild.get_member(x) for x in value["Blue"]])
-                game.orange = set([guild.get_member(x) for x in value["Orange"]])
-                game.roomName = value["RoomName"]
-                game.roomPass = value["RoomPass"]
-                game.use_reactions = value["UseReactions"]
-                game.prefix = value["Prefix"]
-
-                try:
-                    game.info_message = await game.textChannel.fetch_message(value["InfoMessage"])
-                    game.teamSelection = value["TeamSelection"]
-                except:
-                    game.teamSelection = game.queue.teamSelection
-                    await game.process_team_selection_method()
-                game.scoreReported = value["ScoreReported"]
-                game_list.append(game)
+            if default_lobby_vc:
+                lobby_vc = guild.get_channel(value.setdefault("LobbyVC", default_lobby_vc.id))
+            elif "LobbyVC" in value and value["LobbyVC"]:
+                lobby_vc = value["LobbyVC"]
+            else:
+                lobby_vc = None
+            six_mans_queue = SixMansQueue(queue_name, guild, queue_channels, 
+                value["Points"], 
+                value["Players"], 
+                value["GamesPlayed"], 
+                queue_size, 
+                teamSelection=team_selection,
+                category=category,
+                lobby_vc=lobby_vc,
+                ratings=value.get("Ratings"),
+                metrics=self.metrics
+            )
             
-            self.games[guild] = game_list
+            six_mans_queue.id = int(key)
+            self.queues[guild].append(six_mans_queue)
+            self._index_queue(six_mans_queue)
+            ratings_missing = ratings_missing or "Ratings" not in value
+
+        self._restore_queued_players(guild)
+        self.channel_manager.load_pool(guild, data["ChannelPool"], data["ChannelPoolSize"])
+        if data["ChannelPoolSize"]:
+            asyncio.create_task(self.channel_manager.set_pool_size(guild, data["ChannelPoolSize"], self._game_categories(guild)))
+        self.leaderboards[guild] = GuildLeaderboards(data["Players"], self.queues[guild], self.scores[guild])
+        if ratings_missing:
+            # Queues saved before ratings were added get them from the score history
+            await self._recompute_ratings(guild)
+        
+        # Pre-load Games, their info messages are fetched at the same time
+        queues_by_id = {queue.id: queue for queue in self.queues[guild]}
+        games = await asyncio.gather(*(self._load_game(guild, queues_by_id, key, value) for key, value in data["Games"].items()))
+        self.games[guild] = list(games)
+        for game in games:
+            self._index_game(game)
+        self.load_times[guild] = time.perf_counter() - start
+
+    async def _load_game(self, guild: discord.Guild, queues_by_id: Dict[int, SixMansQueue], key, value):
+        players = [guild.get_member(x) for x in value["Players"]]
+        text_channel = guild.get_channel(value["TextChannel"])
+        voice_channels = [guild.get_channel(x) for x in value["VoiceChannels"]]
+        queue = queues_by_id.get(value["QueueId"])
+
+        game = Game(players, queue, text_channel=text_channel, voice_channels=voice_channels, observers=self.observers,
+            channel_manager=self.channel_manager, voice_mover=self.voice_mover, metrics=self.metrics)
+        game.id = int(key)
+        if "Started" in value:
+            game.started = value["Started"]
+        elif text_channel:
+            # Games saved before the start time was kept were started when their channels were created
+            game.started = text_channel.created_at.replace(tzinfo=datetime.timezone.utc).timestamp()
+        game.captains = [guild.get_member(x) for x in value["Captains"]]
+        game.blue = set([guild.get_member(x) for x in value["Blue"]])
+        game.orange = set([guild.get_member(x) for x in value["Orange"]])
+        game.roomName = value["RoomName"]
+        game.roomPass = value["RoomPass"]
+        game.use_reactions = value["UseReactions"]
+        game.prefix = value["Prefix"]
+
+        try:
+            game.info_message = await game.textChannel.fetch_message(value["InfoMessage"])
+            game.teamSelection = value["TeamSelection"]
+        except:
+            game.teamSelection = game.queue.teamSelection
+            await game.process_team_selection_method()
+        game.scoreReported = value["ScoreReported"]
+        return game
 
     async def _clear_all_data(self, guild: discord.Guild):
         await self._save_games(guild, [])
         await self._save_queues(guild, [])
         await self._save_scores(guild, [])
+        self.scores[guild] = ScoreStore()
         await self._save_games_played(guild, 0)
         await self._save_players(guild, {})
+        self.leaderboards[guild] = GuildLeaderboards({}, self.queues[guild], self.scores[guild])
         await self._save_category(guild, None)
         await self._save_q_lobby_vc(guild, None)
         await self._save_queue_max_size(guild, 6)
@@ -1692,101 +1931,164 @@ class SixMans(commands.Cog):
         await self._save_team_selection(guild, Strings.RANDOM_TS)
         await self._save_react_to_vote(guild, True)
         await self._save_automove(guild, False)
+        await self._save_rating_k_factor(guild, DEFAULT_K_FACTOR)
+        self.rating_k_factor[guild] = DEFAULT_K_FACTOR
 
     async def _games(self, guild: discord.Guild):
-        return await self.config.guild(guild).Games()
+        return await self.writer.get(guild, "Games")
 
     async def _save_games(self, guild: discord.Guild, games: List[Game]):
-        game_dict = {}
-        for game in games:
-            game_dict[game.id] = game._to_dict()
-        await self.config.guild(guild).Games.set(game_dict)
+        # Games, Queues, Players and GamesPlayed are written by the ConfigWriter, which builds them when the guild's changes are written
+        def game_dict():
+            return {game.id: game._to_dict() for game in games}
+        self.writer.save(guild, "Games", game_dict)
 
     async def _queues(self, guild: discord.Guild):
-        return await self.config.guild(guild).Queues()
+        return await self.writer.get(guild, "Queues")
 
     async def _save_queues(self, guild: discord.Guild, queues: List[SixMansQueue]):
-        queue_dict = {}
-        for queue in queues:
-            if queue.guild == guild:
-                queue_dict[queue.id] = queue._to_dict()
-        await self.config.guild(guild).Queues.set(queue_dict)
+        def queue_dict():
+            return {queue.id: queue._to_dict() for queue in queues if queue.guild == guild}
+        self.writer.save(guild, "Queues", queue_dict)
+
+    def _score_journal(self, guild: discord.Guild):
+        if guild not in self.score_journals:
+            self.score_journals[guild] = Journal(cog_data_path(self) / "scores" / str(guild.id))
+        return self.score_journals[guild]
+
+    def _queue_journal(self, guild: discord.Guild):
+        if guild not in self.queue_journals:
+            self.queue_journals[guild] = Journal(cog_data_path(self) / "queues" / str(guild.id))
+        return self.queue_journals[guild]
+
+    def _restore_queued_players(self, guild: discord.Guild):
+        """Puts the players that were in the guild's queues back in them in the order they joined, with the timeout deadline they had.
+        The journal is then rewritten as a snapshot of the restored queues."""
+        queues = {queue.id: queue for queue in self.queues[guild]}
+        for queue_id, players in replay_queue_events(self._queue_journal(guild).read()).items():
+            six_mans_queue = queues.get(queue_id)
+            if six_mans_queue is None:
+                continue
+            for player_id, joined in players:
+                player = guild.get_member(player_id)
+                if player is None or player in six_mans_queue.queue:
+                    continue
+                six_mans_queue._put(player, joined)
+                self.player_queues.setdefault(player.id, set()).add(six_mans_queue)
+                self.timeouts.add_deadline(player, six_mans_queue, joined + self.player_timeout_time[guild])
+        self._snapshot_queue_journal(guild)
+
+    def _snapshot_queue_journal(self, guild: discord.Guild):
+        self._queue_journal(guild).rewrite([queue._join_event(player) for queue in self.queues[guild] for player in queue.queue])
+        self.queue_journal_rows[guild] = 0
+
+    def _log_queue_leaves(self, six_mans_queue: SixMansQueue, players: List[discord.Member]):
+        now = time.time()
+        self._log_queue_events(six_mans_queue.guild, [
+            {"Event": LEAVE_EVENT, "Queue": six_mans_queue.id, "Player": player.id, "Timestamp": now} for player in players
+        ])
+
+    def _log_queue_events(self, guild: discord.Guild, events):
+        self._queue_journal(guild).append(events)
+        self.queue_journal_rows[guild] = self.queue_journal_rows.get(guild, 0) + len(events)
+        if self.queue_journal_rows[guild] >= QUEUE_JOURNAL_SNAPSHOT_ROWS:
+            self._snapshot_queue_journal(guild)
 
     async def _scores(self, guild: discord.Guild):
-        return await self.config.guild(guild).Scores()
+        journal = self._score_journal(guild)
+        if await self.writer.get(guild, "ScoresVersion") < SCORES_VERSION:
+            # One-time move of the scores saved in Config into the score journal
+            scores = migrate_scores(await self.writer.get(guild, "Scores"))
+            journal.rewrite(scores)
+            await self.writer.set(guild, "Scores", [])
+            await self.writer.set(guild, "ScoresVersion", SCORES_VERSION)
+            return scores
+        return list(journal.read())
 
     async def _save_scores(self, guild: discord.Guild, scores):
-        await self.config.guild(guild).Scores.set(scores)
+        self._score_journal(guild).rewrite(scores)
+
+    async def _append_scores(self, guild: discord.Guild, scores):
+        self._score_journal(guild).append(scores)
 
     async def _games_played(self, guild: discord.Guild):
-        return await self.config.guild(guild).GamesPlayed()
+        return await self.writer.get(guild, "GamesPlayed")
 
     async def _save_games_played(self, guild: discord.Guild, games_played: int):
-        await self.config.guild(guild).GamesPlayed.set(games_played)
+        self.writer.save(guild, "GamesPlayed", games_played)
 
     async def _player_timeout(self, guild: discord.Guild):
-        return await self.config.guild(guild).PlayerTimeout()
+        return await self.writer.get(guild, "PlayerTimeout")
     
     async def _save_player_timeout(self, guild: discord.Guild, time_seconds: int):
-        await self.config.guild(guild).PlayerTimeout.set(time_seconds)
+        await self.writer.set(guild, "PlayerTimeout", time_seconds)
 
     async def _players(self, guild: discord.Guild):
-        return await self.config.guild(guild).Players()
+        return await self.writer.get(guild, "Players")
 
     async def _save_players(self, guild: discord.Guild, players):
-        await self.config.guild(guild).Players.set(players)
+        self.writer.save(guild, "Players", players)
 
     async def _get_automove(self, guild: discord.Guild):
-        return await self.config.guild(guild).AutoMove()
+        return await self.writer.get(guild, "AutoMove")
 
     async def _save_automove(self, guild: discord.Guild, automove: bool):
-        await self.config.guild(guild).AutoMove.set(automove)
+        await self.writer.set(guild, "AutoMove", automove)
 
     async def _is_react_to_vote(self, guild: discord.Guild):
-        return await self.config.guild(guild).ReactToVote()
+        return await self.writer.get(guild, "ReactToVote")
 
     async def _save_react_to_vote(self, guild: discord.Guild, automove: bool):
-        await self.config.guild(guild).ReactToVote.set(automove)
+        await self.writer.set(guild, "ReactToVote", automove)
 
     async def _category(self, guild: discord.Guild):
-        return guild.get_channel(await self.config.guild(guild).CategoryChannel())
+        return guild.get_channel(await self.writer.get(guild, "CategoryChannel"))
 
     async def _save_category(self, guild: discord.Guild, category):
-        await self.config.guild(guild).CategoryChannel.set(category)
+        await self.writer.set(guild, "CategoryChannel", category)
 
     async def _save_q_lobby_vc(self, guild: discord.Guild, vc):
-        await self.config.guild(guild).QLobby.set(vc)
+        await self.writer.set(guild, "QLobby", vc)
     
     async def _get_q_lobby_vc(self, guild: discord.Guild):
-        lobby_voice = await self.config.guild(guild).QLobby()
+        lobby_voice = await self.writer.get(guild, "QLobby")
         for vc in guild.voice_channels:
             if vc.id == lobby_voice:
                 return vc
         return None
 
     async def _get_queue_max_size(self, guild: discord.Guild):
-        return await self.config.guild(guild).DefaultQueueMaxSize()
+        return await self.writer.get(guild, "DefaultQueueMaxSize")
     
     async def _save_queue_max_size(self, guild: discord.Guild, max_size: int):
-        await self.config.guild(guild).DefaultQueueMaxSize.set(max_size)
+        await self.writer.set(guild, "DefaultQueueMaxSize", max_size)
         self.queueMaxSize[guild] = int
 
     async def _helper_role(self, guild: discord.Guild):
-        return guild.get_role(await self.config.guild(guild).HelperRole())
+        return guild.get_role(await self.writer.get(guild, "HelperRole"))
 
     async def _save_helper_role(self, guild: discord.Guild, helper_role):
-        await self.config.guild(guild).HelperRole.set(helper_role)
+        await self.writer.set(guild, "HelperRole", helper_role)
 
     async def _save_team_selection(self, guild: discord.Guild, team_selection):
-        await self.config.guild(guild).DefaultTeamSelection.set(team_selection)
+        await self.writer.set(guild, "DefaultTeamSelection", team_selection)
     
     async def _team_selection(self, guild: discord.Guild):
-        return await self.config.guild(guild).DefaultTeamSelection()
+        return await self.writer.get(guild, "DefaultTeamSelection")
     
+    async def _rating_k_factor(self, guild: discord.Guild):
+        return await self.writer.get(guild, "RatingKFactor")
+
+    async def _save_rating_k_factor(self, guild: discord.Guild, k_factor: int):
+        await self.writer.set(guild, "RatingKFactor", k_factor)
+
+    async def _save_channel_pool_size(self, guild: discord.Guild, pool_size: int):
+        await self.writer.set(guild, "ChannelPoolSize", pool_size)
+
     async def _save_queues_enabled(self, guild: discord.Guild, enabled: bool):
-        return await self.config.guild(guild).QueuesEnabled.set(enabled)
+        return await self.writer.set(guild, "QueuesEnabled", enabled)
 
     async def _get_queues_enabled(self, guild: discord.Guild):
-        return await self.config.guild(guild).QueuesEnabled()
+        return await self.writer.get(guild, "QueuesEnabled")
 
 #endregion
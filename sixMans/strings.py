@@ -7,6 +7,12 @@ class Strings:
     PLAYER_GP_KEY = "GamesPlayed"
     PLAYER_WINS_KEY = "Wins"
 
+    # Leaderboards
+    ALL_TIME_LB = "All-time"
+    DAILY_LB = "Daily"
+    WEEKLY_LB = "Weekly"
+    MONTHLY_LB = "Monthly"
+
     # Team Selection
     DEFAULT_TS = 'Default'
     VOTE_TS = 'Vote'
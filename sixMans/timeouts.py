@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import math
+import time
+
+TICK = 5    # Seconds between checks for expired deadlines, deadlines are rounded up to the next tick
+
+log = logging.getLogger("red.RSCBot.sixMans")
+
+
+class TimeoutWheel:
+    """Owns the deadline of every (player, queue) timeout with a single task instead of one sleeping task per deadline.
+
+    Deadlines are put in a slot for the tick they fall in, so adding, cancelling and rescheduling a deadline are all O(1). Every
+    tick the slots that have come due are emptied and their timeouts are passed to `on_expire` together, grouped by queue, as
+    `{queue: [players]}`."""
+
+    def __init__(self, on_expire, tick=TICK):
+        self.on_expire = on_expire
+        self.tick = tick
+        self._slots = {}        # tick -> set of (player, queue)
+        self._deadlines = {}    # (player, queue) -> (deadline, tick)
+        self._player_keys = {}  # player -> set of (player, queue)
+        self._next_tick = math.floor(time.time() / tick)
+        self._task = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def start(self):
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def add(self, player, queue, delay):
+        """Times the player out of the queue in `delay` seconds, replacing the player's current deadline for that queue."""
+        self.add_deadline(player, queue, time.time() + delay)
+
+    def add_deadline(self, player, queue, deadline):
+        key = (player, queue)
+        self.cancel(player, queue)
+        tick = max(math.ceil(deadline / self.tick), self._next_tick)
+        self._slots.setdefault(tick, set()).add(key)
+        self._deadlines[key] = (deadline, tick)
+        self._player_keys.setdefault(player, set()).add(key)
+
+    def deadline(self, player, queue):
+        """Returns the time (seconds since the epoch) the player will be timed out of the queue, or None."""
+        entry = self._deadlines.get((player, queue))
+        return entry[0] if entry else None
+
+    def cancel(self, player, queue):
+        key = (player, queue)
+        entry = self._deadlines.pop(key, None)
+        if entry is None:
+            return False
+        slot = self._slots.get(entry[1])
+        if slot is not None:
+            slot.discard(key)
+            if not slot:
+                del self._slots[entry[1]]
+        player_keys = self._player_keys.get(player)
+        if player_keys is not None:
+            player_keys.discard(key)
+            if not player_keys:
+                del self._player_keys[player]
+        return True
+
+    def cancel_player(self, player):
+        """Cancels every timeout the player has, e.g. once they've been popped into a game."""
+        for _, queue in list(self._player_keys.get(player, [])):
+            self.cancel(player, queue)
+
+    def cancel_queue(self, queue):
+        for key in [key for key in self._deadlines if key[1] == queue]:
+            self.cancel(*key)
+
+    def clear(self):
+        self._slots.clear()
+        self._deadlines.clear()
+        self._player_keys.clear()
+
+    def pop_expired(self, now=None):
+        """Removes and returns the timeouts that are due, grouped by queue as {queue: [players]} (oldest deadline first)."""
+        current_tick = math.floor((now if now is not None else time.time()) / self.tick)
+        expired = []
+        if not self._slots:
+            self._next_tick = max(self._next_tick, current_tick + 1)
+        while self._next_tick <= current_tick:
+            expired.extend(self._slots.pop(self._next_tick, ()))
+            self._next_tick += 1
+
+        expired.sort(key=lambda key: self._deadlines[key][0])
+        by_queue = {}
+        for player, queue in expired:
+            del self._deadlines[(player, queue)]
+            player_keys = self._player_keys[player]
+            player_keys.discard((player, queue))
+            if not player_keys:
+                del self._player_keys[player]
+            by_queue.setdefault(queue, []).append(player)
+        return by_queue
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            expired = self.pop_expired()
+            if not expired:
+                continue
+            try:
+                await self.on_expire(expired)
+            except Exception:
+                log.exception("Couldn't time out the players of %d queue(s)", len(expired))
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import discord
+
+MAX_CONCURRENT_MOVES = 5    # Members being moved at once
+MOVE_RETRIES = 2            # Times a move that was rate limited is tried again
+RETRY_DELAY = 1             # Seconds waited before retrying a rate limited move, doubled for every retry
+
+MOVED = "Moved"
+ALREADY_THERE = "Already there"
+NOT_CONNECTED = "Not connected"
+FORBIDDEN = "Forbidden"
+FAILED = "Failed"
+
+
+class VoiceMover:
+    """Moves members between voice channels, all of a batch at the same time.
+
+    Members that aren't connected to voice or are already in the channel are skipped without a call. A move that hits a rate limit is
+    retried, and the outcome of every member's move is returned so callers can tell who wasn't moved and why."""
+
+    def __init__(self, max_concurrent_moves=MAX_CONCURRENT_MOVES, retries=MOVE_RETRIES):
+        self.retries = retries
+        self._semaphore = asyncio.Semaphore(max_concurrent_moves)
+        self.batches = 0
+        self.outcomes = {}          # outcome -> count
+        self.retried = 0
+        self.calls = 0
+        self.last_batch_time = 0
+        self.total_batch_time = 0
+
+    async def move(self, moves):
+        """Moves each member in a list of (member, voice channel) pairs. Returns a dict of member -> outcome."""
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._move_member(member, channel) for member, channel in moves))
+        self.batches += 1
+        self.last_batch_time = time.perf_counter() - start
+        self.total_batch_time += self.last_batch_time
+        outcomes = {}
+        for (member, _), outcome in zip(moves, results):
+            outcomes[member] = outcome
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        return outcomes
+
+    async def move_all(self, members, channel):
+        return await self.move([(member, channel) for member in members])
+
+    def stats(self):
+        return {
+            "Batches": self.batches,
+            "Outcomes": dict(self.outcomes),
+            "Retried": self.retried,
+            "Calls": self.calls,
+            "LastBatchTime": self.last_batch_time,
+            "AverageBatchTime": self.total_batch_time / self.batches if self.batches else 0
+        }
+
+    async def _move_member(self, member: discord.Member, channel: discord.VoiceChannel):
+        if not member or not member.voice or not member.voice.channel:
+            return NOT_CONNECTED
+        if member.voice.channel == channel:
+            return ALREADY_THERE
+
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    self.calls += 1
+                    await member.move_to(channel)
+                    return MOVED
+                except discord.Forbidden:
+                    return FORBIDDEN
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt == self.retries:
+                        return FAILED
+                    self.retried += 1
+                    await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+                except Exception:
+                    return FAILED
@@ -260,7 +260,8 @@ class StatsManager(commands.Cog):
         embed.add_field(name="Team Info", value=team_info, inline=False)
 
         # Current Roster
-        roster = self.team_manager.members_from_team(ctx, franchise_role, tier_role)
+        league_team = (await self.team_manager.league(ctx)).team(team)
+        roster = league_team.players if league_team else []
         roster_str = "```\n{}\n```".format('\n'.join(player.nick for player in roster))
         embed.add_field(name="Current Roster", value=roster_str, inline=False)
 
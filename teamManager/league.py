@@ -0,0 +1,73 @@
+class Franchise:
+    def __init__(self, role, name, gm_name, gm, prefix):
+        self.role = role
+        self.name = name
+        self.gm_name = gm_name
+        self.gm = gm                # None if the GM isn't in the server
+        self.prefix = prefix        # None if the GM has no prefix
+        self.teams = []             # Teams, in the order they were added
+
+
+class Team:
+    def __init__(self, name, franchise, tier_role, players, captain):
+        self.name = name
+        self.franchise = franchise
+        self.tier_role = tier_role
+        self.players = players      # members with the franchise and tier roles
+        self.captain = captain
+
+    @property
+    def tier(self):
+        return self.tier_role.name
+
+
+class LeagueSnapshot:
+    """Everything TeamManager knows about the league at one point in time: franchises with their GM and prefix, the teams in
+    each franchise and tier, and the players and captain of each team.
+
+    A snapshot is never changed once it's built. `generation` is the guild's league generation it was built at, which goes
+    up every time a team, tier, prefix, league role or league role member changes, so anything derived from a snapshot can
+    be cached until `TeamManager.league_generation` moves past it."""
+
+    def __init__(self, guild, generation, tiers):
+        self.guild = guild
+        self.generation = generation
+        self.tiers = tiers
+        self.franchises = {}        # franchise role id -> Franchise
+        self.teams = {}             # team name -> Team
+        self._teams_by_roles = {}   # (franchise role id, tier role id) -> Team
+        self._teams_by_tier = {}    # lowercase tier name -> [Teams]
+        self._teams_by_player = {}  # member id -> [Teams]
+        self._franchises_by_gm = {}  # lowercase gm name -> Franchise
+
+    def add_franchise(self, franchise: Franchise):
+        self.franchises[franchise.role.id] = franchise
+        self._franchises_by_gm[franchise.gm_name.lower()] = franchise
+
+    def add_team(self, team: Team):
+        self.teams[team.name] = team
+        team.franchise.teams.append(team)
+        self._teams_by_roles[(team.franchise.role.id, team.tier_role.id)] = team
+        self._teams_by_tier.setdefault(team.tier.lower(), []).append(team)
+        for player in team.players:
+            self._teams_by_player.setdefault(player.id, []).append(team)
+
+    def franchise(self, franchise_role):
+        return self.franchises.get(franchise_role.id) if franchise_role else None
+
+    def franchise_for_gm(self, gm_name: str):
+        return self._franchises_by_gm.get(gm_name.lower())
+
+    def team(self, team_name: str):
+        return self.teams.get(team_name)
+
+    def team_for(self, franchise_role, tier_role):
+        if not franchise_role or not tier_role:
+            return None
+        return self._teams_by_roles.get((franchise_role.id, tier_role.id))
+
+    def teams_for_tier(self, tier: str):
+        return list(self._teams_by_tier.get(tier.lower(), []))
+
+    def teams_for_player(self, member):
+        return list(self._teams_by_player.get(member.id, []))
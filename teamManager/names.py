@@ -0,0 +1,53 @@
+import difflib
+import heapq
+from collections import Counter
+
+SHORTLIST_SIZE = 10     # Names sharing the most trigrams with a query that are scored with difflib
+
+
+def trigrams(name: str):
+    padded = "  {0} ".format(name.lower())
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """A trigram index over a list of names (teams, tiers, ...) for looking up a name from what a user typed.
+
+    difflib.get_close_matches compares the query against every name. This only scores the few names that share the most
+    trigrams with the query, using the same ratio and cutoff as difflib, so a miss costs about the same with a thousand
+    names as with ten."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._exact = {}            # lowercase name -> name
+        self._postings = {}         # trigram -> [positions of the names that contain it]
+        self._trigram_counts = []   # position -> number of trigrams in the name
+        for position, name in enumerate(self.names):
+            self._exact.setdefault(name.lower(), name)
+            name_trigrams = trigrams(name)
+            self._trigram_counts.append(len(name_trigrams))
+            for trigram in name_trigrams:
+                self._postings.setdefault(trigram, []).append(position)
+
+    def exact(self, name: str):
+        """Returns the name that matches ignoring case, or None."""
+        return self._exact.get(name.lower())
+
+    def close_matches(self, name: str, n=3, cutoff=0.6):
+        """Returns up to n names, best first, whose difflib ratio against the name is at least the cutoff. Like difflib, the ratio
+        is case sensitive; only picking the shortlist ignores case."""
+        query_trigrams = trigrams(name)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._postings.get(trigram, ()))
+        shortlist = heapq.nlargest(max(n, SHORTLIST_SIZE), shared, key=lambda position: 2 * shared[position] / (
+            len(query_trigrams) + self._trigram_counts[position]))
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(name)
+        scored = []
+        for position in shortlist:
+            matcher.set_seq1(self.names[position])
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff and matcher.ratio() >= cutoff:
+                scored.append((matcher.ratio(), self.names[position]))
+        return [match for _, match in heapq.nlargest(n, scored)]
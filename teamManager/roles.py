@@ -0,0 +1,169 @@
+import re
+
+import discord
+
+GM_NAME_PATTERN = re.compile(r'(?<=\().*(?=\))')           # "<franchise name> (<gm name>)" -> gm name
+FRANCHISE_NAME_PATTERN = re.compile(r'.+?(?= \()')          # "<franchise name> (<gm name>)" -> franchise name
+
+
+def parse_gm_name(role_name: str):
+    """Returns the GM name in a franchise role name, or None if the name isn't in the franchise role format."""
+    matches = GM_NAME_PATTERN.findall(role_name)
+    return matches[0] if matches else None
+
+
+def parse_franchise_name(role_name: str):
+    matches = FRANCHISE_NAME_PATTERN.findall(role_name)
+    return matches[0] if matches else None
+
+
+class RoleIndex:
+    """Indexes a guild's roles by id, lowercase name, franchise name and GM name.
+
+    Role names are only parsed when a role is added or renamed, so a lookup doesn't have to scan or regex every role in the
+    guild. When more than one role matches, the lowest one in the role list is returned, the same as scanning `guild.roles`."""
+
+    def __init__(self, guild: discord.Guild):
+        self.guild = guild
+        self.by_id = {}                 # role id -> role
+        self.franchise_roles = {}       # role id -> role, for roles named like a franchise role
+        self._names = {}                # role id -> name the role was indexed under
+        self._by_name = {}              # lowercase name -> {role id: role}
+        self._by_franchise_name = {}    # lowercase franchise name -> {role id: role}
+        self._by_gm_name = {}           # gm name -> {role id: role}
+        for role in guild.roles:
+            self.add(role)
+
+    def add(self, role: discord.Role):
+        self.remove(role)
+        self.by_id[role.id] = role
+        self._names[role.id] = role.name
+        self._by_name.setdefault(role.name.lower(), {})[role.id] = role
+        gm_name = parse_gm_name(role.name)
+        if gm_name is not None:
+            self.franchise_roles[role.id] = role
+            self._by_gm_name.setdefault(gm_name, {})[role.id] = role
+        franchise_name = parse_franchise_name(role.name)
+        if franchise_name is not None:
+            self._by_franchise_name.setdefault(franchise_name.lower(), {})[role.id] = role
+
+    def remove(self, role: discord.Role):
+        name = self._names.pop(role.id, None)
+        if name is None:
+            return
+        del self.by_id[role.id]
+        self.franchise_roles.pop(role.id, None)
+        self._discard(self._by_name, name.lower(), role.id)
+        gm_name = parse_gm_name(name)
+        if gm_name is not None:
+            self._discard(self._by_gm_name, gm_name, role.id)
+        franchise_name = parse_franchise_name(name)
+        if franchise_name is not None:
+            self._discard(self._by_franchise_name, franchise_name.lower(), role.id)
+
+    def get(self, role_id: int):
+        return self.by_id.get(role_id)
+
+    def by_name(self, name: str):
+        return self._first(self._by_name.get(name.lower()))
+
+    def by_franchise_name(self, franchise_name: str):
+        return self._first(self._by_franchise_name.get(franchise_name.lower()))
+
+    def by_gm_name(self, gm_name: str):
+        return self._first(self._by_gm_name.get(gm_name))
+
+    def all_franchise_roles(self):
+        return sorted(self.franchise_roles.values())
+
+    def _first(self, roles):
+        if not roles:
+            return None
+        if len(roles) == 1:
+            return next(iter(roles.values()))
+        return min(roles.values())
+
+    def _discard(self, index, key, role_id):
+        roles = index.get(key)
+        if roles is None:
+            return
+        roles.pop(role_id, None)
+        if not roles:
+            del index[key]
+
+
+class MemberIndex:
+    """Keeps the ids of the members who have each of the roles it tracks, so listing the members with some set of roles is
+    a set intersection instead of a scan over every member in the guild.
+
+    A role is tracked from the first time it's looked up (or passed to `track`), which costs one scan over the members.
+    After that the sets are kept up to date from member updates, joins and leaves."""
+
+    def __init__(self, guild: discord.Guild, roles=()):
+        self.guild = guild
+        self.role_members = {}      # role id -> {member id}
+        self.track(roles)
+
+    def track(self, roles):
+        """Starts tracking any of the roles that aren't tracked yet, with a single scan over the members for all of them."""
+        new_role_ids = {role.id for role in roles if role is not None and role.id not in self.role_members}
+        if not new_role_ids:
+            return
+        for role_id in new_role_ids:
+            self.role_members[role_id] = set()
+        for member in self.guild.members:
+            for role in member.roles:
+                if role.id in new_role_ids:
+                    self.role_members[role.id].add(member.id)
+
+    # The member update methods return whether any of the tracked roles changed
+
+    def update_member(self, before: discord.Member, after: discord.Member):
+        before_role_ids = {role.id for role in before.roles}
+        after_role_ids = {role.id for role in after.roles}
+        changed = False
+        for role_id in before_role_ids - after_role_ids:
+            if role_id in self.role_members:
+                self.role_members[role_id].discard(after.id)
+                changed = True
+        for role_id in after_role_ids - before_role_ids:
+            if role_id in self.role_members:
+                self.role_members[role_id].add(after.id)
+                changed = True
+        return changed
+
+    def add_member(self, member: discord.Member):
+        changed = False
+        for role in member.roles:
+            if role.id in self.role_members:
+                self.role_members[role.id].add(member.id)
+                changed = True
+        return changed
+
+    def remove_member(self, member: discord.Member):
+        changed = False
+        for member_ids in self.role_members.values():
+            if member.id in member_ids:
+                member_ids.discard(member.id)
+                changed = True
+        return changed
+
+    def remove_role(self, role: discord.Role):
+        self.role_members.pop(role.id, None)
+
+    def member_ids(self, *roles):
+        """Returns the ids of the members that have all of the roles (none if any of the roles is None)."""
+        if not roles or None in roles:
+            return set()
+        self.track(roles)
+        role_sets = sorted((self.role_members[role.id] for role in roles), key=len)
+        return role_sets[0].intersection(*role_sets[1:])
+
+    def members(self, *roles):
+        """Returns the members that have all of the roles."""
+        members = []
+        for member_id in self.member_ids(*roles):
+            member = self.guild.get_member(member_id)
+            if member:
+                members.append(member)
+        return members
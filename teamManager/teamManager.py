@@ -4,7 +4,6 @@ import discord
 import re
 import ast
 import asyncio
-import difflib
 
 from redbot.core import Config
 from redbot.core import commands
@@ -14,6 +13,11 @@ from redbot.core.utils.predicates import MessagePredicate
 from redbot.core.utils.predicates import ReactionPredicate
 from redbot.core.utils.menus import start_adding_reactions
 
+from .roles import MemberIndex, RoleIndex, parse_gm_name
+from .teams import TeamRegistry
+from .league import Franchise, LeagueSnapshot, Team
+from .names import NameIndex
+
 
 defaults = {"Tiers": [], "Teams": [], "Team_Roles": {}}
 verify_timeout = 30
@@ -39,6 +43,67 @@ class TeamManager(commands.Cog):
             self, identifier=1234567892, force_registration=True)
         self.config.register_guild(**defaults)
         self.prefix_cog = bot.get_cog("PrefixManager")
+        self.role_indexes = {}
+        self.team_registries = {}
+        self.member_indexes = {}
+        self.league_generations = {}
+        self.league_snapshots = {}
+        self.tier_name_indexes = {}
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        index = self.role_indexes.get(role.guild.id)
+        if index:
+            index.add(role)
+        self._league_changed(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        index = self.role_indexes.get(after.guild.id)
+        if index:
+            index.add(after)
+        if before.name != after.name:
+            self._league_changed(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        index = self.role_indexes.get(role.guild.id)
+        if index:
+            index.remove(role)
+        member_index = self.member_indexes.get(role.guild.id)
+        if member_index:
+            member_index.remove_role(role)
+        self._league_changed(role.guild)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        index = self.member_indexes.get(after.guild.id)
+        if index and index.update_member(before, after):
+            self._league_changed(after.guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        index = self.member_indexes.get(member.guild.id)
+        if index and index.add_member(member):
+            self._league_changed(member.guild)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        index = self.member_indexes.get(member.guild.id)
+        if index and index.remove_member(member):
+            self._league_changed(member.guild)
+
+    @commands.Cog.listener()
+    async def on_prefixes_update(self, guild):
+        self._league_changed(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.role_indexes.pop(guild.id, None)
+        self.team_registries.pop(guild.id, None)
+        self.member_indexes.pop(guild.id, None)
+        self.league_snapshots.pop(guild.id, None)
+        self.tier_name_indexes.pop(guild.id, None)
 
 # Admin Commands
     @commands.command()
@@ -348,14 +413,9 @@ class TeamManager(commands.Cog):
     @checks.admin_or_permissions(manage_guild=True)
     async def clearTeams(self, ctx):
         """Removes all teams from the file system. Team roles will be cleared as well"""
-        teams = await self._teams(ctx)
-        team_roles = await self._team_roles(ctx)
-
-        teams.clear()
-        team_roles.clear()
-
-        await self._save_teams(ctx, teams)
-        await self._save_team_roles(ctx, team_roles)
+        registry = await self._team_registry(ctx)
+        registry.clear()
+        await self._save_team_registry(ctx, registry)
         await ctx.send("Done.")
 
 # General Commands
@@ -551,22 +611,24 @@ class TeamManager(commands.Cog):
         perm_fa_role = self._find_role_by_name(ctx, self.PERM_FA_ROLE)
 
         # Get all of the PermFA and FAs in a dictionary object.
-        fa_Dictionary = {"PermFA": [], "FA": []}
-
-        for member in ctx.message.guild.members:
-            if fa_role in member.roles:
-                if filter:  # Optional filter for PermFA and signable FAs
-                    if filter.lower() in perm_fa_filters:
-                        if perm_fa_role is not None and perm_fa_role in member.roles:
-                            fa_Dictionary["PermFA"].append(member.display_name)
-                    elif filter.lower() in signable_fa_filters:
-                        if perm_fa_role is not None and perm_fa_role not in member.roles:
-                            fa_Dictionary["FA"].append(member.display_name)
-                else:
-                    if perm_fa_role is not None and perm_fa_role in member.roles:
-                        fa_Dictionary["PermFA"].append(member.display_name)
-                    else:
-                        fa_Dictionary["FA"].append(member.display_name)
+        member_index = self._member_index(ctx.guild)
+        fa_ids = member_index.member_ids(fa_role)
+        perm_fa_ids = fa_ids & member_index.member_ids(perm_fa_role)
+        if filter:  # Optional filter for PermFA and signable FAs
+            if filter.lower() in perm_fa_filters:
+                fa_ids = set()
+            elif filter.lower() in signable_fa_filters:
+                fa_ids = fa_ids - perm_fa_ids if perm_fa_role is not None else set()
+                perm_fa_ids = set()
+            else:
+                fa_ids = perm_fa_ids = set()
+        else:
+            fa_ids = fa_ids - perm_fa_ids
+
+        fa_Dictionary = {
+            "PermFA": self._display_names(ctx, perm_fa_ids),
+            "FA": self._display_names(ctx, fa_ids)
+        }
 
         message = "```"
         for fa in sorted(fa_Dictionary["FA"], key=str.casefold):
@@ -590,22 +652,15 @@ class TeamManager(commands.Cog):
         """Gets a list of all draft eligible players
         """
         # Get all members with DE role
-        de_role = None
-        for role in ctx.guild.roles:
-            if role.name == self.DE_ROLE:
-                de_role = role
-                break
+        de_role = self._find_role_by_name(ctx, self.DE_ROLE)
 
         if not de_role:
             return await ctx.send(":x: No Draft Eligible Role")
 
-        de_members = []
-        for member in ctx.guild.members:
-            if de_role in member.roles:
-                de_members.append(member)
+        de_members = self._member_index(ctx.guild).members(de_role)
 
         if not de_members:
-            return ctx.send(":x: No DEs in the server")
+            return await ctx.send(":x: No DEs in the server")
 
         # Display DE members in <2000 chunks
         de_members.sort(key=lambda member: member.display_name, reverse=True)
@@ -735,12 +790,7 @@ class TeamManager(commands.Cog):
         """Retrieve the list of all users that are on the team
         indicated by the provided franchise_role and tier_role.
         """
-        team_members = []
-        for member in ctx.message.guild.members:
-            if franchise_role in member.roles:
-                if tier_role in member.roles:
-                    team_members.append(member)
-        return team_members
+        return self._member_index(ctx.message.guild).members(franchise_role, tier_role)
 
     async def create_roster_embed(self, ctx, team_name):
         franchise_role, tier_role = await self._roles_for_team(ctx, team_name)
@@ -872,12 +922,9 @@ class TeamManager(commands.Cog):
         return embed
 
     async def _get_team_captain(self, ctx, franchise_role: discord.Role, tier_role: discord.Role):
-        captain_role = self._find_role_by_name(ctx, "Captain")
-        members = self.members_from_team(ctx, franchise_role, tier_role)
-        for member in members:
-            if captain_role in member.roles:
-                return member
-        return None
+        captain_role = self._find_role_by_name(ctx, self.CAPTAN_ROLE)
+        captains = self._member_index(ctx.guild).members(franchise_role, tier_role, captain_role)
+        return captains[0] if captains else None
 
     async def _create_role(self, ctx, role_name: str):
         """Creates and returns a new Guild Role"""
@@ -973,6 +1020,7 @@ class TeamManager(commands.Cog):
 
     async def _save_tiers(self, ctx, tiers):
         await self.config.guild(ctx.guild).Tiers.set(tiers)
+        self._league_changed(ctx.guild)
 
     def _extract_tier_from_role(self, team_role):
         tier_matches = re.findall(r'\w*\b(?=\))', team_role.name)
@@ -984,8 +1032,7 @@ class TeamManager(commands.Cog):
         return franchise_name
 
     async def _add_team(self, ctx, team_name: str, gm_name: str, tier: str):
-        teams = await self._teams(ctx)
-        team_roles = await self._team_roles(ctx)
+        registry = await self._team_registry(ctx)
 
         tier_role = self._get_tier_role(ctx, tier)
 
@@ -1008,62 +1055,142 @@ class TeamManager(commands.Cog):
                            "* {0}\n".format("\n  * ".join(errors)))
             return False
 
-        try:
-            teams.append(team_name)
-            team_data = team_roles.setdefault(team_name, {})
-            team_data["Franchise Role"] = franchise_role.id
-            team_data["Tier Role"] = tier_role.id
-        except:
-            return False
-        await self._save_teams(ctx, teams)
-        await self._save_team_roles(ctx, team_roles)
+        registry.add(team_name, franchise_role.id, tier_role.id)
+        await self._save_team_registry(ctx, registry)
         return True
 
     async def _remove_team(self, ctx, team_name: str):
-        franchise_role, tier_role = await self._roles_for_team(ctx, team_name)
-        teams = await self._teams(ctx)
-        team_roles = await self._team_roles(ctx)
-        try:
-            teams.remove(team_name)
-            del team_roles[team_name]
-        except ValueError:
+        registry = await self._team_registry(ctx)
+        if not registry.remove(team_name):
             await ctx.send("{0} does not seem to be a team.".format(team_name))
             return False
-        await self._save_teams(ctx, teams)
-        await self._save_team_roles(ctx, team_roles)
+        await self._save_team_registry(ctx, registry)
         return True
 
     def _get_tier_role(self, ctx, tier: str):
-        roles = ctx.guild.roles
-        for role in roles:
-            if role.name.lower() == tier.lower():
-                return role
-        return None
+        return self._role_index(ctx.guild).by_name(tier)
 
     async def _teams(self, ctx):
-        return await self.config.guild(ctx.guild).Teams()
+        return list((await self._team_registry(ctx)).teams)
 
     async def _save_teams(self, ctx, teams):
         await self.config.guild(ctx.guild).Teams.set(teams)
 
     async def _team_roles(self, ctx):
-        return await self.config.guild(ctx.guild).Team_Roles()
+        return (await self._team_registry(ctx)).team_roles()
 
     async def _save_team_roles(self, ctx, team_roles):
         await self.config.guild(ctx.guild).Team_Roles.set(team_roles)
 
+    async def _team_registry(self, ctx):
+        """Returns the guild's team registry, loading it from Config the first time it's needed."""
+        registry = self.team_registries.get(ctx.guild.id)
+        if registry is None:
+            teams = await self.config.guild(ctx.guild).Teams()
+            team_roles = await self.config.guild(ctx.guild).Team_Roles()
+            # Another command may have loaded the registry while this one was reading Config
+            registry = self.team_registries.setdefault(ctx.guild.id, TeamRegistry(teams, team_roles))
+        return registry
+
+    async def _save_team_registry(self, ctx, registry: TeamRegistry):
+        await self._save_teams(ctx, registry.teams)
+        await self._save_team_roles(ctx, registry.team_roles())
+        self._league_changed(ctx.guild)
+
+    async def league(self, ctx):
+        """Returns a snapshot of the league in the guild. The snapshot is rebuilt from the role, member and team indexes the first
+        time it's asked for after anything in the league has changed, so cogs can call this every command instead of
+        working out franchises, teams and rosters from roles themselves."""
+        snapshot = self.league_snapshots.get(ctx.guild.id)
+        if snapshot is None or snapshot.generation != self.league_generation(ctx.guild) or snapshot.guild is not ctx.guild:
+            snapshot = await self._build_league(ctx)
+            self.league_snapshots[ctx.guild.id] = snapshot
+        return snapshot
+
+    def league_generation(self, guild: discord.Guild):
+        """Returns a number that goes up every time a team, tier, prefix, league role or league role member in the guild changes."""
+        return self.league_generations.get(guild.id, 0)
+
+    def _league_changed(self, guild: discord.Guild):
+        self.league_generations[guild.id] = self.league_generation(guild) + 1
+
+    async def _build_league(self, ctx):
+        # Anything that changes while this awaits bumps the generation past the snapshot's, so the next call rebuilds it
+        generation = self.league_generation(ctx.guild)
+        snapshot = LeagueSnapshot(ctx.guild, generation, await self.tiers(ctx))
+        registry = await self._team_registry(ctx)
+        prefixes = await self.prefix_cog._prefixes(ctx) if self.prefix_cog else {}
+        role_index = self._role_index(ctx.guild)
+        member_index = self._member_index(ctx.guild)
+        gm_role = role_index.by_name(self.GM_ROLE)
+        captain_role = role_index.by_name(self.CAPTAN_ROLE)
+
+        for franchise_role in role_index.all_franchise_roles():
+            gm_name = parse_gm_name(franchise_role.name)
+            gms = member_index.members(franchise_role, gm_role)
+            snapshot.add_franchise(Franchise(franchise_role, self.get_franchise_name_from_role(franchise_role), gm_name,
+                                             gms[0] if gms else None, prefixes.get(gm_name)))
+
+        for team_name in registry.teams:
+            role_ids = registry.roles_for(team_name)
+            if role_ids is None:
+                continue
+            franchise = snapshot.franchises.get(role_ids[0])
+            tier_role = role_index.get(role_ids[1])
+            if franchise is None or tier_role is None:
+                continue
+            captains = member_index.members(franchise.role, tier_role, captain_role)
+            snapshot.add_team(Team(team_name, franchise, tier_role, member_index.members(franchise.role, tier_role),
+                                   captains[0] if captains else None))
+        return snapshot
+
+    def _role_index(self, guild: discord.Guild):
+        """Returns the guild's role index, building it the first time it's needed (or if the guild has been reloaded since)."""
+        index = self.role_indexes.get(guild.id)
+        if index is None or index.guild is not guild:
+            index = self.role_indexes[guild.id] = RoleIndex(guild)
+        return index
+
+    def _member_index(self, guild: discord.Guild):
+        """Returns the guild's member index, building it for the league roles the first time it's needed (or if the guild has
+        been reloaded since). Any other role starts being tracked the first time its members are looked up."""
+        index = self.member_indexes.get(guild.id)
+        if index is None or index.guild is not guild:
+            index = self.member_indexes[guild.id] = MemberIndex(guild, self._league_roles(guild))
+        return index
+
+    def _league_roles(self, guild: discord.Guild):
+        role_index = self._role_index(guild)
+        roles = list(role_index.franchise_roles.values())
+        for role_name in [self.GM_ROLE, self.DE_ROLE, self.FA_ROLE, self.CAPTAN_ROLE, self.IR_ROLE, self.PERM_FA_ROLE,
+                          self.SUBBED_OUT_ROLE]:
+            roles.append(role_index.by_name(role_name))
+        registry = self.team_registries.get(guild.id)
+        if registry:
+            for tier_role_id in registry.by_tier:
+                tier_role = role_index.get(tier_role_id)
+                if tier_role:
+                    roles.append(tier_role)
+                    roles.append(role_index.by_name(tier_role.name + "FA"))
+        return roles
+
+    def _display_names(self, ctx, member_ids):
+        names = []
+        for member_id in member_ids:
+            member = ctx.guild.get_member(member_id)
+            if member:
+                names.append(member.display_name)
+        return names
+
     def _find_role(self, ctx, role_id):
-        for role in ctx.message.guild.roles:
-            if role.id == role_id:
-                return role
+        role = self._role_index(ctx.message.guild).get(role_id)
+        if role:
+            return role
         raise LookupError(
             'No role with id: {0} found in server roles'.format(role_id))
 
     def _find_role_by_name(self, ctx, role_name):
-        for role in ctx.message.guild.roles:
-            if role.name.lower() == role_name.lower():
-                return role
-        return None
+        return self._role_index(ctx.message.guild).by_name(role_name)
 
     def _find_member_by_name(self, ctx, member_name: str):
         for member in ctx.guild.members:
@@ -1072,76 +1199,42 @@ class TeamManager(commands.Cog):
         return None
 
     def _get_franchise_role(self, ctx, gm_name):
-        for role in ctx.message.guild.roles:
-            try:
-                gmNameFromRole = re.findall(r'(?<=\().*(?=\))', role.name)[0]
-                if gmNameFromRole == gm_name:
-                    return role
-            except:
-                continue
+        return self._role_index(ctx.message.guild).by_gm_name(gm_name)
 
     def _get_all_franchise_roles(self, ctx):
-        franchise_roles = []
-        for role in ctx.message.guild.roles:
-            try:
-                gmNameFromRole = re.findall(r'(?<=\().*(?=\))', role.name)[0]
-                if gmNameFromRole is not None:
-                    franchise_roles.append(role)
-            except:
-                continue
-        return franchise_roles
+        return self._role_index(ctx.message.guild).all_franchise_roles()
 
     async def _roles_for_team(self, ctx, team_name: str):
-        teams = await self._teams(ctx)
-        if teams and team_name in teams:
-            team_roles = await self._team_roles(ctx)
-            team_data = team_roles.setdefault(team_name, {})
-            franchise_role_id = team_data["Franchise Role"]
-            tier_role_id = team_data["Tier Role"]
-            franchise_role = self._find_role(ctx, franchise_role_id)
-            tier_role = self._find_role(ctx, tier_role_id)
-            return (franchise_role, tier_role)
-        else:
+        role_ids = (await self._team_registry(ctx)).roles_for(team_name)
+        if role_ids is None:
             raise LookupError('No team with name: {0}'.format(team_name))
+        franchise_role_id, tier_role_id = role_ids
+        franchise_role = self._find_role(ctx, franchise_role_id)
+        tier_role = self._find_role(ctx, tier_role_id)
+        return (franchise_role, tier_role)
 
     async def _find_team_name(self, ctx, franchise_role, tier_role):
-        teams = await self._teams(ctx)
-        for team in teams:
-            if await self._roles_for_team(ctx, team) == (franchise_role, tier_role):
-                return team
+        if not franchise_role or not tier_role:
+            return None
+        return (await self._team_registry(ctx)).team_for(franchise_role.id, tier_role.id)
 
     async def _find_teams_for_franchise(self, ctx, franchise_role):
-        franchise_teams = []
-        teams = await self._teams(ctx)
-        for team in teams:
-            if (await self._roles_for_team(ctx, team))[0] == franchise_role:
-                franchise_teams.append(team)
-        return franchise_teams
+        if not franchise_role:
+            return []
+        return (await self._team_registry(ctx)).teams_for_franchise(franchise_role.id)
 
     async def _find_franchise_tier_roles(self, ctx, franchise_role: discord.Role):
-        franchise_tier_roles = []
-        teams = await self._teams(ctx)
-        for team in teams:
-            if (await self._roles_for_team(ctx, team))[0] == franchise_role:
-                tier_role = (await self._roles_for_team(ctx, team))[1]
-                franchise_tier_roles.append(tier_role)
-        return franchise_tier_roles
+        registry = await self._team_registry(ctx)
+        return [self._find_role(ctx, registry.roles_for(team)[1]) for team in registry.teams_for_franchise(franchise_role.id)]
 
     async def _get_franchise_tier_team(self, ctx, franchise_role: discord.Role, tier_role: discord.Role):
-        teams = await self._teams(ctx)
-        for team in teams:
-            if (await self._roles_for_team(ctx, team)) == (franchise_role, tier_role):
-                return team
-        return None
+        return await self._find_team_name(ctx, franchise_role, tier_role)
 
     def get_current_franchise_role(self, user: discord.Member):
+        franchise_roles = self._role_index(user.guild).franchise_roles
         for role in user.roles:
-            try:
-                gmNameFromRole = re.findall(r'(?<=\().*(?=\))', role.name)[0]
-                if gmNameFromRole:
-                    return role
-            except:
-                continue
+            if role.id in franchise_roles and parse_gm_name(role.name):
+                return role
 
     async def get_current_tier_role(self, ctx, user: discord.Member):
         tierList = await self.tiers(ctx)
@@ -1175,44 +1268,41 @@ class TeamManager(commands.Cog):
             await ctx.send("Changing nickname forbidden for user: {0}".format(user.name))
 
     def get_franchise_role_from_name(self, ctx, franchise_name: str):
-        for role in ctx.message.guild.roles:
-            try:
-                matchedString = re.findall(r'.+?(?= \()', role.name)[0]
-                if matchedString.lower() == franchise_name.lower():
-                    return role
-            except:
-                continue
+        return self._role_index(ctx.message.guild).by_franchise_name(franchise_name)
 
     def get_franchise_name_from_role(self, franchise_role: discord.Role):
         end_of_name = franchise_role.name.rindex("(") - 1
         return franchise_role.name[0:end_of_name]
 
     async def _match_team_name(self, ctx, team_name):
-        teams = await self._teams(ctx)
-        for team in teams:
-            if team_name.lower() == team.lower():
-                return team, True
-        return difflib.get_close_matches(team_name, teams, n=3, cutoff=0.4), False
+        name_index = (await self._team_registry(ctx)).name_index()
+        team = name_index.exact(team_name)
+        if team:
+            return team, True
+        return name_index.close_matches(team_name, n=3, cutoff=0.4), False
 
     async def _match_tier_name(self, ctx, tier_name):
-        tiers = await self.tiers(ctx)
-        for tier in tiers:
-            if tier_name.lower() == tier.lower():
-                return tier
-        close_match = difflib.get_close_matches(
-            tier_name, tiers, n=1, cutoff=0.6)
+        name_index = await self._tier_name_index(ctx)
+        tier = name_index.exact(tier_name)
+        if tier:
+            return tier
+        close_match = name_index.close_matches(tier_name, n=1, cutoff=0.6)
         if len(close_match) > 0:
             return close_match[0]
         return None
 
+    async def _tier_name_index(self, ctx):
+        tiers = await self.tiers(ctx)
+        name_index = self.tier_name_indexes.get(ctx.guild.id)
+        if name_index is None or name_index.names != tiers:
+            name_index = self.tier_name_indexes[ctx.guild.id] = NameIndex(tiers)
+        return name_index
+
     async def _find_teams_for_tier(self, ctx, tier):
-        teams_in_tier = []
-        teams = await self._teams(ctx)
-        for team in teams:
-            team_tier = (await self._roles_for_team(ctx, team))[1]
-            if team_tier.name.lower() == tier.lower():
-                teams_in_tier.append(team)
-        return teams_in_tier
+        tier_role = self._get_tier_role(ctx, tier)
+        if not tier_role:
+            return []
+        return (await self._team_registry(ctx)).teams_for_tier(tier_role.id)
 
     async def _get_franchise_emoji(self, ctx, franchise_role):
         prefix = await self.prefix_cog._get_franchise_prefix(ctx, franchise_role)
@@ -1224,10 +1314,10 @@ class TeamManager(commands.Cog):
                     return emoji
 
     def _get_gm(self, ctx, franchise_role):
-        for member in ctx.message.guild.members:
-            if franchise_role in member.roles:
-                if self.is_gm(member):
-                    return member
+        gm_role = self._find_role_by_name(ctx, self.GM_ROLE)
+        gms = self._member_index(ctx.message.guild).members(franchise_role, gm_role)
+        if gms:
+            return gms[0]
 
     def _get_gm_name(self, franchise_role):
         try:
@@ -1245,10 +1335,11 @@ class TeamManager(commands.Cog):
         return user_tier_roles
 
     async def get_active_members_by_team_name(self, ctx, team_name):
-        franchise_role, tier_role = await self._roles_for_team(ctx, team_name)
-        team_members = self.members_from_team(ctx, franchise_role, tier_role)
+        team = (await self.league(ctx)).team(team_name)
+        if not team:
+            raise LookupError('No team with name: {0}'.format(team_name))
         active_members = []
-        for member in team_members:
+        for member in team.players:
             if not self.is_subbed_out(member):
                 active_members.append(member)
         return active_members
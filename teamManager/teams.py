@@ -0,0 +1,102 @@
+from .names import NameIndex
+
+FRANCHISE_ROLE_KEY = "Franchise Role"
+TIER_ROLE_KEY = "Tier Role"
+
+
+class TeamRegistry:
+    """A guild's teams with the franchise and tier role ids of each, also indexed by franchise, by tier and by both.
+
+    It's loaded from the guild's `Teams` and `Team_Roles` once, then changed in place as teams are added and removed, so
+    finding a team from its roles (or the roles from a team) doesn't read Config or loop over every team."""
+
+    def __init__(self, teams=None, team_roles=None):
+        self.teams = []             # team names, in the order they were added
+        self.roles = {}             # team -> (franchise role id, tier role id)
+        self.by_roles = {}          # (franchise role id, tier role id) -> team
+        self.by_franchise = {}      # franchise role id -> [teams]
+        self.by_tier = {}           # tier role id -> [teams]
+        self._name_index = None     # built from the team names the first time it's needed
+        team_roles = team_roles if team_roles else {}
+        for team in (teams if teams else []):
+            team_data = team_roles.get(team)
+            if team_data and FRANCHISE_ROLE_KEY in team_data and TIER_ROLE_KEY in team_data:
+                self.add(team, team_data[FRANCHISE_ROLE_KEY], team_data[TIER_ROLE_KEY])
+            elif team not in self.teams:
+                self.teams.append(team)
+                self._name_index = None
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __contains__(self, team):
+        return team in self.roles
+
+    def add(self, team, franchise_role_id, tier_role_id):
+        if team in self.roles:
+            self._unlink(team)
+        elif team not in self.teams:
+            self.teams.append(team)
+            self._name_index = None
+        self.roles[team] = (franchise_role_id, tier_role_id)
+        self.by_roles[(franchise_role_id, tier_role_id)] = team
+        self.by_franchise.setdefault(franchise_role_id, []).append(team)
+        self.by_tier.setdefault(tier_role_id, []).append(team)
+
+    def remove(self, team):
+        if team not in self.teams:
+            return False
+        self.teams.remove(team)
+        self._name_index = None
+        if team in self.roles:
+            self._unlink(team)
+            del self.roles[team]
+        return True
+
+    def clear(self):
+        self.teams.clear()
+        self.roles.clear()
+        self.by_roles.clear()
+        self.by_franchise.clear()
+        self.by_tier.clear()
+        self._name_index = None
+
+    def roles_for(self, team):
+        """Returns (franchise role id, tier role id) for the team, or None if it isn't a team."""
+        return self.roles.get(team)
+
+    def team_for(self, franchise_role_id, tier_role_id):
+        return self.by_roles.get((franchise_role_id, tier_role_id))
+
+    def teams_for_franchise(self, franchise_role_id):
+        return list(self.by_franchise.get(franchise_role_id, []))
+
+    def teams_for_tier(self, tier_role_id):
+        return list(self.by_tier.get(tier_role_id, []))
+
+    def name_index(self):
+        """Returns the index of the team names, which is only rebuilt after teams are added or removed."""
+        if self._name_index is None:
+            self._name_index = NameIndex(self.teams)
+        return self._name_index
+
+    def team_roles(self):
+        """Returns the teams' roles as they're saved in Config."""
+        return {team: {FRANCHISE_ROLE_KEY: franchise_role_id, TIER_ROLE_KEY: tier_role_id}
+                for team, (franchise_role_id, tier_role_id) in self.roles.items()}
+
+    def _unlink(self, team):
+        franchise_role_id, tier_role_id = self.roles[team]
+        if self.by_roles.get((franchise_role_id, tier_role_id)) == team:
+            del self.by_roles[(franchise_role_id, tier_role_id)]
+        self._discard(self.by_franchise, franchise_role_id, team)
+        self._discard(self.by_tier, tier_role_id, team)
+
+    def _discard(self, index, key, team):
+        teams = index.get(key)
+        if teams is None:
+            return
+        if team in teams:
+            teams.remove(team)
+        if not teams:
+            del index[key]